@@ -0,0 +1,294 @@
+"""Registry, context and runner of the MARK benchmarks.
+
+A benchmark is a function registered with `Benchmark.register`: it receives the
+BenchmarkContext of the corpus, does its untimed setup (reading files, filtering dictionaries,
+preparing result files...) and returns the callable to time together with the number of items
+that callable processes. BenchmarkRunner times every selected benchmark `repeat` times
+(after an optional warm-up call) with `time.perf_counter` and emits a machine-readable report:
+environment (commit, Python, platform), corpus manifest and, per benchmark, every timing with
+its min/median/mean/stdev and the throughput. `compare_reports` sets two reports side by side,
+e.g. the reports of two commits on the same corpus spec."""
+
+import fnmatch
+import json
+import logging
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+from functools import cached_property
+
+from modules.analyzer.ml_roles import AnalyzerRole
+from modules.analyzer.analyzer_factory import AnalyzerFactory
+from modules.analyzer.builder.consumer_analyzer_builder import ConsumerAnalyzerBuilder  # pylint: disable=unused-import
+from modules.analyzer.builder.producer_analyzer_builder import ProducerAnalyzerBuilder  # pylint: disable=unused-import
+from modules.analyzer.ml_analyzer import MLAnalyzer
+from modules.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+class Benchmark:
+    """A registered benchmark: its name, group, unit and setup function."""
+
+    _benchmarks = {}
+
+    def __init__(self, name: str, group: str, unit: str, setup):
+        self.name = name
+        self.group = group
+        self.unit = unit
+        self.setup = setup
+
+    @classmethod
+    def register(cls, name: str, group: str = "stage", unit: str = "files"):
+        """
+        Decorator registering a benchmark setup function.
+
+        Args:
+            name (str): Benchmark name, unique in the suite.
+            group (str): ``stage`` for a single pipeline stage, ``end_to_end`` for a full run.
+            unit (str): What the items counted by the benchmark are (files, projects...).
+
+        Returns:
+            Callable: The decorator; the setup function receives the BenchmarkContext and
+            returns ``(callable to time, number of items)``, or None to skip the benchmark.
+        """
+        def inner_wrapper(setup):
+            if name in cls._benchmarks:
+                logger.warning("A benchmark named %s already exists. Will replace it", name)
+            cls._benchmarks[name] = cls(name, group, unit, setup)
+            return setup
+
+        return inner_wrapper
+
+    @classmethod
+    def selected(cls, patterns=None) -> list:
+        """Return the registered benchmarks whose name matches one of the patterns (all by default)."""
+        return [
+            benchmark for name, benchmark in cls._benchmarks.items()
+            if not patterns or any(fnmatch.fnmatchcase(name, pattern) for pattern in patterns)
+        ]
+
+
+class BenchmarkContext:
+    """Corpus and shared, lazily built fixtures handed to the benchmark setups."""
+
+    def __init__(self, manifest: dict, work_path: str, role_kwargs=None):
+        """
+        Initialize the context.
+
+        Args:
+            manifest (dict): Manifest of the generated corpus (see SyntheticCorpusGenerator).
+            work_path (str): Scratch folder for the outputs of the benchmarks.
+            role_kwargs (dict[AnalyzerRole, dict], optional): Extra analyzer arguments per role.
+        """
+        self.manifest = manifest
+        self.repos_path = manifest["repos_path"]
+        self.oracle_path = manifest["oracle_path"]
+        self.work_path = work_path
+        self.role_kwargs = role_kwargs if role_kwargs is not None else {
+            AnalyzerRole.CONSUMER: {"rules_3": True}
+        }
+        self._analyzers = {}
+
+    def work_dir(self, name: str) -> str:
+        """Return (creating it) a scratch folder for a benchmark."""
+        path = os.path.join(self.work_path, name)
+        os.makedirs(path, exist_ok=True)
+        return path
+
+    def analyzer(self, role: AnalyzerRole) -> MLAnalyzer:
+        """Return the default analyzer of a role, with notebooks enabled and warm knowledge bases."""
+        if role not in self._analyzers:
+            analyzer = AnalyzerFactory.create_builder(role).with_notebooks(True).build()
+            analyzer.warm_up()
+            self._analyzers[role] = analyzer
+        return self._analyzers[role]
+
+    @cached_property
+    def projects(self) -> list:
+        """(repo_path, owner, name) of every project of the corpus."""
+        return list(MLAnalyzer.iter_projects(self.repos_path))
+
+    @cached_property
+    def files(self) -> list:
+        """Path of every file accepted by the scanner of at least one role."""
+        accepted = {}
+        for role in AnalyzerRole:
+            scanner = self.analyzer(role).scanner
+            for repo_path, _, _ in self.projects:
+                for path, _ in scanner.scan(repo_path):
+                    accepted[path] = None
+        return list(accepted)
+
+    @cached_property
+    def python_files(self) -> list:
+        """Accepted `.py` files."""
+        return [path for path in self.files if path.endswith(".py")]
+
+
+class BenchmarkRunner:
+    """Times the selected benchmarks and builds the report."""
+
+    SCHEMA_VERSION = 1
+
+    def __init__(self, context: BenchmarkContext, repeat: int = 5, warmup: bool = True, quiet: bool = True):
+        """
+        Initialize the runner.
+
+        Args:
+            context (BenchmarkContext): Corpus and fixtures.
+            repeat (int): Number of timed calls of every benchmark.
+            warmup (bool): Whether to make an untimed call first (fills OS and module caches).
+            quiet (bool): Whether to silence the analyzer logging during the setup and the
+                timed calls of every benchmark, so that console output does not weigh on the
+                timings or bury the report.
+        """
+        self.context = context
+        self.repeat = max(1, repeat)
+        self.warmup = warmup
+        self.quiet = quiet
+
+    @staticmethod
+    def environment() -> dict:
+        """Describe the code and machine the benchmarks run on."""
+        def git(*args):
+            try:
+                result = subprocess.run(["git", *args], capture_output=True, text=True, check=False)
+            except OSError:
+                return None
+            return result.stdout.strip() if result.returncode == 0 else None
+
+        status = git("status", "--porcelain", "--untracked-files=no")
+        return {
+            "commit": git("rev-parse", "HEAD"),
+            "dirty": bool(status) if status is not None else None,
+            "python": sys.version.split()[0],
+            "implementation": platform.python_implementation(),
+            "platform": platform.platform(),
+            "machine": platform.machine(),
+            "cpu_count": os.cpu_count(),
+        }
+
+    def time_benchmark(self, benchmark: Benchmark):
+        """
+        Set up and time a benchmark.
+
+        Returns:
+            dict | None: The timings of the benchmark, or None if its setup skipped it.
+        """
+        previous_disable = logging.root.manager.disable
+        if self.quiet:
+            logging.disable(logging.ERROR)
+        try:
+            prepared = benchmark.setup(self.context)
+            if prepared is not None:
+                function, items = prepared
+                if self.warmup:
+                    function()
+                times = []
+                for _ in range(self.repeat):
+                    start = time.perf_counter()
+                    function()
+                    times.append(time.perf_counter() - start)
+        finally:
+            logging.disable(previous_disable)
+
+        if prepared is None:
+            logger.info("Skipping benchmark %s", benchmark.name)
+            return None
+
+        best = min(times)
+        return {
+            "group": benchmark.group,
+            "unit": benchmark.unit,
+            "items": items,
+            "times": times,
+            "min": best,
+            "median": statistics.median(times),
+            "mean": statistics.fmean(times),
+            "stdev": statistics.stdev(times) if len(times) > 1 else 0.0,
+            "throughput": items / best if best > 0 else None,
+        }
+
+    def run(self, patterns=None) -> dict:
+        """
+        Run the benchmarks matching the patterns (all by default).
+
+        Returns:
+            dict: The report (schema version, date, environment, corpus, settings and results).
+        """
+        results = {}
+        for benchmark in Benchmark.selected(patterns):
+            logger.info("Benchmark: %s", benchmark.name)
+            result = self.time_benchmark(benchmark)
+            if result is not None:
+                results[benchmark.name] = result
+                logger.info(
+                    "%s: median %.4fs, min %.4fs, %s %s/s",
+                    benchmark.name, result["median"], result["min"],
+                    f"{result['throughput']:.1f}" if result["throughput"] else "-", benchmark.unit
+                )
+        return {
+            "schema_version": self.SCHEMA_VERSION,
+            "created": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "environment": self.environment(),
+            "corpus": self.context.manifest,
+            "settings": {"repeat": self.repeat, "warmup": self.warmup},
+            "results": results,
+        }
+
+
+def save_report(report: dict, path):
+    """Write a report as JSON."""
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+
+
+def load_report(path) -> dict:
+    """Read a report written by `save_report`."""
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def compare_reports(baseline: dict, candidate: dict, threshold: float = 0.10) -> list:
+    """
+    Compare the median timings of two reports.
+
+    Args:
+        baseline (dict): Reference report (e.g. of the target branch).
+        candidate (dict): Report to evaluate.
+        threshold (float): Relative slowdown above which a benchmark is a regression.
+
+    Returns:
+        list[dict]: One entry per benchmark of both reports, with the baseline and candidate
+        medians, their ratio (candidate / baseline) and a status: ``regression``,
+        ``improvement`` (faster by more than the threshold) or ``unchanged``.
+    """
+    if baseline.get("corpus", {}).get("spec") != candidate.get("corpus", {}).get("spec"):
+        logger.warning("The reports were produced on different corpus specs: timings are not comparable")
+
+    comparison = []
+    for name, result in candidate["results"].items():
+        reference = baseline["results"].get(name)
+        if reference is None:
+            continue
+        ratio = result["median"] / reference["median"] if reference["median"] > 0 else float("inf")
+        if ratio > 1 + threshold:
+            status = "regression"
+        elif ratio < 1 / (1 + threshold):
+            status = "improvement"
+        else:
+            status = "unchanged"
+        comparison.append({
+            "name": name,
+            "baseline": reference["median"],
+            "candidate": result["median"],
+            "ratio": ratio,
+            "status": status,
+        })
+    return comparison
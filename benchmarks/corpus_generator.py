@@ -0,0 +1,303 @@
+"""Deterministic generator of synthetic repository corpora for the benchmarks.
+
+SyntheticCorpusGenerator writes `<owner>/<name>` projects shaped like the ones MARK analyzes:
+Python sources (part of them importing dictionary libraries and calling their keywords),
+Jupyter notebooks, `.gitignore` files and pruned directories (``venv``, ``node_modules``),
+plus a share of pathological files (minified one-liners, generated protobuf stubs, binary
+blobs with a `.py` extension, Latin-1 sources and very long files). Libraries and keywords are
+drawn from the real `io/library_dictionary` CSVs, so the corpus exercises the same knowledge
+bases as a real run.
+
+The same CorpusSpec (including its seed) always produces the same corpus. The generator also
+writes a synthetic oracle (one CSV per role, as expected by Merger) and a `corpus.json`
+manifest describing the spec and what was generated."""
+
+import json
+import os
+import random
+
+import pandas as pd
+
+from modules.library_manager.library_dict_type import LibraryDictType
+from modules.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+class CorpusSpec:
+    """Size and content mix of a synthetic corpus."""
+
+    PRESETS = {
+        "small": {"owners": 3, "projects_per_owner": 5, "files_per_project": 10},
+        "medium": {"owners": 10, "projects_per_owner": 10, "files_per_project": 20},
+        "large": {"owners": 20, "projects_per_owner": 25, "files_per_project": 40},
+    }
+
+    def __init__(
+            self,
+            owners: int = 10,
+            projects_per_owner: int = 10,
+            files_per_project: int = 20,
+            lines_per_file: int = 80,
+            ml_project_share: float = 0.5,
+            ml_import_density: float = 0.3,
+            keyword_density: float = 0.05,
+            notebook_share: float = 0.1,
+            pathological_share: float = 0.02,
+            seed: int = 42
+    ):
+        """
+        Initialize the spec.
+
+        Args:
+            owners (int): Number of owner folders.
+            projects_per_owner (int): Number of projects of every owner.
+            files_per_project (int): Mean number of source files of a project.
+            lines_per_file (int): Mean number of lines of a source file.
+            ml_project_share (float): Share of the projects using dictionary libraries at all.
+            ml_import_density (float): Share of the source files of those projects importing
+                dictionary libraries.
+            keyword_density (float): Share of the lines of those files calling a dictionary keyword.
+            notebook_share (float): Share of the source files written as `.ipynb` notebooks.
+            pathological_share (float): Share of the source files that are pathological
+                (minified, generated, binary, Latin-1 or very long).
+            seed (int): Seed of the random generator.
+        """
+        self.owners = owners
+        self.projects_per_owner = projects_per_owner
+        self.files_per_project = files_per_project
+        self.lines_per_file = lines_per_file
+        self.ml_project_share = ml_project_share
+        self.ml_import_density = ml_import_density
+        self.keyword_density = keyword_density
+        self.notebook_share = notebook_share
+        self.pathological_share = pathological_share
+        self.seed = seed
+
+    @classmethod
+    def preset(cls, name: str, **overrides) -> "CorpusSpec":
+        """Return one of the PRESETS sizes, with some parameters overridden."""
+        if name not in cls.PRESETS:
+            raise ValueError(f"Unknown corpus preset: {name} (expected one of {sorted(cls.PRESETS)})")
+        return cls(**{**cls.PRESETS[name], **overrides})
+
+    def to_dict(self) -> dict:
+        """Return the spec as a JSON-serializable dictionary."""
+        return dict(vars(self))
+
+
+class SyntheticCorpusGenerator:
+    """Writes a synthetic corpus of repositories following a CorpusSpec."""
+
+    MANIFEST = "corpus.json"
+    PATHOLOGIES = ("minified", "generated", "binary", "latin1", "long")
+    SOURCE_DIRS = ("", "src", "src/models", "scripts", "tests", "examples")
+    FILE_STEMS = ("train", "model", "utils", "infer", "data", "main", "layers", "test_model")
+    FILLER = (
+        "x = compute(x)",
+        "def helper(value):",
+        "    return value * 2",
+        "print('step', step)",
+        "",
+        "# configuration",
+        "items = [item for item in range(10)]",
+        "if verbose:",
+        "    logger.info('done')",
+        "result = {'loss': loss, 'acc': acc}",
+    )
+
+    def __init__(self, spec: CorpusSpec, dict_types=(LibraryDictType.PRODUCER, LibraryDictType.CONSUMER)):
+        """
+        Initialize the generator.
+
+        Args:
+            spec (CorpusSpec): Size and content mix of the corpus.
+            dict_types (Iterable[LibraryDictType]): Dictionaries the libraries and keywords
+                are drawn from.
+        """
+        self.spec = spec
+        self.dict_types = list(dict_types)
+        frames = {
+            dict_type: pd.read_csv(dict_type.value).dropna(subset=["library", "Keyword"])
+            for dict_type in self.dict_types
+        }
+        self.role_libraries = {
+            dict_type: set(frame["library"]) for dict_type, frame in frames.items()
+        }
+        frame = pd.concat(frames.values(), ignore_index=True)
+        self.keywords = {
+            library: sorted(group["Keyword"].unique())
+            for library, group in frame.groupby("library")
+        }
+        self.libraries = sorted(self.keywords)
+        self.random = random.Random(spec.seed)
+        self._ml_project = False
+
+    # ---------------------------------------------------------------------
+    # File contents
+    # ---------------------------------------------------------------------
+
+    def _import_lines(self, libraries) -> list:
+        templates = (
+            "import {0}",
+            "import {0} as lib_{1}",
+            "from {0} import core",
+            "from {0}.sub import thing",
+            "    import {0}",
+        )
+        return [
+            self.random.choice(templates).format(library, index)
+            for index, library in enumerate(libraries)
+        ]
+
+    def _code_lines(self, libraries, count) -> list:
+        """Filler code in which some lines call keywords of the imported libraries."""
+        lines = []
+        for _ in range(count):
+            if libraries and self.random.random() < self.spec.keyword_density:
+                keyword = self.random.choice(self.keywords[self.random.choice(libraries)])
+                call = keyword if keyword.endswith("(") else f"{keyword}("
+                lines.append(f"out = model{call}data)")
+            else:
+                lines.append(self.random.choice(self.FILLER))
+        return lines
+
+    def _source_lines(self) -> tuple:
+        """Return the lines of a source file and the dictionary libraries it imports."""
+        count = max(1, int(self.random.gauss(self.spec.lines_per_file, self.spec.lines_per_file / 3)))
+        libraries = []
+        if self._ml_project and self.random.random() < self.spec.ml_import_density:
+            libraries = self.random.sample(self.libraries, self.random.randint(1, 3))
+        return self._import_lines(libraries) + self._code_lines(libraries, count), libraries
+
+    @staticmethod
+    def _notebook(lines) -> bytes:
+        """Build a notebook splitting the lines into code cells, with an output and a markdown cell."""
+        cells = [{"cell_type": "markdown", "metadata": {}, "source": ["# Experiment\n"]}]
+        for start in range(0, len(lines), 15):
+            chunk = lines[start:start + 15]
+            cells.append({
+                "cell_type": "code",
+                "execution_count": len(cells),
+                "metadata": {},
+                "outputs": [{"output_type": "stream", "name": "stdout", "text": ["ok\n"] * 20}],
+                "source": [f"{line}\n" for line in chunk[:-1]] + chunk[-1:],
+            })
+        notebook = {"cells": cells, "metadata": {}, "nbformat": 4, "nbformat_minor": 5}
+        return json.dumps(notebook, indent=1).encode("utf-8")
+
+    def _pathological(self, kind) -> tuple:
+        """Return the bytes of a pathological file and the dictionary libraries it imports."""
+        if kind == "minified":
+            return ("data = [" + ",".join(str(i) for i in range(20000)) + "]\n").encode("ascii"), []
+        if kind == "generated":
+            lines = ["# Generated by the protocol buffer compiler.  DO NOT EDIT!"]
+            lines += [f"_DESCRIPTOR_{i} = _descriptor.FieldDescriptor(name='f{i}')" for i in range(2000)]
+            return ("\n".join(lines) + "\n").encode("ascii"), []
+        if kind == "binary":
+            return self.random.randbytes(64 * 1024), []
+        if kind == "latin1":
+            lines, libraries = self._source_lines()
+            return ("\n".join(lines + ["label = 'café'"]) + "\n").encode("latin-1"), libraries
+        lines, libraries = self._source_lines()
+        return ("\n".join(lines * 50) + "\n").encode("utf-8"), libraries
+
+    # ---------------------------------------------------------------------
+    # Corpus
+    # ---------------------------------------------------------------------
+
+    def _write(self, path, data: bytes, stats):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "wb") as f:
+            f.write(data)
+        stats["files"] += 1
+        stats["bytes"] += len(data)
+
+    def _project(self, root, stats) -> set:
+        """Write one project and return the dictionary libraries imported by its analyzed files."""
+        imported = set()
+        self._ml_project = self.random.random() < self.spec.ml_project_share
+        self._write(os.path.join(root, "README.md"), b"# Synthetic project\n", stats)
+        self._write(os.path.join(root, ".gitignore"), b"build/\n*.log\n", stats)
+        file_count = max(
+            1, int(self.random.gauss(self.spec.files_per_project, self.spec.files_per_project / 4))
+        )
+        for index in range(file_count):
+            folder = os.path.join(root, self.random.choice(self.SOURCE_DIRS))
+            stem = f"{self.random.choice(self.FILE_STEMS)}{index}"
+            roll = self.random.random()
+            if roll < self.spec.pathological_share:
+                kind = self.random.choice(self.PATHOLOGIES)
+                data, libraries = self._pathological(kind)
+                self._write(os.path.join(folder, f"{stem}.py"), data, stats)
+                stats[f"pathological_{kind}"] += 1
+            elif roll < self.spec.pathological_share + self.spec.notebook_share:
+                lines, libraries = self._source_lines()
+                self._write(os.path.join(folder, f"{stem}.ipynb"), self._notebook(lines), stats)
+                stats["notebooks"] += 1
+            else:
+                lines, libraries = self._source_lines()
+                data = ("\n".join(lines) + "\n").encode("utf-8")
+                self._write(os.path.join(folder, f"{stem}.py"), data, stats)
+                stats["sources"] += 1
+            imported.update(libraries)
+
+        # Directories the scanner prunes: their files must never be analyzed.
+        for pruned in ("venv/lib/site-packages/torch", "node_modules/pkg", "build"):
+            lines, _ = self._source_lines()
+            data = ("\n".join(lines) + "\n").encode("utf-8")
+            self._write(os.path.join(root, pruned, "module.py"), data, stats)
+            stats["pruned_files"] += 1
+        return imported
+
+    def generate(self, root) -> dict:
+        """
+        Write the corpus, its oracle and its manifest.
+
+        Args:
+            root (str): Output folder; the projects are written to ``<root>/repos``, the oracle
+                to ``<root>/oracle`` and the manifest to ``<root>/corpus.json``.
+
+        Returns:
+            dict: The manifest (spec, paths and counts of the generated files).
+        """
+        self.random.seed(self.spec.seed)
+        repos_path = os.path.join(root, "repos")
+        oracle_path = os.path.join(root, "oracle")
+        os.makedirs(os.path.join(oracle_path, "verifying"), exist_ok=True)
+
+        stats = dict.fromkeys(
+            ["projects", "files", "bytes", "sources", "notebooks", "pruned_files"]
+            + [f"pathological_{kind}" for kind in self.PATHOLOGIES], 0
+        )
+        oracle = []
+        for owner in range(self.spec.owners):
+            for project in range(self.spec.projects_per_owner):
+                name = f"owner{owner:03d}/repo{project:03d}"
+                oracle.append((name, self._project(os.path.join(repos_path, name), stats)))
+                stats["projects"] += 1
+
+        for dict_type in self.dict_types:
+            # A project is labelled ML for a role when it imports one of the role libraries.
+            role = dict_type.name.lower()
+            libraries = self.role_libraries[dict_type]
+            pd.DataFrame({
+                "ProjectName": [name for name, _ in oracle],
+                f"Is_Real_ML_{role}": [
+                    "Yes" if imported & libraries else "No" for _, imported in oracle
+                ],
+            }).to_csv(os.path.join(oracle_path, f"oracle_{role}.csv"), index=False)
+
+        manifest = {
+            "spec": self.spec.to_dict(),
+            "repos_path": repos_path,
+            "oracle_path": oracle_path,
+            "stats": stats,
+        }
+        with open(os.path.join(root, self.MANIFEST), "w", encoding="utf-8") as f:
+            json.dump(manifest, f, indent=2)
+        logger.info(
+            "Generated %d projects (%d files, %d bytes) in %s",
+            stats["projects"], stats["files"], stats["bytes"], repos_path
+        )
+        return manifest
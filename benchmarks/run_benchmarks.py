@@ -0,0 +1,140 @@
+"""Command line entry point of the MARK benchmarks.
+
+Run from the repository root (the dictionaries are resolved relative to it):
+
+    python -m benchmarks.run_benchmarks run --preset small --repeat 5 --output bench/HEAD.json
+    python -m benchmarks.run_benchmarks run --only "keywords_*" "library_*" --files-per-project 50
+    python -m benchmarks.run_benchmarks compare bench/main.json bench/HEAD.json --threshold 0.1
+
+`run` generates the synthetic corpus (reused across runs with the same spec), times the
+selected benchmarks and writes a JSON report. `compare` prints the median ratio of every
+benchmark of two reports and exits with status 1 if one of them regressed beyond the threshold.
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import sys
+import tempfile
+
+from benchmarks.benchmark_suite import (
+    Benchmark, BenchmarkContext, BenchmarkRunner, compare_reports, load_report, save_report
+)
+from benchmarks.corpus_generator import CorpusSpec, SyntheticCorpusGenerator
+# Registers the benchmarks.
+from benchmarks import stages  # pylint: disable=unused-import
+from modules.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+REPOSITORY_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def prepare_corpus(spec: CorpusSpec, corpus_root) -> dict:
+    """Generate the corpus of a spec, unless it was already generated in `corpus_root`."""
+    digest = hashlib.sha256(json.dumps(spec.to_dict(), sort_keys=True).encode("utf-8")).hexdigest()
+    root = os.path.join(corpus_root, f"corpus_{digest[:12]}")
+    manifest_path = os.path.join(root, SyntheticCorpusGenerator.MANIFEST)
+    if os.path.exists(manifest_path):
+        with open(manifest_path, encoding="utf-8") as f:
+            manifest = json.load(f)
+        if manifest.get("spec") == spec.to_dict():
+            logger.info("Reusing corpus %s", root)
+            return manifest
+    return SyntheticCorpusGenerator(spec).generate(root)
+
+
+def run(args) -> int:
+    """Generate the corpus, run the benchmarks and write the report."""
+    overrides = {
+        name: getattr(args, name)
+        for name in (
+            "owners", "projects_per_owner", "files_per_project", "lines_per_file", "ml_project_share",
+            "ml_import_density", "keyword_density", "notebook_share", "pathological_share", "seed"
+        )
+        if getattr(args, name) is not None
+    }
+    spec = CorpusSpec.preset(args.preset, **overrides)
+    corpus_root = args.corpus_dir or os.path.join(tempfile.gettempdir(), "mark_benchmarks")
+    manifest = prepare_corpus(spec, corpus_root)
+
+    with tempfile.TemporaryDirectory(prefix="mark_bench_") as work_path:
+        context = BenchmarkContext(manifest, work_path)
+        runner = BenchmarkRunner(context, repeat=args.repeat, warmup=not args.no_warmup, quiet=not args.verbose)
+        report = runner.run(args.only)
+
+    if not report["results"]:
+        logger.error("No benchmark matches %s", args.only)
+        return 1
+    if args.output:
+        save_report(report, args.output)
+        logger.info("Benchmark report written to %s", args.output)
+    else:
+        json.dump(report, sys.stdout, indent=2)
+        sys.stdout.write("\n")
+    return 0
+
+
+def compare(args) -> int:
+    """Print the comparison of two reports; exit status 1 on a regression."""
+    comparison = compare_reports(load_report(args.baseline), load_report(args.candidate), args.threshold)
+    print(f"{'benchmark':<40} {'baseline':>10} {'candidate':>10} {'ratio':>7}  status")
+    for entry in comparison:
+        print(
+            f"{entry['name']:<40} {entry['baseline']:>10.4f} {entry['candidate']:>10.4f} "
+            f"{entry['ratio']:>7.3f}  {entry['status']}"
+        )
+    return 1 if any(entry["status"] == "regression" for entry in comparison) else 0
+
+
+def parse_args(argv=None):
+    """Parse the command line."""
+    parser = argparse.ArgumentParser(description="MARK performance benchmarks")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = commands.add_parser("run", help="generate the corpus and run the benchmarks")
+    run_parser.add_argument("--preset", default="small", choices=sorted(CorpusSpec.PRESETS))
+    run_parser.add_argument("--owners", type=int)
+    run_parser.add_argument("--projects-per-owner", type=int)
+    run_parser.add_argument("--files-per-project", type=int)
+    run_parser.add_argument("--lines-per-file", type=int)
+    run_parser.add_argument("--ml-project-share", type=float)
+    run_parser.add_argument("--ml-import-density", type=float)
+    run_parser.add_argument("--keyword-density", type=float)
+    run_parser.add_argument("--notebook-share", type=float)
+    run_parser.add_argument("--pathological-share", type=float)
+    run_parser.add_argument("--seed", type=int)
+    run_parser.add_argument("--corpus-dir", help="where generated corpora are kept (default: temp dir)")
+    run_parser.add_argument("--repeat", type=int, default=5, help="timed calls per benchmark")
+    run_parser.add_argument("--no-warmup", action="store_true", help="skip the untimed first call")
+    run_parser.add_argument(
+        "--only", nargs="+", metavar="PATTERN",
+        help=f"benchmarks to run (glob patterns); available: {', '.join(b.name for b in Benchmark.selected())}"
+    )
+    run_parser.add_argument("--output", help="JSON report path (default: stdout)")
+    run_parser.add_argument("--verbose", action="store_true", help="keep the analyzer logging on")
+    run_parser.set_defaults(handler=run)
+
+    compare_parser = commands.add_parser("compare", help="compare two benchmark reports")
+    compare_parser.add_argument("baseline")
+    compare_parser.add_argument("candidate")
+    compare_parser.add_argument(
+        "--threshold", type=float, default=0.10, help="relative slowdown counted as a regression"
+    )
+    compare_parser.set_defaults(handler=compare)
+    return parser.parse_args(argv)
+
+
+def main(argv=None) -> int:
+    args = parse_args(argv)
+    # Paths given on the command line are relative to the caller's directory.
+    for name in ("output", "corpus_dir", "baseline", "candidate"):
+        if getattr(args, name, None):
+            setattr(args, name, os.path.abspath(getattr(args, name)))
+    os.chdir(REPOSITORY_ROOT)
+    return args.handler(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,315 @@
+"""Benchmarks of the MARK pipeline, stage by stage and end to end.
+
+Every stage benchmark isolates one step on the files of the synthetic corpus: the setup does
+the work of the previous stages, so only the stage itself is timed. The keyword extraction
+benchmark is registered once per KeywordExtractionStrategy implementation, so strategies are
+compared on the same inputs. The end-to-end benchmarks run the facades on the whole corpus,
+as main.py does, fully and in decision-only mode; the decision-only mode is also run on the
+projects packed as tarballs, zip files and bare repositories, checking that every source
+reaches the decision of the checkout."""
+
+import os
+import shutil
+import subprocess
+
+import pandas as pd
+
+from benchmarks.benchmark_suite import Benchmark
+from modules.analyzer.analyzer_factory import AnalyzerFactory
+from modules.analyzer.ml_analysis_facade import MLAnalysisFacade, MultiRoleAnalysisFacade
+from modules.analyzer.ml_roles import AnalyzerRole
+from modules.keyword_extractor.keyword_extractor_base import KeywordExtractionStrategy
+# Import the implementations so that every strategy gets its benchmark.
+from modules.keyword_extractor import keyword_extractor_default  # pylint: disable=unused-import
+from modules.keyword_extractor import keyword_extractor_multi_pattern  # pylint: disable=unused-import
+from modules.library_manager.library_extractor import LibraryExtractor
+from modules.library_manager.library_filter import LibraryFilter
+from modules.oracle.merge import Merger
+from modules.scanner.content_screen import ContentScreen
+from modules.scanner.project_source.project_source_base import ProjectSource
+from modules.scanner.source_file import SourceFile
+from modules.scanner.source_reader import SourceReader
+from modules.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+# -------------------------------------------------------------------------
+# Stages
+# -------------------------------------------------------------------------
+
+@Benchmark.register("scan", unit="projects")
+def scan(context):
+    """Walk every project with the scanner of every role (directory pruning and `.gitignore`)."""
+    scanners = [context.analyzer(role).scanner for role in AnalyzerRole]
+    projects = [repo_path for repo_path, _, _ in context.projects]
+
+    def run():
+        for scanner in scanners:
+            for repo_path in projects:
+                for _ in scanner.scan(repo_path):
+                    pass
+
+    return run, len(projects)
+
+
+@Benchmark.register("read")
+def read(context):
+    """Read and decode every accepted file into a SourceFile."""
+    reader = SourceReader()
+    files = context.files
+
+    def run():
+        for path in files:
+            source = reader.read(path)
+            if source is not None:
+                _ = source.lines
+                source.close()
+
+    return run, len(files)
+
+
+@Benchmark.register("read_screened")
+def read_screened(context):
+    """Memory-map every accepted file and screen out binary, generated and minified ones."""
+    reader = SourceReader(memory_map=True, screen=ContentScreen())
+    files = context.files
+
+    def run():
+        for path in files:
+            source = reader.read(path, [])
+            if source is not None:
+                source.close()
+
+    return run, len(files)
+
+
+@Benchmark.register("library_extractor")
+def library_extractor(context):
+    """Extract the imports of every Python file with LibraryExtractor."""
+    files = context.python_files
+
+    def run():
+        for path in files:
+            LibraryExtractor.get_libraries_from_file(path)
+
+    return run, len(files)
+
+
+def _register_library_filter(role: AnalyzerRole):
+    @Benchmark.register(f"library_filter_{role.value}")
+    def library_filter(context):
+        """Filter the dictionary libraries used by every Python file (import prefilter and trie)."""
+        analyzer = context.analyzer(role)
+        knowledge_base = analyzer.knowledge_base(analyzer.library_dicts[0])
+        files = context.python_files
+
+        def run():
+            for path in files:
+                LibraryFilter.filter_used_libraries(path, knowledge_base)
+
+        return run, len(files)
+
+    return library_filter
+
+
+for _role in AnalyzerRole:
+    _register_library_filter(_role)
+
+
+def _strategies(base=KeywordExtractionStrategy):
+    """Return every concrete KeywordExtractionStrategy subclass."""
+    for subclass in base.__subclasses__():
+        if not getattr(subclass, "__abstractmethods__", None):
+            yield subclass
+        yield from _strategies(subclass)
+
+
+def _register_keyword_strategy(strategy_class):
+    @Benchmark.register(f"keywords_{strategy_class.__name__}")
+    def keywords(context):
+        """Extract the keywords of the producer dictionary from the files importing its libraries."""
+        analyzer = context.analyzer(AnalyzerRole.PRODUCER)
+        knowledge_base = analyzer.knowledge_base(analyzer.library_dicts[0])
+        inputs = []
+        for path in context.files:
+            source = SourceFile.open(path)
+            related_dict = LibraryFilter.filter_source_libraries(source, knowledge_base)
+            if related_dict.empty:
+                source.close()
+                continue
+            # Decode ahead of time: only the matching is timed.
+            _ = source.lines
+            inputs.append((source, related_dict))
+        strategy = strategy_class()
+
+        def run():
+            for source, related_dict in inputs:
+                strategy.extract_keywords_from_source(source, related_dict)
+
+        return run, len(inputs)
+
+    return keywords
+
+
+for _strategy_class in sorted(set(_strategies()), key=lambda cls: cls.__name__):
+    _register_keyword_strategy(_strategy_class)
+
+
+def _register_merger(role: AnalyzerRole):
+    @Benchmark.register(f"merger_{role.value}", unit="projects")
+    def merger(context):
+        """Join a results file with the oracle and compute the metrics (Merger.reporting)."""
+        role_str = role.value
+        oracle = pd.read_csv(os.path.join(context.oracle_path, f"oracle_{role_str}.csv"))
+        detected = oracle[oracle[f"Is_Real_ML_{role_str}"] == "Yes"]["ProjectName"]
+        # A results file with a few evidence lines per detected project, as written by a run.
+        rows = [
+            {
+                "ProjectName": project_name,
+                f"Is ML {role_str}": "Yes",
+                "libraries": "torch",
+                "where": f"{context.repos_path}/{project_name}/src/train{index}.py",
+                "keyword": ".fit(",
+                "line_number": index + 1,
+            }
+            for project_name in detected for index in range(5)
+        ]
+        run_folder = context.work_dir(os.path.join("merger", role_str, "run_1"))
+        pd.DataFrame(rows).to_csv(os.path.join(run_folder, "results.csv"), index=False)
+        oracle_path = context.work_dir(os.path.join("merger_oracle", role_str))
+        shutil.copy(os.path.join(context.oracle_path, f"oracle_{role_str}.csv"), oracle_path)
+        os.makedirs(os.path.join(oracle_path, "verifying"), exist_ok=True)
+        instance = Merger(role_str, oracle_path)
+        base_output_path = os.path.dirname(os.path.dirname(run_folder))
+
+        def run():
+            instance.reporting(base_output_path, "run_1", "results.csv")
+
+        return run, len(oracle)
+
+    return merger
+
+
+for _role in AnalyzerRole:
+    _register_merger(_role)
+
+
+# -------------------------------------------------------------------------
+# End to end
+# -------------------------------------------------------------------------
+
+def _register_end_to_end(role: AnalyzerRole):
+    @Benchmark.register(f"end_to_end_{role.value}", group="end_to_end", unit="projects")
+    def end_to_end(context):
+        """Analyze the whole corpus for one role with MLAnalysisFacade (serial, no cache)."""
+        io_path = context.work_dir(os.path.join("end_to_end", role.value))
+        facade = MLAnalysisFacade(context.repos_path, io_path, role, include_notebooks=True)
+        kwargs = context.role_kwargs.get(role, {})
+
+        def run():
+            facade.run_analysis(**kwargs)
+
+        return run, len(context.projects)
+
+    return end_to_end
+
+
+for _role in AnalyzerRole:
+    _register_end_to_end(_role)
+
+
+def _register_end_to_end_decision(role: AnalyzerRole):
+    @Benchmark.register(f"end_to_end_decision_{role.value}", group="end_to_end", unit="projects")
+    def end_to_end_decision(context):
+        """Classify the whole corpus for one role in decision-only mode (serial, no cache)."""
+        io_path = context.work_dir(os.path.join("end_to_end_decision", role.value))
+        facade = MLAnalysisFacade(context.repos_path, io_path, role, include_notebooks=True)
+        kwargs = context.role_kwargs.get(role, {})
+
+        def run():
+            facade.run_analysis(decision_only=True, **kwargs)
+
+        return run, len(context.projects)
+
+    return end_to_end_decision
+
+
+for _role in AnalyzerRole:
+    _register_end_to_end_decision(_role)
+
+
+def _pack_project(repo_path: str, folder: str) -> list:
+    """Pack a checkout as a tarball, a zip file and (if git is available) a bare repository."""
+    name = os.path.basename(repo_path)
+    packed = [
+        shutil.make_archive(os.path.join(folder, name), "gztar", os.path.dirname(repo_path), name),
+        shutil.make_archive(os.path.join(folder, name), "zip", os.path.dirname(repo_path), name),
+    ]
+    work_tree = os.path.join(folder, f"{name}_work")
+    bare = os.path.join(folder, f"{name}.git")
+    shutil.copytree(repo_path, work_tree)
+    try:
+        for args in (
+                ["init", "-q", work_tree],
+                ["-C", work_tree, "add", "-A"],
+                ["-C", work_tree, "-c", "user.name=bench", "-c", "user.email=bench@localhost",
+                 "commit", "-q", "-m", "corpus"],
+                ["clone", "-q", "--bare", work_tree, bare],
+        ):
+            subprocess.run(["git", *args], capture_output=True, check=True)
+        packed.append(bare)
+    except (OSError, subprocess.CalledProcessError) as e:
+        logger.warning("Bare repository of %s not created: %s", name, e)
+    finally:
+        shutil.rmtree(work_tree, ignore_errors=True)
+    return packed
+
+
+def _register_end_to_end_decision_sources(role: AnalyzerRole):
+    @Benchmark.register(f"end_to_end_decision_sources_{role.value}", group="end_to_end", unit="projects")
+    def end_to_end_decision_sources(context):
+        """Classify the corpus packed as archives and bare repositories in decision-only mode.
+
+        The setup checks that every packed project is classified as its checkout is.
+        """
+        work_path = os.path.join("end_to_end_decision_sources", role.value)
+        output_folder = context.work_dir(os.path.join(work_path, "output"))
+        analyzer = AnalyzerFactory.create_builder(role).with_notebooks(True).with_decision_only().build()
+        kwargs = context.role_kwargs.get(role, {})
+        projects = []
+        for repo_path, owner, name in context.projects:
+            expected = bool(analyzer.analyze_project(repo_path, owner, name, output_folder, **kwargs))
+            folder = context.work_dir(os.path.join(work_path, "repos", owner))
+            for location in _pack_project(repo_path, folder):
+                source_class = ProjectSource.source_class(location)
+                packed_name = source_class.project_name(os.path.basename(location))
+                if bool(analyzer.analyze_project(location, owner, packed_name, output_folder, **kwargs)) != expected:
+                    raise RuntimeError(f"{location} is not classified as {repo_path} in decision-only mode")
+                projects.append((location, owner, packed_name))
+
+        def run():
+            for location, owner, name in projects:
+                analyzer.analyze_project(location, owner, name, output_folder, **kwargs)
+
+        return run, len(projects)
+
+    return end_to_end_decision_sources
+
+
+for _role in AnalyzerRole:
+    _register_end_to_end_decision_sources(_role)
+
+
+@Benchmark.register("end_to_end_fused", group="end_to_end", unit="projects")
+def end_to_end_fused(context):
+    """Analyze the whole corpus for every role in one walk with MultiRoleAnalysisFacade."""
+    io_path = context.work_dir(os.path.join("end_to_end", "fused"))
+    facade = MultiRoleAnalysisFacade(
+        context.repos_path, io_path, list(AnalyzerRole), include_notebooks=True
+    )
+
+    def run():
+        facade.run_analysis(context.role_kwargs)
+
+    return run, len(context.projects)
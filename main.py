@@ -1,14 +1,18 @@
 """Main script to orchestrate the ML analysis pipeline."""
 from operator import truediv
 from pathlib import Path
-from modules.analyzer.ml_analysis_facade import MLAnalysisFacade
+from modules.analyzer.execution import ExecutionMode
+from modules.analyzer.result_writer import ResultFormat
+from modules.analyzer.ml_analysis_facade import MultiRoleAnalysisFacade
 from modules.analyzer.ml_roles import AnalyzerRole
-from modules.cloner.cloner import RepoCloner
+from modules.cloner.cloner import CloneMode, RepoCloner
 from modules.cloner.cloning_check import RepoInspector
 from modules.library_manager.library_dict_type import LibraryDictType
 from modules.oracle.matching.results_analysis import ResultAnalysis
+from modules.oracle.batch_evaluation import BatchEvaluator
 from modules.oracle.merge import Merger
-from modules.utils.logger import get_logger
+from modules.utils.logger import configure_logging, get_logger
+from modules.utils.metrics import Metrics
 from modules.analyzer.analyzer_factory import AnalyzerFactory #required import
 from modules.analyzer.builder.consumer_analyzer_builder import ConsumerAnalyzerBuilder #required import
 from modules.analyzer.builder.producer_analyzer_builder import ProducerAnalyzerBuilder #required import
@@ -23,6 +27,19 @@ REPOSITORY_PATH = IO_PATH / "repos"
 ANALYZER_PATH = Path("./modules/analyzer")
 ORACLE_PATH = Path("./modules/oracle")
 N_REPOS = 50
+EXECUTION_MODE = ExecutionMode.PROCESS
+MAX_WORKERS = None  # defaults to the number of CPUs
+RESULT_CACHE_PATH = IO_PATH / "cache" / "file_results.sqlite"
+INCLUDE_NOTEBOOKS = False  # also analyze the code cells of .ipynb notebooks
+BYTES_SCANNING = False  # memory-mapped matching; skips binary/generated/oversized files
+RESULT_FORMAT = ResultFormat.CSV  # PARQUET: compressed columnar results (requires pyarrow)
+EVIDENCE_STORE_PATH = None  # e.g. IO_PATH / "evidence.sqlite": queryable evidence, reused for unchanged projects
+DECISION_ONLY = False  # only the project-level Yes/No: stop at the first evidence of every project
+CLONE_MODE = CloneMode.SHALLOW  # SPARSE: blob-less clone checking out only the analyzed files
+METRICS = False  # per-stage counters and latency histograms, exported at the end of the run
+METRICS_PATH = IO_PATH / "metrics"  # metrics.json and metrics.prom (Prometheus textfile)
+STRUCTURED_LOG = False  # write the run log as JSON lines (logs/mark_2_<timestamp>.jsonl)
+MATCH_LOG_SAMPLING = {"every": 1, "per_second": None}  # e.g. {"every": 100}: log one file with matches in 100
 
 # Steps
 CLONER = True
@@ -30,10 +47,24 @@ CLONER_CHECK = True
 ANALYSIS = True
 MERGER = True
 RESULT_ANALYSIS = True
+BATCH_EVALUATION = False  # compare every output/<role>/<role>_N run against the oracle
 
 
 def main() -> None:
-
+    configure_logging(structured=STRUCTURED_LOG, samplers={"matches": MATCH_LOG_SAMPLING})
+    Metrics.enable(METRICS)
+    facade = MultiRoleAnalysisFacade(
+        input_path=REPOSITORY_PATH,
+        io_path=IO_PATH,
+        roles=[AnalyzerRole.PRODUCER, AnalyzerRole.CONSUMER],
+        execution_mode=EXECUTION_MODE,
+        max_workers=MAX_WORKERS,
+        result_cache_path=RESULT_CACHE_PATH,
+        include_notebooks=INCLUDE_NOTEBOOKS,
+        bytes_scanning=BYTES_SCANNING,
+        result_format=RESULT_FORMAT,
+        evidence_store_path=EVIDENCE_STORE_PATH
+    )
 
     # === CLONAZIONE DEI REPOSITORY ===
     if CLONER:
@@ -41,7 +72,9 @@ def main() -> None:
         cloner = RepoCloner(
             input_path=PROJECT_LIST_PATH,
             output_path=REPOSITORY_PATH,
-            n_repos=N_REPOS
+            n_repos=N_REPOS,
+            clone_mode=CLONE_MODE,
+            sparse_patterns=facade.checkout_patterns() if CLONE_MODE is CloneMode.SPARSE else None
         )
         cloner.clone_all()
 
@@ -57,19 +90,12 @@ def main() -> None:
     # === ANALISI ML ===
     if ANALYSIS:
         logger.info("*** INIZIO L'ANALISI ***")
-        producer_facade = MLAnalysisFacade(
-            input_path=REPOSITORY_PATH,
-            io_path=IO_PATH,
-            role=AnalyzerRole.PRODUCER
-        )
-        dir_producer = producer_facade.run_analysis()
-
-        consumer_facade = MLAnalysisFacade(
-            input_path=REPOSITORY_PATH,
-            io_path=IO_PATH,
-            role=AnalyzerRole.CONSUMER
+        result_dirs = facade.run_analysis(
+            role_kwargs={AnalyzerRole.CONSUMER: {"rules_3": True}},
+            decision_only=DECISION_ONLY
         )
-        dir_consumer = consumer_facade.run_analysis(rules_3=True)
+        dir_producer = result_dirs[AnalyzerRole.PRODUCER]
+        dir_consumer = result_dirs[AnalyzerRole.CONSUMER]
 
     # === MERGE DEI RISULTATI ===
     if MERGER:
@@ -81,7 +107,7 @@ def main() -> None:
         producer_merger.reporting(
             base_output_path=OUTPUT_PATH,
             dir_result=dir_producer,
-            file_name="results.csv"
+            file_name=f"results{RESULT_FORMAT.extension}"
         )
 
         consumer_merger = Merger(
@@ -91,7 +117,7 @@ def main() -> None:
         consumer_merger.reporting(
             base_output_path=OUTPUT_PATH,
             dir_result=dir_consumer,
-            file_name="results.csv"
+            file_name=f"results{RESULT_FORMAT.extension}"
         )
 
     # === ANALISI FINALE DEI RISULTATI ===
@@ -112,6 +138,20 @@ def main() -> None:
         producer_analysis.start_analysis()
         consumer_analysis.start_analysis()
 
+    # === CONFRONTO DI TUTTE LE ESECUZIONI ===
+    if BATCH_EVALUATION:
+        logger.info("*** INIZIO LA BATCH EVALUATION ***")
+        for role in (AnalyzerRole.PRODUCER, AnalyzerRole.CONSUMER):
+            BatchEvaluator(
+                column_name=role.value,
+                oracle_path=ORACLE_PATH,
+                base_output_path=OUTPUT_PATH,
+                file_name=f"results{RESULT_FORMAT.extension}"
+            ).reporting()
+
+    if METRICS:
+        Metrics.export(METRICS_PATH)
+
 
 if __name__ == "__main__":
     main()
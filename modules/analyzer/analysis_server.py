@@ -0,0 +1,194 @@
+"""HTTP transport of the AnalysisService, on a localhost port or a Unix socket.
+
+Endpoints (JSON in and out):
+    POST /classify  a job, e.g. ``{"path": "io/repos/owner/name", "roles": ["consumer"],
+                    "options": {"rules_3": true}, "decision_only": false}``; answers the result
+                    (200), or an error: 400 malformed job, 404 missing project, 413 body too
+                    large, 503 too many pending jobs (with ``Retry-After``), 500 analysis failure.
+    POST /reload    rebuild the analyzers (dictionary changes are also picked up by themselves).
+    GET  /health    configuration and load of the service.
+    GET  /metrics   pipeline Metrics in the Prometheus text format (when enabled).
+
+Every connection is served on its own thread; the service bounds the jobs being analyzed."""
+
+import json
+import os
+import socketserver
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from modules.analyzer.analysis_service import AnalysisService, ServiceBusyError
+from modules.utils.logger import get_logger
+from modules.utils.metrics import Metrics
+
+logger = get_logger(__name__)
+
+
+class AnalysisRequestHandler(BaseHTTPRequestHandler):
+    """Serves the requests of one connection against the AnalysisService of the server."""
+
+    server_version = "MARK/2.0"
+    protocol_version = "HTTP/1.1"
+    # Largest accepted request body, in bytes.
+    MAX_BODY = 1 << 20
+    # Seconds a client is asked to wait after a 503.
+    RETRY_AFTER = 1
+
+    def do_GET(self):  # pylint: disable=invalid-name
+        """Serve /health and /metrics."""
+        if self.path == "/health":
+            self._send_json(HTTPStatus.OK, self.server.service.status())
+        elif self.path == "/metrics" and Metrics.enabled:
+            self._send(HTTPStatus.OK, Metrics.to_prometheus().encode("utf-8"), "text/plain; version=0.0.4")
+        else:
+            self._send_json(HTTPStatus.NOT_FOUND, {"error": f"Unknown endpoint: {self.path}"})
+
+    def do_POST(self):  # pylint: disable=invalid-name
+        """Serve /classify and /reload."""
+        if self.path not in ("/classify", "/reload"):
+            self._discard_body()
+            self._send_json(HTTPStatus.NOT_FOUND, {"error": f"Unknown endpoint: {self.path}"})
+            return
+        try:
+            job = self._read_json()
+        except ValueError as error:
+            self._send_json(HTTPStatus.BAD_REQUEST, {"error": str(error)})
+            return
+        if job is None:
+            return
+
+        service = self.server.service
+        if self.path == "/reload":
+            try:
+                service.reload()
+            except Exception as error:  # pylint: disable=broad-exception-caught
+                logger.exception("Reload failed")
+                self._send_json(HTTPStatus.INTERNAL_SERVER_ERROR, {"error": f"Reload failed: {error}"})
+            else:
+                self._send_json(HTTPStatus.OK, service.status())
+            return
+        try:
+            result = service.submit_job(job)
+        except ServiceBusyError as error:
+            self._send_json(
+                HTTPStatus.SERVICE_UNAVAILABLE, {"error": str(error)},
+                {"Retry-After": str(self.RETRY_AFTER)}
+            )
+        except FileNotFoundError as error:
+            self._send_json(HTTPStatus.NOT_FOUND, {"error": str(error)})
+        except ValueError as error:
+            self._send_json(HTTPStatus.BAD_REQUEST, {"error": str(error)})
+        except Exception as error:  # pylint: disable=broad-exception-caught
+            logger.exception("Job failed: %s", job)
+            self._send_json(HTTPStatus.INTERNAL_SERVER_ERROR, {"error": f"Analysis failed: {error}"})
+        else:
+            self._send_json(HTTPStatus.OK, result)
+
+    def _body_length(self) -> int:
+        """Length of the request body; the connection is closed if it cannot be determined."""
+        try:
+            length = int(self.headers.get("Content-Length") or 0)
+        except ValueError as error:
+            self.close_connection = True
+            raise ValueError("Invalid Content-Length") from error
+        if length < 0:
+            self.close_connection = True
+            raise ValueError("Invalid Content-Length")
+        return length
+
+    def _discard_body(self):
+        """Skip the body of a request that is not served, so that it is not read as the next request."""
+        try:
+            length = self._body_length()
+        except ValueError:
+            return
+        if length > self.MAX_BODY:
+            self.close_connection = True
+        elif length:
+            self.rfile.read(length)
+
+    def _read_json(self):
+        """Read the JSON body of the request (None if a 413 was already answered)."""
+        length = self._body_length()
+        if length > self.MAX_BODY:
+            self._send_json(HTTPStatus.REQUEST_ENTITY_TOO_LARGE, {"error": "Request body too large"})
+            self.close_connection = True
+            return None
+        if not length:
+            return {}
+        try:
+            return json.loads(self.rfile.read(length))
+        except json.JSONDecodeError as error:
+            raise ValueError(f"Invalid JSON: {error}") from error
+
+    def _send_json(self, status: HTTPStatus, payload, headers=None):
+        self._send(status, json.dumps(payload).encode("utf-8"), "application/json", headers)
+
+    def _send(self, status: HTTPStatus, body: bytes, content_type: str, headers=None):
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def address_string(self):
+        # Unix socket clients have no address.
+        return self.client_address[0] if self.client_address else "unix"
+
+    def log_message(self, format, *args):  # pylint: disable=redefined-builtin
+        logger.debug("%s %s", self.address_string(), format % args)
+
+
+class AnalysisHTTPServer(ThreadingHTTPServer):
+    """HTTP server of an AnalysisService on a TCP address."""
+
+    daemon_threads = True
+
+    def __init__(self, address, service: AnalysisService):
+        super().__init__(address, AnalysisRequestHandler)
+        self.service = service
+
+
+class AnalysisUnixServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    """HTTP server of an AnalysisService on a Unix socket."""
+
+    daemon_threads = True
+
+    def __init__(self, socket_path, service: AnalysisService):
+        if os.path.exists(socket_path):
+            # Left over by a previous run.
+            os.unlink(socket_path)
+        super().__init__(socket_path, AnalysisRequestHandler)
+        self.service = service
+
+    def server_close(self):
+        super().server_close()
+        if os.path.exists(self.server_address):
+            os.unlink(self.server_address)
+
+
+def serve(service: AnalysisService, host: str = "127.0.0.1", port: int = 8765, socket_path=None):
+    """
+    Serve the jobs of an AnalysisService until interrupted, then stop its workers.
+
+    Args:
+        service (AnalysisService): The service running the jobs.
+        host (str): Address to listen on (localhost by default: jobs name local paths).
+        port (int): TCP port to listen on.
+        socket_path (str, optional): Unix socket to listen on instead of the TCP port.
+    """
+    if socket_path:
+        server = AnalysisUnixServer(str(socket_path), service)
+        logger.info("Analysis server listening on unix:%s", socket_path)
+    else:
+        server = AnalysisHTTPServer((host, port), service)
+        logger.info("Analysis server listening on http://%s:%d", host, server.server_address[1])
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        logger.info("Analysis server stopped")
+    finally:
+        server.server_close()
+        service.close()
@@ -0,0 +1,346 @@
+"""Long-running classification service with warm analyzers and worker pools.
+
+A `python main.py` run pays for the imports, the dictionary loading and the analyzer setup
+before analyzing anything. The AnalysisService pays for them once: it builds the analyzers of
+every role through the MLAnalysisFacade (in both the full and the decision-only mode), keeps
+them, with their compiled knowledge bases, in a WarmPool of the configured backend, and then
+classifies one project per job (a checkout, bare repository or archive path). Results are
+returned as JSON-serializable dictionaries instead of being written to output folders.
+
+When a library dictionary CSV changes on disk, the analyzers and the pool are rebuilt before
+the next job; jobs already running finish on the previous ones. At most `max_pending` jobs
+are accepted at a time: further jobs are refused with ServiceBusyError, so that clients back
+off instead of queuing without bound. See `analysis_server` for the HTTP/Unix socket transport."""
+
+import os
+import threading
+import time
+
+from modules.analyzer.execution import ExecutionMode, ProjectExecutor
+from modules.analyzer.ml_analysis_facade import MLAnalysisFacade
+from modules.analyzer.ml_roles import AnalyzerRole
+from modules.analyzer.multi_role_analyzer import MultiRoleAnalyzer
+from modules.scanner.project_source.project_source_base import ProjectSource
+from modules.utils.logger import get_logger
+from modules.utils.metrics import Metrics
+
+logger = get_logger(__name__)
+
+
+class ServiceBusyError(RuntimeError):
+    """Raised when the service already holds as many jobs as it accepts."""
+
+
+class ClassificationEngine:
+    """Analyzers of every role and mode, classifying one project per call.
+
+    The engine is the target of the service WarmPool: with the process backend every worker
+    holds its own copy, with the knowledge bases already compiled.
+    """
+
+    def __init__(self, analyzers: dict, output_folder):
+        """
+        Initialize the engine.
+
+        Args:
+            analyzers (dict[tuple[AnalyzerRole, bool], MLAnalyzer]): Analyzer of every
+                (role, decision_only) pair.
+            output_folder (str): Folder receiving the reports of skipped files.
+        """
+        self.analyzers = analyzers
+        self.output_folder = output_folder
+
+    def warm_up(self):
+        """Load the knowledge bases of every analyzer."""
+        for analyzer in self.analyzers.values():
+            analyzer.warm_up()
+
+    def drain_stats(self) -> dict:
+        """Return and reset the run statistics of every analyzer."""
+        return {key: analyzer.drain_stats() for key, analyzer in self.analyzers.items()}
+
+    def merge_stats(self, stats):
+        """Add the statistics collected by a worker to every analyzer."""
+        for key, analyzer_stats in stats.items():
+            self.analyzers[key].merge_stats(analyzer_stats)
+
+    def dictionary_paths(self) -> list:
+        """Paths of the library dictionaries used by the analyzers."""
+        paths = {
+            os.path.abspath(str(getattr(dict_type, "value", dict_type)))
+            for analyzer in self.analyzers.values()
+            for dict_type in analyzer.library_dicts
+        }
+        return sorted(paths)
+
+    @staticmethod
+    def project_names(location: str) -> tuple:
+        """Return the (owner, name) a project at `location` is reported under."""
+        location = os.path.normpath(location)
+        source_class = ProjectSource.source_class(location) or ProjectSource
+        name = source_class.project_name(os.path.basename(location))
+        return os.path.basename(os.path.dirname(location)), name
+
+    def classify(self, location, roles, role_kwargs, decision_only: bool = False) -> dict:
+        """
+        Classify a single project for every requested role.
+
+        Args:
+            location (str): Path of the project (checkout, bare repository or archive).
+            roles (list[AnalyzerRole]): Roles to evaluate.
+            role_kwargs (dict[AnalyzerRole, dict]): Extra analyzer arguments of every role.
+            decision_only (bool): Stop evaluating a role at its first piece of evidence.
+
+        Returns:
+            dict: The project name, the duration and, for every role, whether the project is
+            classified as ML and its result rows.
+        """
+        start = time.perf_counter()
+        project, directory = self.project_names(location)
+        analyzers = {role: self.analyzers[(role, decision_only)] for role in roles}
+        if len(analyzers) == 1:
+            role, analyzer = next(iter(analyzers.items()))
+            rows = {
+                role: analyzer.analyze_project(
+                    location, project, directory, self.output_folder, **role_kwargs.get(role, {})
+                )
+            }
+        else:
+            rows = MultiRoleAnalyzer(analyzers).analyze_project(
+                location, project, directory, {role: self.output_folder for role in analyzers}, role_kwargs
+            )
+        return {
+            "project": f"{project}/{directory}",
+            "seconds": round(time.perf_counter() - start, 6),
+            "roles": {
+                role.value: {"is_ml": bool(role_rows), "rows": role_rows}
+                for role, role_rows in rows.items()
+            },
+        }
+
+
+class AnalysisService:
+    """Accepts classification jobs and runs them on warm analyzers."""
+
+    # Minimum interval, in seconds, between two checks of the dictionary files.
+    RELOAD_CHECK_INTERVAL = 1.0
+
+    def __init__(
+            self,
+            io_path,
+            roles=(AnalyzerRole.PRODUCER, AnalyzerRole.CONSUMER),
+            execution_mode: ExecutionMode = ExecutionMode.THREAD,
+            max_workers=None,
+            max_pending=None,
+            role_kwargs=None,
+            **analyzer_options
+    ):
+        """
+        Build the analyzers and start the worker pool.
+
+        Args:
+            io_path (str): Base I/O directory; reports of skipped files go to ``<io_path>/server``.
+            roles (Iterable[AnalyzerRole]): Roles a job may request.
+            execution_mode (ExecutionMode): Backend of the worker pool.
+            max_workers (int, optional): Number of workers (defaults to the number of CPUs).
+            max_pending (int, optional): Jobs accepted at a time, running or waiting for a
+                worker (defaults to twice the number of workers).
+            role_kwargs (dict[AnalyzerRole, dict], optional): Default extra analyzer arguments
+                of every role (e.g. ``{AnalyzerRole.CONSUMER: {"rules_3": True}}``).
+            **analyzer_options: Analyzer options accepted by MLAnalysisFacade
+                (e.g. ``result_cache_path``, ``include_notebooks``, ``bytes_scanning``).
+        """
+        self.output_folder = os.path.join(io_path, "server")
+        self.facades = {
+            role: MLAnalysisFacade(None, io_path, role, write_project_files=False, **analyzer_options)
+            for role in roles
+        }
+        self.executor = ProjectExecutor(execution_mode, max_workers)
+        self.role_kwargs = role_kwargs or {}
+        self.max_pending = max_pending or 2 * self.executor.max_workers
+        self._slots = threading.BoundedSemaphore(self.max_pending)
+        self._lock = threading.Lock()
+        self._pending = 0
+        self._jobs = 0
+        self._last_check = time.monotonic()
+        os.makedirs(self.output_folder, exist_ok=True)
+        self._pool, self._dictionaries = self._start_pool()
+
+    def _start_pool(self):
+        """Build the analyzers and a warm pool running them; return it with the dictionary state."""
+        analyzers = {
+            (role, decision_only): facade.build_analyzer(decision_only)
+            for role, facade in self.facades.items()
+            for decision_only in (False, True)
+        }
+        # Rule flags a job may set, per role.
+        self.rule_flags = {role: analyzers[(role, False)].rule_plan.flags for role in self.facades}
+        engine = ClassificationEngine(analyzers, self.output_folder)
+        state = self.dictionary_state(engine.dictionary_paths())
+        pool = self.executor.warm_pool(engine)
+        logger.info(
+            "Analysis service ready: %s, %s pool with %d workers",
+            ", ".join(role.value for role in self.facades), self.executor.mode.value,
+            self.executor.max_workers
+        )
+        return pool, state
+
+    @staticmethod
+    def dictionary_state(paths) -> tuple:
+        """Path, size and modification time of every dictionary file."""
+        state = []
+        for path in paths:
+            try:
+                stat = os.stat(path)
+                state.append((path, stat.st_size, stat.st_mtime_ns))
+            except OSError:
+                state.append((path, None, None))
+        return tuple(state)
+
+    def reload(self):
+        """Rebuild the analyzers and the pool; running jobs finish on the previous ones."""
+        pool, dictionaries = self._start_pool()
+        with self._lock:
+            previous = self._pool
+            self._pool, self._dictionaries = pool, dictionaries
+        threading.Thread(target=previous.close, name="mark-pool-close", daemon=True).start()
+        logger.info("Analysis service reloaded the library dictionaries")
+
+    def reload_if_changed(self) -> bool:
+        """Reload the dictionaries if one of their files changed since the pool was started."""
+        with self._lock:
+            now = time.monotonic()
+            if now - self._last_check < self.RELOAD_CHECK_INTERVAL:
+                return False
+            self._last_check = now
+            paths = [path for path, _, _ in self._dictionaries]
+            if self.dictionary_state(paths) == self._dictionaries:
+                return False
+        self.reload()
+        return True
+
+    def parse_job(self, job: dict) -> tuple:
+        """
+        Validate a job and resolve its arguments.
+
+        A job is a dictionary with the ``path`` of the project and, optionally, the ``roles``
+        to evaluate (default: every role of the service), ``decision_only`` (a boolean) and
+        ``options``: rule flags, for every role (``{"rules_3": true}``, set on the roles whose
+        rules read the flag) or per role (``{"consumer": {"rules_3": true}}``), overriding the
+        defaults of the service.
+
+        Returns:
+            tuple: (location, roles, role_kwargs, decision_only)
+
+        Raises:
+            ValueError: If the job is malformed, or requests an unknown role or rule flag.
+            FileNotFoundError: If the project does not exist.
+        """
+        if not isinstance(job, dict) or not isinstance(job.get("path"), str):
+            raise ValueError("A job must be a JSON object with a 'path' string")
+        location = job["path"]
+        if not os.path.exists(location):
+            raise FileNotFoundError(f"Project not found: {location}")
+
+        names = job.get("roles") or [role.value for role in self.facades]
+        if isinstance(names, str):
+            names = [names]
+        roles = []
+        for name in names:
+            try:
+                role = AnalyzerRole(name)
+            except ValueError as error:
+                raise ValueError(f"Unknown role: {name}") from error
+            if role not in self.facades:
+                raise ValueError(f"Role not served: {name}")
+            if role not in roles:
+                roles.append(role)
+
+        decision_only = job.get("decision_only", False)
+        if not isinstance(decision_only, bool):
+            raise ValueError("'decision_only' must be a JSON boolean")
+
+        options = job.get("options") or {}
+        if not isinstance(options, dict):
+            raise ValueError("'options' must be a JSON object")
+        served = {role.value for role in self.facades}
+        shared = {}
+        for key, value in options.items():
+            if not isinstance(value, dict):
+                shared[key] = value
+            elif key not in served:
+                raise ValueError(f"Unknown role in options: {key}")
+        self.check_flags(shared, set().union(*(self.rule_flags[role] for role in roles)))
+        role_kwargs = {}
+        for role in roles:
+            role_options = options.get(role.value) or {}
+            self.check_flags(role_options, self.rule_flags[role], role)
+            kwargs = dict(self.role_kwargs.get(role, {}))
+            kwargs.update({key: value for key, value in shared.items() if key in self.rule_flags[role]})
+            kwargs.update(role_options)
+            role_kwargs[role] = kwargs
+        return location, roles, role_kwargs, decision_only
+
+    @staticmethod
+    def check_flags(options: dict, accepted, role: AnalyzerRole = None):
+        """Raise ValueError if the options of a job set a rule flag the analyzers do not read."""
+        unknown = sorted(set(options) - set(accepted))
+        if unknown:
+            scope = f"{role.value} option" if role is not None else "option"
+            raise ValueError(
+                f"Unknown {scope}: {', '.join(unknown)} (accepted: {', '.join(sorted(accepted)) or 'none'})"
+            )
+
+    def submit_job(self, job: dict) -> dict:
+        """
+        Classify the project of a job (see `parse_job`), waiting for the result.
+
+        Raises:
+            ServiceBusyError: If `max_pending` jobs are already running or waiting.
+        """
+        location, roles, role_kwargs, decision_only = self.parse_job(job)
+        if not self._slots.acquire(blocking=False):
+            Metrics.inc("server_jobs", outcome="rejected")
+            raise ServiceBusyError(f"{self.max_pending} jobs already pending")
+        with self._lock:
+            self._pending += 1
+        try:
+            self.reload_if_changed()
+            with self._lock:
+                future = self._pool.submit("classify", location, roles, role_kwargs, decision_only)
+            with Metrics.timer("stage_seconds", stage="server_job"):
+                result = future.result()
+            Metrics.inc("server_jobs", outcome="done")
+            logger.info(
+                "Job %s (%s): %s in %.2fs", result["project"], ", ".join(role.value for role in roles),
+                ", ".join(f'{role}={"Yes" if value["is_ml"] else "No"}' for role, value in result["roles"].items()),
+                result["seconds"]
+            )
+            return result
+        except Exception:
+            Metrics.inc("server_jobs", outcome="failed")
+            raise
+        finally:
+            with self._lock:
+                self._pending -= 1
+                self._jobs += 1
+            self._slots.release()
+
+    def status(self) -> dict:
+        """Return the configuration and load of the service."""
+        with self._lock:
+            return {
+                "roles": [role.value for role in self.facades],
+                "execution_mode": self.executor.mode.value,
+                "workers": self.executor.max_workers,
+                "max_pending": self.max_pending,
+                "pending": self._pending,
+                "jobs": self._jobs,
+                "dictionaries": [path for path, _, _ in self._dictionaries],
+            }
+
+    def close(self):
+        """Wait for the running jobs and stop the workers."""
+        with self._lock:
+            pool = self._pool
+        pool.close()
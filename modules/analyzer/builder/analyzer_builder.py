@@ -1,6 +1,7 @@
 """Define a builder for constructing ML analyzers with consistent configurations.
 This abstract component collects all required dependencies (analysis role, file filters, keyword-extraction strategy,
-and library dictionary types) and produces a ready-to-use analyzer instance only when the configuration is complete.
+library dictionary types, classification rules, scanning rules, execution backend, result cache and evidence store) and produces a ready-to-use analyzer
+instance only when the configuration is complete.
 
 By centralizing setup in a single place, it eliminates scattered initialization code, reduces duplication,
 and prevents partially configured objects. Concrete builders specify the analyzer class to instantiate and may
@@ -12,9 +13,18 @@ from “how it is used,” improving readability, testability, and extensibility
 from abc import ABC
 from typing import List, Optional
 
+from modules.analyzer.evidence_store import EvidenceStore
+from modules.analyzer.execution import ExecutionMode, ProjectExecutor
 from modules.analyzer.ml_roles import AnalyzerRole
+from modules.analyzer.result_cache import FileResultCache
+from modules.analyzer.result_writer import ResultFormat
+from modules.analyzer.rules.rule_base import Rule
 from modules.library_manager.library_dict_type import LibraryDictType
+from modules.scanner.file_filter.extension_filter import ExtensionFilter
 from modules.scanner.file_filter.file_filter_base import FileFilter
+from modules.scanner.content_screen import ContentScreen
+from modules.scanner.project_scanner import ProjectScanner
+from modules.scanner.source_reader import SourceReader
 
 
 class AnalyzerBuilder(ABC):
@@ -27,6 +37,19 @@ class AnalyzerBuilder(ABC):
         self._keyword_strategy = None
         self._dict_types = []
         self._analyzer_class = None
+        self._execution_mode = ExecutionMode.SERIAL
+        self._max_workers = None
+        self._result_cache = None
+        self._write_project_files = True
+        self._include_notebooks = False
+        self._excluded_dirs = ProjectScanner.DEFAULT_EXCLUDED_DIRS
+        self._use_gitignore = True
+        self._source_reader = SourceReader()
+        self._result_format = ResultFormat.CSV
+        self._evidence_store = None
+        self._decision_only = False
+        self._rules = None
+        self._extra_rules = []
 
     def with_role(self, role: AnalyzerRole):
         """Set the ML analysis role (producer/consumer)."""
@@ -53,6 +76,79 @@ class AnalyzerBuilder(ABC):
         self._analyzer_class = cls
         return self
 
+    def with_execution(self, mode: ExecutionMode, max_workers: Optional[int] = None):
+        """Set the backend (serial/thread/process) and worker count used to analyze projects."""
+        self._execution_mode = ExecutionMode(mode)
+        self._max_workers = max_workers
+        return self
+
+    def with_result_cache(self, db_path=None):
+        """Cache per-file results in a SQLite database (None disables the cache)."""
+        self._result_cache = FileResultCache(db_path) if db_path else None
+        return self
+
+    def with_project_files(self, enabled: bool = True):
+        """Enable or disable the per-project CSVs written next to results.csv."""
+        self._write_project_files = enabled
+        return self
+
+    def with_notebooks(self, enabled: bool = True):
+        """Also analyze the code cells of Jupyter notebooks (.ipynb) next to the source files."""
+        self._include_notebooks = enabled
+        return self
+
+    def with_directory_rules(self, excluded_dirs=ProjectScanner.DEFAULT_EXCLUDED_DIRS, use_gitignore: bool = True):
+        """Set the directory names pruned while scanning and whether `.gitignore` files are honoured."""
+        self._excluded_dirs = frozenset(excluded_dirs or ())
+        self._use_gitignore = use_gitignore
+        return self
+
+    def with_bytes_scanning(self, enabled: bool = True, screen: Optional[ContentScreen] = None):
+        """Memory-map source files, match them at the bytes level and skip binary/generated/oversized ones."""
+        if enabled:
+            self._source_reader = SourceReader(memory_map=True, screen=screen or ContentScreen())
+        else:
+            self._source_reader = SourceReader()
+        return self
+
+    def with_result_format(self, result_format: ResultFormat = ResultFormat.CSV):
+        """Set the file format of the results (CSV, or Parquet with pyarrow installed)."""
+        self._result_format = ResultFormat(result_format)
+        return self
+
+    def with_evidence_store(self, db_path=None):
+        """Record the evidence in an indexed SQLite store and reuse it for unchanged projects (None disables it)."""
+        self._evidence_store = EvidenceStore(db_path) if db_path else None
+        return self
+
+    def with_decision_only(self, enabled: bool = True):
+        """Stop analyzing a project at its first piece of evidence (project-level Yes/No only)."""
+        self._decision_only = enabled
+        return self
+
+    def with_rules(self, *rules: Rule, replace: bool = False):
+        """Add classification rules to the analyzer, or replace its default rules with them.
+
+        Every rule runs in the cost-based rule plan of the analyzer, whatever its role.
+        """
+        if replace:
+            self._rules = list(rules)
+            self._extra_rules = []
+        else:
+            self._extra_rules.extend(rules)
+        return self
+
+    def _build_filters(self) -> List[FileFilter]:
+        """Return the configured filters, extending the extension filters with notebooks."""
+        if not self._include_notebooks:
+            return self._filters
+        return [
+            ExtensionFilter([*file_filter.extensions, ".ipynb"])
+            if isinstance(file_filter, ExtensionFilter) and ".ipynb" not in file_filter.extensions
+            else file_filter
+            for file_filter in self._filters
+        ]
+
     def build(self):
         """Build and return the configured MLAnalyzer instance."""
         if not all([self._role, self._filters, self._keyword_strategy]):
@@ -61,11 +157,22 @@ class AnalyzerBuilder(ABC):
         if self._analyzer_class is None:
             raise ValueError("Analyzer class must be set with `with_analyzer_class()`")
 
+        filters = self._build_filters()
         analyzer = self._analyzer_class(
             role=self._role,
             library_dicts= self._dict_types,
-            filters=self._filters,
-            keyword_strategy=self._keyword_strategy
+            filters=filters,
+            keyword_strategy=self._keyword_strategy,
+            executor=ProjectExecutor(self._execution_mode, self._max_workers),
+            result_cache=self._result_cache,
+            write_project_files=self._write_project_files,
+            scanner=ProjectScanner(filters, self._excluded_dirs, self._use_gitignore),
+            source_reader=self._source_reader,
+            result_format=self._result_format,
+            evidence_store=self._evidence_store,
+            decision_only=self._decision_only,
+            rules=self._rules,
+            extra_rules=self._extra_rules
         )
 
         return analyzer
@@ -4,7 +4,7 @@ from modules.analyzer.analyzer_factory import AnalyzerFactory
 from modules.analyzer.builder.analyzer_builder import AnalyzerBuilder
 from modules.analyzer.ml_consumer_analyzer import MLConsumerAnalyzer
 from modules.analyzer.ml_roles import AnalyzerRole
-from modules.keyword_extractor.keyword_extractor_default import DefaultKeywordMatcher
+from modules.keyword_extractor.keyword_extractor_multi_pattern import MultiPatternKeywordMatcher
 from modules.library_manager.library_dict_type import LibraryDictType
 from modules.scanner.file_filter.exclude_test_files import ExcludeTestFilesFilter
 from modules.scanner.file_filter.extension_filter import ExtensionFilter
@@ -23,4 +23,4 @@ class ConsumerAnalyzerBuilder(AnalyzerBuilder):
             ExtensionFilter([".py"]),
             ExcludeTestFilesFilter()
         ])
-        self.with_keyword_strategy(DefaultKeywordMatcher())
+        self.with_keyword_strategy(MultiPatternKeywordMatcher())
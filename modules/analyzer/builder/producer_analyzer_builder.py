@@ -4,7 +4,7 @@ from modules.analyzer.analyzer_factory import AnalyzerFactory
 from modules.analyzer.builder.analyzer_builder import AnalyzerBuilder
 from modules.analyzer.ml_producer_analyzer import MLProducerAnalyzer
 from modules.analyzer.ml_roles import AnalyzerRole
-from modules.keyword_extractor.keyword_extractor_default import DefaultKeywordMatcher
+from modules.keyword_extractor.keyword_extractor_multi_pattern import MultiPatternKeywordMatcher
 from modules.library_manager.library_dict_type import LibraryDictType
 from modules.scanner.file_filter.extension_filter import ExtensionFilter
 
@@ -21,4 +21,4 @@ class ProducerAnalyzerBuilder(AnalyzerBuilder):
         self.with_analyzer_class(MLProducerAnalyzer)
         self.with_library_dicts([LibraryDictType.PRODUCER])
         self.with_filters([ExtensionFilter([".py"])])
-        self.with_keyword_strategy(DefaultKeywordMatcher())
+        self.with_keyword_strategy(MultiPatternKeywordMatcher())
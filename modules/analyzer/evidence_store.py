@@ -0,0 +1,351 @@
+"""Indexed SQLite store of the evidence found by the analyzers.
+
+EvidenceStore keeps the outcome of every analyzed project in normalized tables: projects,
+files, libraries, keywords and the keyword matches linking them (one row per evidence line),
+plus one `analyses` row per project and role recording whether it was classified as ML and
+the fingerprint of what was analyzed. Matches are indexed by project, file, library and
+keyword, so questions such as "projects matching `.fit(` from keras but not torch" or "all
+the evidence of a project" are answered by a query instead of grepping per-project files.
+
+Projects are written in batches, each batch in a single transaction, and a project is
+replaced as a whole (upsert): when the fingerprint of a project (its HEAD commit together with
+the analyzer configuration, see `MLAnalyzer.project_fingerprint`) did not change since the
+last run, the analyzer serves its rows from the store instead of analyzing it again. The
+oracle tooling (Merger, ResultAnalysis) can read the results of a role from the store."""
+
+import os
+import sqlite3
+import time
+from typing import Optional
+
+import pandas as pd
+
+from modules.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+class EvidenceStore:
+    """SQLite-backed store of projects, files, libraries and keyword matches."""
+
+    SCHEMA_VERSION = 1
+    SUFFIXES = (".sqlite", ".sqlite3", ".db")
+    _FLUSH_SIZE = 5000
+
+    _SCHEMA = (
+        "CREATE TABLE IF NOT EXISTS projects ("
+        "project_id INTEGER PRIMARY KEY, name TEXT NOT NULL UNIQUE)",
+        "CREATE TABLE IF NOT EXISTS analyses ("
+        "project_id INTEGER NOT NULL REFERENCES projects(project_id), role TEXT NOT NULL, "
+        "fingerprint TEXT, is_ml INTEGER NOT NULL, match_count INTEGER NOT NULL, "
+        "analyzed_at REAL NOT NULL, PRIMARY KEY (project_id, role))",
+        "CREATE TABLE IF NOT EXISTS files ("
+        "file_id INTEGER PRIMARY KEY, project_id INTEGER NOT NULL REFERENCES projects(project_id), "
+        "path TEXT NOT NULL, UNIQUE (project_id, path))",
+        "CREATE TABLE IF NOT EXISTS libraries ("
+        "library_id INTEGER PRIMARY KEY, name TEXT NOT NULL UNIQUE)",
+        "CREATE TABLE IF NOT EXISTS keywords ("
+        "keyword_id INTEGER PRIMARY KEY, keyword TEXT NOT NULL UNIQUE)",
+        "CREATE TABLE IF NOT EXISTS matches ("
+        "project_id INTEGER NOT NULL, role TEXT NOT NULL, file_id INTEGER NOT NULL, "
+        "library_id INTEGER NOT NULL, keyword_id INTEGER NOT NULL, line_number INTEGER, "
+        "position INTEGER NOT NULL)",
+        "CREATE INDEX IF NOT EXISTS matches_project ON matches (project_id, role, position)",
+        "CREATE INDEX IF NOT EXISTS matches_keyword ON matches (keyword_id, library_id)",
+        "CREATE INDEX IF NOT EXISTS matches_library ON matches (library_id, role)",
+        "CREATE INDEX IF NOT EXISTS matches_file ON matches (file_id)",
+        "CREATE INDEX IF NOT EXISTS analyses_role ON analyses (role, is_ml)",
+    )
+
+    _EVIDENCE_QUERY = (
+        "SELECT p.name AS ProjectName, m.role AS role, l.name AS libraries, f.path AS \"where\", "
+        "k.keyword AS keyword, m.line_number AS line_number "
+        "FROM matches m "
+        "JOIN projects p ON p.project_id = m.project_id "
+        "JOIN files f ON f.file_id = m.file_id "
+        "JOIN libraries l ON l.library_id = m.library_id "
+        "JOIN keywords k ON k.keyword_id = m.keyword_id"
+    )
+
+    def __init__(self, db_path):
+        """
+        Initialize the store; the database is created on first use.
+
+        Args:
+            db_path (str): Location of the SQLite database.
+        """
+        self.db_path = str(db_path)
+        self._connection = None
+        self._pending = []
+        self._pending_rows = 0
+        self._ids = {}
+
+    def __getstate__(self):
+        # Only the parent process writes the store: workers receive it closed.
+        state = self.__dict__.copy()
+        state["_connection"] = None
+        state["_pending"] = []
+        state["_pending_rows"] = 0
+        state["_ids"] = {}
+        return state
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    @classmethod
+    def is_store(cls, path) -> bool:
+        """Whether a path designates an evidence store (by its extension)."""
+        return str(path).lower().endswith(cls.SUFFIXES)
+
+    def connection(self) -> sqlite3.Connection:
+        """Return the connection to the database, creating the schema if needed."""
+        if self._connection is None:
+            os.makedirs(os.path.dirname(os.path.abspath(self.db_path)), exist_ok=True)
+            connection = sqlite3.connect(self.db_path, timeout=60)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            connection.execute("PRAGMA foreign_keys=ON")
+            with connection:
+                for statement in self._SCHEMA:
+                    connection.execute(statement)
+                connection.execute(f"PRAGMA user_version={self.SCHEMA_VERSION}")
+            self._connection = connection
+        return self._connection
+
+    # ---------------------------------------------------------------------
+    # Writing
+    # ---------------------------------------------------------------------
+
+    def put_project(self, project_name, role, fingerprint, rows):
+        """
+        Queue the result rows of a project for a role, replacing what was stored before.
+
+        Args:
+            project_name (str): Project name (``owner/name``).
+            role (str): Analyzer role.
+            fingerprint (str | None): Fingerprint of the analyzed project (None if unknown).
+            rows (list[dict]): Result rows of the project (see `MLAnalyzer.keyword_rows`).
+        """
+        self._pending.append((project_name, role, fingerprint, rows))
+        self._pending_rows += len(rows) + 1
+        if self._pending_rows >= self._FLUSH_SIZE:
+            self.flush()
+
+    def _id(self, connection, table, column, value) -> int:
+        """Return the id of a name in a lookup table, inserting it if needed."""
+        key = (table, value)
+        identifier = self._ids.get(key)
+        if identifier is None:
+            connection.execute(f"INSERT OR IGNORE INTO {table} ({column}) VALUES (?)", (value,))
+            identifier = connection.execute(
+                f"SELECT rowid FROM {table} WHERE {column} = ?", (value,)
+            ).fetchone()[0]
+            self._ids[key] = identifier
+        return identifier
+
+    def _file_id(self, connection, project_id, path) -> int:
+        connection.execute(
+            "INSERT OR IGNORE INTO files (project_id, path) VALUES (?, ?)", (project_id, path)
+        )
+        return connection.execute(
+            "SELECT file_id FROM files WHERE project_id = ? AND path = ?", (project_id, path)
+        ).fetchone()[0]
+
+    def flush(self):
+        """Write the queued projects in a single transaction."""
+        if not self._pending:
+            return
+        connection = self.connection()
+        analyzed_at = time.time()
+        try:
+            self._write(connection, analyzed_at)
+        except sqlite3.Error:
+            # The ids inserted by the rolled back transaction are no longer valid.
+            self._ids = {}
+            raise
+        logger.debug("Stored %d projects in %s", len(self._pending), self.db_path)
+        self._pending = []
+        self._pending_rows = 0
+
+    def _write(self, connection, analyzed_at):
+        with connection:
+            for project_name, role, fingerprint, rows in self._pending:
+                project_id = self._id(connection, "projects", "name", project_name)
+                connection.execute(
+                    "DELETE FROM matches WHERE project_id = ? AND role = ?", (project_id, role)
+                )
+                file_ids = {}
+                matches = []
+                for position, row in enumerate(rows):
+                    path = row["where"]
+                    if path not in file_ids:
+                        file_ids[path] = self._file_id(connection, project_id, path)
+                    matches.append((
+                        project_id, role, file_ids[path],
+                        self._id(connection, "libraries", "name", row["libraries"]),
+                        self._id(connection, "keywords", "keyword", row["keyword"]),
+                        row["line_number"], position
+                    ))
+                connection.executemany(
+                    "INSERT INTO matches (project_id, role, file_id, library_id, keyword_id, "
+                    "line_number, position) VALUES (?, ?, ?, ?, ?, ?, ?)", matches
+                )
+                connection.execute(
+                    "DELETE FROM files WHERE project_id = ? AND file_id NOT IN "
+                    "(SELECT file_id FROM matches WHERE project_id = ?)", (project_id, project_id)
+                )
+                connection.execute(
+                    "INSERT OR REPLACE INTO analyses VALUES (?, ?, ?, ?, ?, ?)",
+                    (project_id, role, fingerprint, int(bool(rows)), len(rows), analyzed_at)
+                )
+
+    def close(self):
+        """Write the queued projects and close the database."""
+        self.flush()
+        if self._connection is not None:
+            self._connection.close()
+            self._connection = None
+            self._ids = {}
+
+    # ---------------------------------------------------------------------
+    # Reading
+    # ---------------------------------------------------------------------
+
+    def fingerprints(self, role) -> dict:
+        """Return the fingerprint of every project stored for a role, by project name."""
+        self.flush()
+        return dict(self.connection().execute(
+            "SELECT p.name, a.fingerprint FROM analyses a "
+            "JOIN projects p ON p.project_id = a.project_id WHERE a.role = ?", (role,)
+        ))
+
+    def project_rows(self, project_name, role, fingerprint=None) -> Optional[list]:
+        """
+        Return the stored result rows of a project for a role.
+
+        Args:
+            project_name (str): Project name (``owner/name``).
+            role (str): Analyzer role.
+            fingerprint (str, optional): If given, rows are only returned when the project
+                was stored with this fingerprint.
+
+        Returns:
+            list[dict] | None: The rows, in the order they were found, or None if the project
+            is not stored (or was stored with another fingerprint).
+        """
+        connection = self.connection()
+        analysis = connection.execute(
+            "SELECT a.fingerprint FROM analyses a JOIN projects p ON p.project_id = a.project_id "
+            "WHERE p.name = ? AND a.role = ?", (project_name, role)
+        ).fetchone()
+        if analysis is None or (fingerprint is not None and analysis[0] != fingerprint):
+            return None
+
+        cursor = connection.execute(
+            f"{self._EVIDENCE_QUERY} WHERE p.name = ? AND m.role = ? ORDER BY m.position",
+            (project_name, role)
+        )
+        return [
+            {
+                'ProjectName': name,
+                f'Is ML {role}': 'Yes',
+                'libraries': library,
+                'where': where,
+                'keyword': keyword,
+                'line_number': line_number
+            }
+            for name, _, library, where, keyword, line_number in cursor
+        ]
+
+    def evidence(self, project_name=None, role=None, library=None, keyword=None) -> pd.DataFrame:
+        """
+        Return the stored evidence lines, optionally restricted to a project, role, library
+        and/or keyword.
+
+        Returns:
+            pd.DataFrame: ProjectName, role, libraries, where, keyword and line_number columns.
+        """
+        conditions, parameters = [], []
+        for column, value in (
+                ("p.name", project_name), ("m.role", role), ("l.name", library), ("k.keyword", keyword)
+        ):
+            if value is not None:
+                conditions.append(f"{column} = ?")
+                parameters.append(value)
+        query = self._EVIDENCE_QUERY
+        if conditions:
+            query += " WHERE " + " AND ".join(conditions)
+        query += " ORDER BY p.name, m.role, m.position"
+        self.flush()
+        return pd.read_sql_query(query, self.connection(), params=parameters)
+
+    def projects_matching(self, keyword, library=None, role=None, without_library=None) -> list:
+        """
+        Return the projects having a keyword match, optionally from a given library and
+        without any match from another library.
+
+        Args:
+            keyword (str): Matched keyword (e.g. ``.fit(``).
+            library (str, optional): Library the keyword must come from (e.g. ``keras``).
+            role (str, optional): Restrict the matches to a role.
+            without_library (str, optional): Library the project must have no match from.
+
+        Returns:
+            list[str]: The project names, sorted.
+        """
+        query = (
+            "SELECT DISTINCT p.name FROM matches m "
+            "JOIN projects p ON p.project_id = m.project_id "
+            "JOIN keywords k ON k.keyword_id = m.keyword_id "
+            "JOIN libraries l ON l.library_id = m.library_id "
+            "WHERE k.keyword = ?"
+        )
+        parameters = [keyword]
+        if library is not None:
+            query += " AND l.name = ?"
+            parameters.append(library)
+        if role is not None:
+            query += " AND m.role = ?"
+            parameters.append(role)
+        if without_library is not None:
+            query += (
+                " AND NOT EXISTS (SELECT 1 FROM matches o JOIN libraries ol "
+                "ON ol.library_id = o.library_id WHERE o.project_id = m.project_id "
+                "AND ol.name = ?" + (" AND o.role = m.role" if role is not None else "") + ")"
+            )
+            parameters.append(without_library)
+        query += " ORDER BY p.name"
+        self.flush()
+        return [name for (name,) in self.connection().execute(query, parameters)]
+
+    def role_results(self, role, columns=None) -> pd.DataFrame:
+        """
+        Return the stored results of a role with the columns of a results file: one row per
+        evidence line of the projects classified as ML, or one row per project when only
+        ``ProjectName`` and ``Is ML <role>`` are requested.
+
+        Args:
+            role (str): Analyzer role.
+            columns (list[str], optional): Columns to return (all of them by default).
+
+        Returns:
+            pd.DataFrame: The results.
+        """
+        self.flush()
+        if columns is not None and set(columns) <= {'ProjectName', f'Is ML {role}'}:
+            frame = pd.read_sql_query(
+                "SELECT p.name AS ProjectName FROM analyses a "
+                "JOIN projects p ON p.project_id = a.project_id "
+                "WHERE a.role = ? AND a.is_ml = 1 ORDER BY p.name",
+                self.connection(), params=[role]
+            )
+        else:
+            frame = pd.read_sql_query(
+                f"{self._EVIDENCE_QUERY} WHERE m.role = ? ORDER BY p.name, m.position",
+                self.connection(), params=[role]
+            ).drop(columns="role")
+        frame.insert(1, f'Is ML {role}', 'Yes')
+        return frame[columns] if columns is not None else frame
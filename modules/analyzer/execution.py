@@ -0,0 +1,189 @@
+"""Execution backends used by the analyzers to process projects.
+
+ProjectExecutor maps an analyzer method over the list of projects either serially, on a
+thread pool or on a process pool. The analyzer (with its already compiled knowledge bases)
+is shipped to each worker process once, by the pool initializer, and tasks only carry the
+project arguments. Results are always yielded in task order, so results.csv keeps the same
+row order as a serial run regardless of the backend. Worker processes collect their own
+pipeline Metrics, which are handed back with every result and merged into the parent, and
+relay their log records to the run log of the parent.
+
+Long-running callers (e.g. the AnalysisService) keep a WarmPool instead: its workers, and their
+copy of the target, live until the pool is closed."""
+
+import concurrent.futures
+import functools
+import multiprocessing
+import os
+from contextlib import ExitStack
+from enum import Enum
+
+from modules.utils.logger import attach_worker, get_logger, worker_log_relay
+from modules.utils.metrics import Metrics
+
+logger = get_logger(__name__)
+
+_worker_target = None
+
+
+class ExecutionMode(Enum):
+    """Enumeration of the available execution backends."""
+    SERIAL = "serial"
+    THREAD = "thread"
+    PROCESS = "process"
+
+
+def _init_worker(target, metrics_enabled=False, log_relay=None):
+    """Pool initializer: keep the analyzer for the lifetime of the worker process."""
+    global _worker_target  # pylint: disable=global-statement
+    if log_relay is not None:
+        attach_worker(log_relay)
+    _worker_target = target
+    # A forked worker inherits the metrics already collected by the parent.
+    Metrics.reset()
+    Metrics.enable(metrics_enabled)
+    target.warm_up()
+
+
+def _call_worker(method_name, kwargs, args):
+    """Run one task against the analyzer installed by `_init_worker`.
+
+    Returns the task result together with the statistics and the metrics the worker collected
+    for it, which the parent merges into its own analyzer and metrics.
+    """
+    result = getattr(_worker_target, method_name)(*args, **kwargs)
+    return result, _worker_target.drain_stats(), Metrics.drain()
+
+
+class ProjectExecutor:
+    """Maps an analyzer method over project tasks with the configured backend."""
+
+    def __init__(self, mode: ExecutionMode = ExecutionMode.SERIAL, max_workers=None):
+        """
+        Initialize the executor.
+
+        Args:
+            mode (ExecutionMode): Serial, thread-pool or process-pool execution.
+            max_workers (int, optional): Pool size (defaults to the number of CPUs).
+        """
+        self.mode = ExecutionMode(mode)
+        self.max_workers = max_workers or os.cpu_count() or 1
+
+    def map(self, target, method_name, tasks, **kwargs):
+        """
+        Call ``target.<method_name>(*task, **kwargs)`` for every task.
+
+        Args:
+            target: Object exposing the method and the ``warm_up()``, ``drain_stats()`` and
+                ``merge_stats()`` hooks.
+            method_name (str): Name of the method to call.
+            tasks (Iterable[tuple]): Positional arguments of every call.
+            **kwargs: Keyword arguments shared by every call.
+
+        Yields:
+            The result of every call, in task order.
+        """
+        tasks = list(tasks)
+        target.warm_up()
+
+        if self.mode is ExecutionMode.SERIAL or self.max_workers == 1 or len(tasks) < 2:
+            method = getattr(target, method_name)
+            for args in tasks:
+                yield method(*args, **kwargs)
+            return
+
+        logger.info(
+            "Running %d tasks on a %s pool with %d workers",
+            len(tasks), self.mode.value, self.max_workers
+        )
+        if self.mode is ExecutionMode.THREAD:
+            method = getattr(target, method_name)
+            with concurrent.futures.ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+                yield from executor.map(lambda args: method(*args, **kwargs), tasks)
+            return
+
+        with worker_log_relay() as log_relay, concurrent.futures.ProcessPoolExecutor(
+                max_workers=self.max_workers,
+                initializer=_init_worker,
+                initargs=(target, Metrics.enabled, log_relay)
+        ) as executor:
+            for result, stats, metrics in executor.map(
+                    functools.partial(_call_worker, method_name, kwargs), tasks
+            ):
+                target.merge_stats(stats)
+                Metrics.merge(metrics)
+                yield result
+
+    def warm_pool(self, target) -> "WarmPool":
+        """Start a long-lived pool of the configured backend running the methods of `target`."""
+        return WarmPool(self, target)
+
+
+class WarmPool:
+    """Long-lived workers running the methods of a single target, one call at a time each.
+
+    With the serial backend calls run one at a time on a single thread. Process workers are
+    spawned (not forked, since the pool may be started while other threads are running) and
+    all started up front, so no call pays for their start-up.
+    """
+
+    def __init__(self, executor: ProjectExecutor, target):
+        """
+        Start the workers.
+
+        Args:
+            executor (ProjectExecutor): Backend and number of workers.
+            target: Object exposing the called methods and the ``warm_up()``, ``drain_stats()``
+                and ``merge_stats()`` hooks.
+        """
+        self.mode = executor.mode
+        self.target = target
+        self._resources = ExitStack()
+        target.warm_up()
+        if self.mode is ExecutionMode.PROCESS:
+            context = multiprocessing.get_context("spawn")
+            log_relay = self._resources.enter_context(worker_log_relay(context))
+            self._pool = concurrent.futures.ProcessPoolExecutor(
+                max_workers=executor.max_workers,
+                mp_context=context,
+                initializer=_init_worker,
+                initargs=(target, Metrics.enabled, log_relay)
+            )
+            # Launch (and warm up) every worker now.
+            concurrent.futures.wait([
+                self._pool.submit(os.getpid) for _ in range(executor.max_workers)
+            ])
+        else:
+            workers = 1 if self.mode is ExecutionMode.SERIAL else executor.max_workers
+            self._pool = concurrent.futures.ThreadPoolExecutor(max_workers=workers)
+        self._resources.callback(self._pool.shutdown)
+
+    def submit(self, method_name, *args, **kwargs) -> concurrent.futures.Future:
+        """
+        Schedule ``target.<method_name>(*args, **kwargs)`` on a worker.
+
+        Returns:
+            concurrent.futures.Future: The result of the call; the statistics and metrics of a
+            worker process are merged into the target and the parent when it completes.
+        """
+        if self.mode is not ExecutionMode.PROCESS:
+            return self._pool.submit(getattr(self.target, method_name), *args, **kwargs)
+
+        result_future = concurrent.futures.Future()
+
+        def merge(future):
+            try:
+                result, stats, metrics = future.result()
+            except BaseException as error:  # pylint: disable=broad-exception-caught
+                result_future.set_exception(error)
+                return
+            self.target.merge_stats(stats)
+            Metrics.merge(metrics)
+            result_future.set_result(result)
+
+        self._pool.submit(_call_worker, method_name, kwargs, args).add_done_callback(merge)
+        return result_future
+
+    def close(self):
+        """Wait for the submitted calls and stop the workers."""
+        self._resources.close()
@@ -1,10 +1,17 @@
-"""Facade for orchestrating ML analysis using registered analyzers by role."""
+"""Facade for orchestrating ML analysis using registered analyzers by role.
+
+MLAnalysisFacade runs the analysis of a single role; MultiRoleAnalysisFacade runs several
+roles fused into a single walk over the repositories."""
 
 import os
 
 from modules.analyzer.analyzer_decorator import log_and_time
 from modules.analyzer.analyzer_factory import AnalyzerFactory
+from modules.analyzer.execution import ExecutionMode, ProjectExecutor
 from modules.analyzer.ml_roles import AnalyzerRole
+from modules.analyzer.result_writer import ResultFormat
+from modules.analyzer.multi_role_analyzer import MultiRoleAnalyzer
+from modules.scanner.project_scanner import CombinedProjectScanner
 from modules.utils.logger import get_logger
 
 logger = get_logger(__name__)
@@ -13,18 +20,50 @@ logger = get_logger(__name__)
 class MLAnalysisFacade:
     """Handles the full ML analysis workflow for a given role."""
 
-    def __init__(self, input_path, io_path, role: AnalyzerRole):
+    def __init__(
+            self,
+            input_path,
+            io_path,
+            role: AnalyzerRole,
+            execution_mode: ExecutionMode = ExecutionMode.SERIAL,
+            max_workers=None,
+            result_cache_path=None,
+            write_project_files=True,
+            include_notebooks=False,
+            bytes_scanning=False,
+            result_format: ResultFormat = ResultFormat.CSV,
+            evidence_store_path=None
+    ):
         """Initialize the analysis facade with paths and analyzer role.
 
         Args:
             input_path (str): Path to the project input folder.
             io_path (str): Path to the base I/O directory (e.g., for dictionaries and output).
             role (AnalyzerRole): Role specifying the type of analysis.
+            execution_mode (ExecutionMode): Backend used to process the projects.
+            max_workers (int, optional): Number of workers of the thread/process pool.
+            result_cache_path (str, optional): SQLite database caching per-file results.
+            write_project_files (bool): Whether to write the per-project CSVs next to results.csv.
+            include_notebooks (bool): Whether to also analyze the code cells of .ipynb notebooks.
+            bytes_scanning (bool): Whether to memory-map files, match them at the bytes level and
+                skip binary, generated or oversized files (reported in skipped_files.jsonl).
+            result_format (ResultFormat): File format of results and per-project files
+                (PARQUET requires pyarrow).
+            evidence_store_path (str, optional): SQLite database recording the evidence of every
+                project; unchanged projects of a later run are served from it.
         """
         self.input_path = input_path
         self.io_path = io_path
         self.role = role
         self.role_str = str(self.role.value)
+        self.execution_mode = execution_mode
+        self.max_workers = max_workers
+        self.result_cache_path = result_cache_path
+        self.write_project_files = write_project_files
+        self.include_notebooks = include_notebooks
+        self.bytes_scanning = bytes_scanning
+        self.result_format = result_format
+        self.evidence_store_path = evidence_store_path
 
     def _resolve_paths(self, dict_types):
         """Resolve paths for required dictionaries and create output folder.
@@ -55,19 +94,63 @@ class MLAnalysisFacade:
 
         return result_name, output_path
 
+    def build_analyzer(self, decision_only: bool = False):
+        """Build the analyzer registered for the current role with the facade options.
+
+        Args:
+            decision_only (bool): Whether the analyzer stops at the first evidence of a project.
+
+        Returns:
+            MLAnalyzer: The configured analyzer.
+        """
+        return (
+            AnalyzerFactory.create_builder(self.role)
+            .with_execution(self.execution_mode, self.max_workers)
+            .with_result_cache(self.result_cache_path)
+            .with_project_files(self.write_project_files)
+            .with_notebooks(self.include_notebooks)
+            .with_bytes_scanning(self.bytes_scanning)
+            .with_result_format(self.result_format)
+            .with_evidence_store(self.evidence_store_path)
+            .with_decision_only(decision_only)
+            .build()
+        )
+
+    def checkout_patterns(self):
+        """Sparse-checkout patterns of the files the analysis reads (see RepoCloner).
+
+        Returns:
+            List[str] | None: The patterns, or None if the analysis may read any file.
+        """
+        return self.build_analyzer().scanner.checkout_patterns()
+
+    def prepare_analysis(self, decision_only: bool = False):
+        """Build the analyzer registered for the current role and create its output folder.
+
+        Args:
+            decision_only (bool): Whether the analyzer stops at the first evidence of a project.
+
+        Returns:
+            Tuple[MLAnalyzer, str, str]: analyzer, result_name, output_path
+        """
+        analyzer = self.build_analyzer(decision_only)
+        result_name, output_path = self._resolve_paths(analyzer.library_dicts)
+        return analyzer, result_name, output_path
+
     @log_and_time("MLAnalysis")
-    def run_analysis(self, **kwargs):
+    def run_analysis(self, decision_only: bool = False, **kwargs):
         """Run the ML analysis using the builder registered for the current role.
 
         Args:
+            decision_only (bool): Only settle the Yes/No classification of every project: the
+                analysis of a project stops at its first piece of evidence, which is the only
+                row recorded for it (enough for Merger and ResultAnalysis).
             **kwargs: Extra parameters to pass to the analyzer.
 
         Returns:
             str: The result folder name used for output.
         """
-        analyzer = AnalyzerFactory.create_builder(self.role).build()
-
-        result_name, output_path = self._resolve_paths(analyzer.library_dicts)
+        analyzer, result_name, output_path = self.prepare_analysis(decision_only)
 
         analyzer.analyze_projects_set(self.input_path, output_path, **kwargs)
 
@@ -77,6 +160,82 @@ class MLAnalysisFacade:
         logger.info("Dictionaries used: %s", analyzer.library_dicts)
         if kwargs:
             logger.info("Extra analyzer arguments: %s", kwargs)
+        if decision_only:
+            logger.info("Decision-only mode: one piece of evidence per ML project")
         logger.info("Analysis complete. Results written to: %s", output_path)
 
         return result_name
+
+
+class MultiRoleAnalysisFacade:
+    """Handles the ML analysis of several roles in a single pass over the repositories."""
+
+    def __init__(
+            self,
+            input_path,
+            io_path,
+            roles,
+            execution_mode: ExecutionMode = ExecutionMode.SERIAL,
+            max_workers=None,
+            **analyzer_options
+    ):
+        """Initialize the fused analysis facade.
+
+        Args:
+            input_path (str): Path to the project input folder.
+            io_path (str): Path to the base I/O directory (e.g., for dictionaries and output).
+            roles (List[AnalyzerRole]): Roles to evaluate together.
+            execution_mode (ExecutionMode): Backend used to process the projects.
+            max_workers (int, optional): Number of workers of the thread/process pool.
+            **analyzer_options: Per-role analyzer options accepted by MLAnalysisFacade
+                (e.g. ``result_cache_path``, ``include_notebooks``, ``evidence_store_path``).
+        """
+        self.input_path = input_path
+        self.io_path = io_path
+        self.executor = ProjectExecutor(execution_mode, max_workers)
+        self.facades = {
+            role: MLAnalysisFacade(input_path, io_path, role, **analyzer_options)
+            for role in roles
+        }
+
+    def checkout_patterns(self):
+        """Sparse-checkout patterns of the files read by at least one role (see RepoCloner).
+
+        Returns:
+            List[str] | None: The patterns, or None if the analysis may read any file.
+        """
+        return CombinedProjectScanner(
+            [facade.build_analyzer().scanner for facade in self.facades.values()]
+        ).checkout_patterns()
+
+    @log_and_time("MultiRoleMLAnalysis")
+    def run_analysis(self, role_kwargs=None, decision_only: bool = False):
+        """Run the analysis of every role, walking and reading the repositories once.
+
+        Args:
+            role_kwargs (dict[AnalyzerRole, dict], optional):
+                Extra analyzer parameters per role (e.g. ``{AnalyzerRole.CONSUMER: {"rules_3": True}}``).
+            decision_only (bool): Stop evaluating a role on a project at its first piece of
+                evidence, and walk the project only until every role is settled.
+
+        Returns:
+            dict[AnalyzerRole, str]: The result folder name used for every role.
+        """
+        role_kwargs = role_kwargs or {}
+        analyzers, result_names, output_paths = {}, {}, {}
+        for role, facade in self.facades.items():
+            analyzers[role], result_names[role], output_paths[role] = facade.prepare_analysis(decision_only)
+
+        MultiRoleAnalyzer(analyzers, self.executor).analyze_projects_set(
+            self.input_path, output_paths, role_kwargs
+        )
+
+        for role, analyzer in analyzers.items():
+            logger.info("Running analysis for role: %s", role.value)
+            logger.info("Dictionaries used: %s", analyzer.library_dicts)
+            if role_kwargs.get(role):
+                logger.info("Extra analyzer arguments: %s", role_kwargs[role])
+            logger.info("Analysis complete. Results written to: %s", output_paths[role])
+        logger.info("Input folder: %s", self.input_path)
+
+        return result_names
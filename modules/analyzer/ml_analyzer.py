@@ -2,118 +2,470 @@
 
 This module defines the `MLAnalyzer` abstract base class, which encapsulates the
 common workflow for scanning projects, applying file filters, extracting ML-related
-libraries/keywords, and exporting results to CSV. Concrete analyzers (e.g., producer
-vs consumer) specialize only the `check_library` method to express role-specific rules.
+libraries/keywords, and streaming results to CSV (and, optionally, to an evidence store). Concrete analyzers (e.g., producer
+vs consumer) only declare their role-specific rules in `default_rules`; every file is classified by running them through
+a cost-based RulePlan, which also runs the rules added with `AnalyzerBuilder.with_rules()`.
+Scanned files, read and write latencies and per-project timings are recorded in the pipeline Metrics.
 """
 
+import hashlib
+import logging
 import os
+import time
 from abc import ABC, abstractmethod
+from collections import Counter
 from typing import Optional, List
 
-import pandas as pd
-
 from modules.keyword_extractor.keyword_extractor_base import KeywordExtractionStrategy
 from modules.keyword_extractor.keyword_extractor_default import DefaultKeywordMatcher
+from modules.analyzer.evidence_store import EvidenceStore
+from modules.analyzer.execution import ProjectExecutor
 from modules.analyzer.ml_roles import AnalyzerRole
+from modules.analyzer.result_cache import FileResultCache
+from modules.analyzer.result_writer import ResultFormat
+from modules.analyzer.rules.rule_base import Rule
+from modules.analyzer.rules.rule_plan import RulePlan
+from modules.analyzer.skip_report import SkippedFilesReport
+from modules.cloner.repo_inventory import RepoInventory
+from modules.library_manager.knowledge_base import KnowledgeBase
 from modules.scanner.file_filter.file_filter_base import FileFilter
 from modules.scanner.project_scanner import ProjectScanner
-from modules.utils.logger import get_logger
+from modules.scanner.project_source.project_source_base import ProjectSource
+from modules.scanner.source_file import SourceFile
+from modules.scanner.source_reader import SourceReader
+# Registers the .ipynb reader used by SourceFile.open.
+from modules.scanner import notebook_source_file  # pylint: disable=unused-import
+# Register the bare-repository and archive sources used by ProjectSource.open.
+from modules.scanner.project_source import archive_source  # pylint: disable=unused-import
+from modules.scanner.project_source import git_object_source  # pylint: disable=unused-import
+from modules.utils.logger import get_logger, get_sampler
+from modules.utils.metrics import Metrics
 
 logger = get_logger(__name__)
+# One message per file with matches: sampled on large runs (see configure_logging).
+match_log = get_sampler("matches")
 
 
 class MLAnalyzer(ABC):
     """Base class for all machine learning analyzers."""
 
+    # File name fragments of the scripts most likely to train or run models, and folders
+    # least likely to: checked first and last in decision-only mode.
+    DECISION_HINTS = (
+        "train", "fit", "finetune", "fine_tune", "model", "learn", "infer", "predict", "serve", "pipeline"
+    )
+    DECISION_LAST_DIRS = frozenset(("test", "tests", "testing", "example", "examples", "doc", "docs"))
+
     def __init__(
             self,
             role: AnalyzerRole,
             library_dicts: Optional[List[FileFilter]] = None,
             filters: Optional[List[FileFilter]] = None,
-            keyword_strategy: KeywordExtractionStrategy = None
+            keyword_strategy: KeywordExtractionStrategy = None,
+            executor: Optional[ProjectExecutor] = None,
+            result_cache: Optional[FileResultCache] = None,
+            write_project_files: bool = True,
+            scanner: Optional[ProjectScanner] = None,
+            source_reader: Optional[SourceReader] = None,
+            result_format: ResultFormat = ResultFormat.CSV,
+            evidence_store: Optional[EvidenceStore] = None,
+            decision_only: bool = False,
+            rules: Optional[List[Rule]] = None,
+            extra_rules: Optional[List[Rule]] = None
     ):
-        """Initialize MLAnalyzer with role, output path, scanner and keyword strategy."""
+        """Initialize MLAnalyzer with role, filters, keyword strategy, executor, scanning, rules and output options.
+
+        `rules` replaces the `default_rules` of the analyzer, `extra_rules` are added to them.
+        """
         self.role = role
         self.role_str = str(self.role.value)
         self.filters = filters or []
         self.library_dicts = library_dicts or []
         self.keyword_strategy = keyword_strategy or DefaultKeywordMatcher()
+        self.executor = executor or ProjectExecutor()
+        self.result_cache = result_cache
+        self.write_project_files = write_project_files
+        self.scanner = scanner or ProjectScanner(self.filters)
+        self.source_reader = source_reader or SourceReader()
+        self.result_format = ResultFormat(result_format)
+        self.evidence_store = evidence_store
+        self.decision_only = decision_only
+        self.run_stats = Counter()
+        self._knowledge_bases = {}
+        self._dict_hash = None
+        default_rules = self.default_rules()
+        self.rule_plan = RulePlan([*(default_rules if rules is None else rules), *(extra_rules or [])])
+        self._custom_rules = self.rule_plan.signature != RulePlan(default_rules).signature
+
+    def knowledge_base(self, dict_type) -> KnowledgeBase:
+        """Return the shared, compiled knowledge base of a library dictionary."""
+        knowledge_base = self._knowledge_bases.get(dict_type)
+        if knowledge_base is None:
+            knowledge_base = KnowledgeBase.load(dict_type)
+            self._knowledge_bases[dict_type] = knowledge_base
+        return knowledge_base
+
+    def warm_up(self):
+        """Load the knowledge bases of every configured dictionary ahead of the analysis."""
+        for dict_type in self.library_dicts:
+            self.knowledge_base(dict_type)
+
+    def reload_knowledge_bases(self):
+        """Drop the cached knowledge bases so that edited dictionaries are picked up."""
+        self._knowledge_bases.clear()
+        self._dict_hash = None
+
+    def dictionaries_hash(self) -> str:
+        """Combined content hash of the dictionaries used by this analyzer."""
+        if self._dict_hash is None:
+            digest = hashlib.sha256()
+            for dict_type in self.library_dicts:
+                digest.update(self.knowledge_base(dict_type).content_hash.encode("ascii"))
+            self._dict_hash = digest.hexdigest()
+        return self._dict_hash
+
+    def strategy_name(self, bytes_level: bool) -> str:
+        """Qualified name of the keyword strategy, as recorded in cache keys and fingerprints."""
+        strategy = type(self.keyword_strategy)
+        strategy_name = f"{strategy.__module__}.{strategy.__qualname__}"
+        if bytes_level:
+            # Bytes-level matching also searches non UTF-8 files: keep its results apart.
+            strategy_name += "/bytes"
+        return strategy_name
+
+    def analyzer_name(self) -> str:
+        """Name of the analyzer in cache keys and fingerprints, with its rules if they are not the defaults."""
+        name = type(self).__qualname__
+        if self._custom_rules:
+            name += f"[{self.rule_plan.signature}]"
+        return name
+
+    def cache_key(self, source: SourceFile, flags) -> str:
+        """Key of a file analysis in the result cache."""
+        return FileResultCache.make_key(
+            source.content_hash,
+            self.role_str,
+            self.analyzer_name(),
+            self.dictionaries_hash(),
+            self.strategy_name(source.bytes_level),
+            flags
+        )
+
+    def project_fingerprint(self, repo, flags) -> Optional[str]:
+        """
+        Fingerprint of a project analysis in the evidence store.
+
+        It combines the version of the project (HEAD commit, or size and modification time of
+        an archive) with everything else that can change its results: role, analyzer class,
+        dictionaries, keyword strategy, scanning rules, reader settings and rule flags.
+        Uncommitted changes of a checkout are not part of the version.
+
+        Returns:
+            str | None: The fingerprint, or None if the project version cannot be determined.
+        """
+        repo = str(repo)
+        version = RepoInventory.head_commit(repo)
+        if not version and os.path.isfile(repo):
+            stat = os.stat(repo)
+            version = f"{stat.st_size}:{stat.st_mtime_ns}"
+        if not version:
+            return None
+
+        screen = self.source_reader.screen
+        settings = {
+            "flags": flags,
+            "patterns": self.scanner.checkout_patterns(),
+            "gitignore": self.scanner.use_gitignore,
+            "screen": vars(screen) if screen is not None else None,
+        }
+        if self.decision_only:
+            settings["decision_only"] = True
+        return FileResultCache.make_key(
+            version,
+            self.role_str,
+            self.analyzer_name(),
+            self.dictionaries_hash(),
+            self.strategy_name(self.source_reader.memory_map),
+            settings
+        )
+
+    def flush_cache(self):
+        """Persist the results queued in the result cache, if any."""
+        if self.result_cache is not None:
+            self.result_cache.flush()
+
+    def drain_stats(self) -> Counter:
+        """Return and reset the run statistics collected by this analyzer."""
+        stats = Counter(self.run_stats)
+        self.run_stats.clear()
+        stats.update(self.rule_plan.drain_stats())
+        if self.result_cache is not None:
+            hits, misses = self.result_cache.drain_stats()
+            stats["cache_hits"] += hits
+            stats["cache_misses"] += misses
+        return stats
+
+    def merge_stats(self, stats):
+        """Add the statistics collected by a worker to this analyzer."""
+        self.run_stats.update(stats)
+
+    def report_stats(self):
+        """Log the statistics of the run (rule evaluations, result cache hits and misses, skipped files)."""
+        stats = self.drain_stats()
+        if any(stats[f"rule_evaluations:{name}"] for name in self.rule_plan.names):
+            logger.info("Rule plan (%s): %s", self.role_str, self.rule_plan.describe(stats))
+        if stats["skipped_files"]:
+            logger.info(
+                "Skipped files (%s): %d, see %s",
+                self.role_str, stats["skipped_files"], SkippedFilesReport.FILE_NAME
+            )
+        if self.result_cache is not None:
+            logger.info(
+                "Result cache (%s): %d hits, %d misses",
+                self.role_str, stats["cache_hits"], stats["cache_misses"]
+            )
+        if self.evidence_store is not None:
+            logger.info(
+                "Evidence store (%s): %d unchanged projects served from %s",
+                self.role_str, stats["stored_projects"], self.evidence_store.db_path
+            )
+        return stats
+
+    def read_source(self, file, skipped=None) -> Optional[SourceFile]:
+        """Read a file with the configured reader (None if unreadable or skipped)."""
+        return self.source_reader.read(file, skipped)
 
     def analyze_single_file(self, file, repo, **kwargs):
         """Analyze a single file and extract ML-related libraries and keywords."""
-        if not os.path.isfile(file):
+        source = self.read_source(file)
+        if source is None:
             return [], [], []
 
-        libraries, keywords, list_load_keywords = self.check_library(file, **kwargs)
+        try:
+            return self.analyze_source(source, repo, **kwargs)
+        finally:
+            source.close()
+
+    def analyze_source(self, source: SourceFile, repo, **kwargs):
+        """Analyze an already read file; every stage shares the same SourceFile."""
+        result = None
+        if self.result_cache is not None:
+            cache_key = self.cache_key(source, kwargs)
+            result = self.result_cache.get(cache_key, source.path)
+        if result is None:
+            result = self.check_library(source, **kwargs)
+            if self.result_cache is not None:
+                self.result_cache.put(cache_key, *result)
+
+        libraries, keywords, list_load_keywords = result
         if keywords:
-            logger.info(
-                "Found %s with ML libraries %s and training instruction %s in %s",
-                file, libraries, keywords, repo
+            match_log.log(
+                logger, logging.INFO, "Found %s with ML libraries %s and training instruction %s in %s",
+                source.path, libraries, keywords, repo
             )
         return libraries, keywords, list_load_keywords
 
-    def analyze_project(self, repo, project, directory, output_folder, **kwargs):
-        """Analyze a single project and return a DataFrame with results."""
+    def accepts_file(self, filename) -> bool:
+        """Check whether a file name passes the filters configured for this analyzer."""
+        return self.scanner.accepts_file(filename)
+
+    def keyword_rows(self, keywords, project, directory, source: SourceFile) -> list:
+        """Convert the keyword matches of a file into result rows.
+
+        The location of every match comes from the source, so notebook matches report the
+        code cell and the line within it.
+        """
         rows = []
-        for root, _, files in os.walk(repo):
-            for filename in files:
-                if not ProjectScanner.is_valid_file(filename, self.filters):
-                    continue
+        for keyword in keywords:
+            where, line_number = source.locate(keyword['line_number'])
+            rows.append({
+                'ProjectName': f'{project}/{directory}',
+                f'Is ML {self.role_str}': 'Yes',
+                'libraries': keyword['library'],
+                'where': where,
+                'keyword': keyword['keyword'],
+                'line_number': line_number
+            })
+        return rows
+
+    def report_skipped(self, skipped, project, directory, output_folder):
+        """Record the files of a project skipped by the source reader."""
+        if skipped:
+            self.run_stats["skipped_files"] += len(skipped)
+            SkippedFilesReport.append(output_folder, f'{project}/{directory}', skipped)
 
-                file_path = os.path.join(root, filename)
-                _, keywords, _ = self.analyze_single_file(
-                    file_path, repo, **kwargs
-                )
-                if keywords:
-                    for keyword in keywords:
-                        rows.append({
-                            'ProjectName': f'{project}/{directory}',
-                            f'Is ML {self.role_str}': 'Yes',
-                            'libraries': keyword['library'],
-                            'where': file_path,
-                            'keyword': keyword['keyword'],
-                            'line_number': keyword['line_number']
-                        })
-
-        df = pd.DataFrame(rows)
-        if not df.empty:
+    def save_project_results(self, rows, project, directory, output_folder) -> list:
+        """Write the per-project file (when enabled and there are matches) and return the rows."""
+        if self.write_project_files and rows:
             output_file = os.path.join(
-                output_folder, f'{project}_{directory}_ml_{self.role_str}.csv'
+                output_folder, f'{project}_{directory}_ml_{self.role_str}'
             )
-            df.to_csv(output_file, index=False)
+            with Metrics.timer("stage_seconds", stage="write"), self.result_format.writer(output_file) as writer:
+                writer.write_rows(rows)
 
-        return df
+        return rows
 
-    def analyze_projects_set(self, input_folder, output_folder, **kwargs):
-        """Analyze all projects in a folder and update the results file."""
-        all_rows = []
-        for project in os.listdir(input_folder):
-            project_path = os.path.join(input_folder, project)
-            if not os.path.isdir(project_path):
-                continue
-
-            for dir_path in os.listdir(project_path):
-                full_dir_path = os.path.join(project_path, dir_path)
-                if not os.path.isdir(full_dir_path):
+    def project_fingerprints(self, tasks, flags) -> list:
+        """
+        Fingerprint the projects of a run and check which are unchanged in the evidence store.
+
+        Args:
+            tasks (list[tuple]): (repo, project, directory, ...) of every project.
+            flags (dict): Rule flags passed to the analyzer.
+
+        Returns:
+            list[tuple[str | None, bool]]: (fingerprint, whether the project can be served
+            from the evidence store) of every task.
+        """
+        if self.evidence_store is None:
+            return [(None, False)] * len(tasks)
+        stored = self.evidence_store.fingerprints(self.role_str)
+        fingerprints = []
+        for repo, project, directory, *_ in tasks:
+            fingerprint = self.project_fingerprint(repo, flags)
+            fingerprints.append((
+                fingerprint,
+                fingerprint is not None and stored.get(f'{project}/{directory}') == fingerprint
+            ))
+        return fingerprints
+
+    def stored_project_results(self, project, directory, output_folder) -> list:
+        """Serve the rows of an unchanged project from the evidence store."""
+        rows = self.evidence_store.project_rows(f'{project}/{directory}', self.role_str)
+        self.run_stats["stored_projects"] += 1
+        return self.save_project_results(rows, project, directory, output_folder)
+
+    def store_project_results(self, rows, project, directory, fingerprint):
+        """Record the rows of an analyzed project in the evidence store, if any."""
+        if self.evidence_store is not None:
+            self.evidence_store.put_project(
+                f'{project}/{directory}', self.role_str, fingerprint, rows
+            )
+
+    def results_writer(self, output_folder):
+        """Return the streaming writer of the aggregated results file (results.csv by default)."""
+        return self.result_format.writer(os.path.join(output_folder, 'results'))
+
+    @classmethod
+    def decision_priority(cls, relative_path: str) -> tuple:
+        """
+        Sort key of a file in decision-only mode (smaller keys are analyzed first).
+
+        Training and inference scripts come first, then the other files; files under test,
+        example or documentation folders come last. Shallower paths come first within each
+        group. Files importing no dictionary library are still cheap wherever they come:
+        the import prefilter rejects them without decoding them.
+        """
+        parts = relative_path.lower().split("/")
+        return (
+            any(part in cls.DECISION_LAST_DIRS for part in parts[:-1]),
+            not any(hint in parts[-1] for hint in cls.DECISION_HINTS),
+            len(parts),
+            relative_path,
+        )
+
+    @classmethod
+    def decision_order(cls, files) -> list:
+        """Sort the (path, relative_path) pairs of a project by `decision_priority`."""
+        return sorted(files, key=lambda file: cls.decision_priority(file[1]))
+
+    @staticmethod
+    def iter_projects(input_folder):
+        """Yield (repo_path, project, directory) for every `<project>/<directory>` project.
+
+        Projects are checkouts or any other registered ProjectSource (bare repositories,
+        archives), reported under their name without the ``.git`` or archive suffix. They
+        are listed through the shared repository inventory, which the analysis never writes.
+        """
+        yield from RepoInventory.build(input_folder, footprint=False, persist=False).projects()
+
+    def analyze_project(self, repo, project, directory, output_folder, **kwargs):
+        """Analyze a single project (a path or a ProjectSource) and return its result rows.
+
+        In decision-only mode the files are analyzed most likely hits first, and the analysis
+        stops at the first file with keyword matches (after the per-file rules, e.g. consumer
+        Rule 3): its first match is the only row returned.
+        """
+        logger.info("Project: %s", project)
+        start = time.perf_counter()
+        rows = []
+        skipped = []
+        files = 0
+        with ProjectSource.open(repo) as project_source:
+            project_files = project_source.files(self.scanner)
+            if self.decision_only:
+                project_files = self.decision_order(project_files)
+            for file_path, relative_path in project_files:
+                files += 1
+                with Metrics.timer("stage_seconds", stage="read"):
+                    source = project_source.read(
+                        file_path, relative_path, self.source_reader, skipped
+                    )
+                if source is None:
                     continue
 
-                logger.info("Project: %s", project)
-                df = self.analyze_project(
-                    full_dir_path,
-                    project,
-                    dir_path,
-                    output_folder, **kwargs)
-                if not df.empty:
-                    all_rows.extend(df.to_dict(orient='records'))
+                try:
+                    _, keywords, _ = self.analyze_source(source, repo, **kwargs)
+                    if keywords and self.decision_only:
+                        rows = self.keyword_rows(keywords[:1], project, directory, source)
+                        break
+                    if keywords:
+                        rows.extend(self.keyword_rows(keywords, project, directory, source))
+                finally:
+                    source.close()
+
+        self.flush_cache()
+        self.report_skipped(skipped, project, directory, output_folder)
+        rows = self.save_project_results(rows, project, directory, output_folder)
+        Metrics.inc("files_scanned", files, role=self.role_str)
+        Metrics.record_repo(
+            f'{project}/{directory}', self.role_str, time.perf_counter() - start,
+            files=files, matches=len(rows)
+        )
+        return rows
+
+    def analyze_projects_set(self, input_folder, output_folder, **kwargs):
+        """Analyze all projects in a folder, streaming the rows into the results file.
+
+        With an evidence store, every analyzed project is recorded in it, and projects whose
+        fingerprint did not change since they were stored are served from it instead of
+        being analyzed again.
 
-        final_df = pd.DataFrame(all_rows)
-        if not final_df.empty:
-            results_file = os.path.join(output_folder, 'results.csv')
-            final_df.to_csv(results_file, index=False)
+        Returns:
+            int: Number of rows written to results.csv.
+        """
+        tasks = [
+            (full_dir_path, project, dir_path, output_folder)
+            for full_dir_path, project, dir_path in self.iter_projects(input_folder)
+        ]
+        fingerprints = self.project_fingerprints(tasks, kwargs)
+        analyzed = self.executor.map(
+            self, "analyze_project",
+            [task for task, (_, stored) in zip(tasks, fingerprints) if not stored], **kwargs
+        )
+        try:
+            with self.results_writer(output_folder) as writer:
+                for (_, project, directory, _), (fingerprint, stored) in zip(tasks, fingerprints):
+                    if stored:
+                        rows = self.stored_project_results(project, directory, output_folder)
+                    else:
+                        rows = next(analyzed)
+                        self.store_project_results(rows, project, directory, fingerprint)
+                    with Metrics.timer("stage_seconds", stage="write"):
+                        writer.write_rows(rows)
+                        writer.flush()
+        finally:
+            if self.evidence_store is not None:
+                self.evidence_store.close()
 
-        return final_df
+        self.report_stats()
+        return writer.rows_written
 
     @abstractmethod
-    def check_library(self, file, **kwargs):
-        """Abstract method to be implemented for extracting ML-specific features."""
-        raise NotImplementedError("Subclasses must implement check_library")
+    def default_rules(self) -> List[Rule]:
+        """Return the rules a file must satisfy to be classified for the role."""
+        raise NotImplementedError("Subclasses must implement default_rules")
+
+    def check_library(self, source: SourceFile, **kwargs):
+        """Run the rule plan on a file and return its (libraries, keywords, list_load_keywords)."""
+        return self.rule_plan.evaluate(self, source, kwargs).result()
@@ -1,29 +1,18 @@
 """Analyzer specialization for ML producers.
 
 This module provides MLProducerAnalyzer, a concrete MLAnalyzer focused on detecting projects that build/train models.
-It loads the producer library dictionary, filters the libraries actually used in each file,
-and delegates keyword detection to the configured extraction strategy.
+Its rules look up the shared producer knowledge base, filter the libraries actually used in each file,
+and delegate keyword detection to the configured extraction strategy.
 """
-from modules.library_manager.library_filter import LibraryFilter
 from modules.analyzer.ml_analyzer import MLAnalyzer
+from modules.analyzer.rules.keyword_rule import KeywordRule
+from modules.analyzer.rules.library_rule import LibraryRule
 
 
 class MLProducerAnalyzer(MLAnalyzer):
     """Analyzer for identifying ML activity related to producer libraries."""
 
-    def check_library(self, file, **kwargs):
+    def default_rules(self):
         """Check ML usage in a file using only the producer library."""
         producer_library = self.library_dicts[0]
-        list_load_keywords = []
-        keywords = []
-
-        library_dict = LibraryFilter.load_dict(producer_library)
-        related_dict = LibraryFilter.filter_used_libraries(file, library_dict)
-        libraries = related_dict['library'].tolist()
-
-        if not libraries:
-            return libraries, keywords, list_load_keywords
-
-        keywords = self.keyword_strategy.extract_keywords(file, related_dict)
-
-        return libraries, keywords, list_load_keywords
+        return [LibraryRule(producer_library), KeywordRule(producer_library)]
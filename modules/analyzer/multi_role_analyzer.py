@@ -0,0 +1,202 @@
+"""Fused analysis of several roles in a single walk over the repositories.
+
+MultiRoleAnalyzer wraps one configured MLAnalyzer per role. Every project is walked once and
+every file accepted by at least one role is read once into a SourceFile: its bytes, decoded
+text and parsed imports are then shared by the producer and consumer rules, and so are the
+dictionary rows of its imports (the producer rows serve both the producer rules and consumer
+Rule 3). Each role still writes its own per-project CSVs and results.csv, exactly as
+a separate run of that analyzer would, and records its evidence in its evidence store, if any.
+Per-project timings are recorded in the pipeline Metrics under the ``fused`` role."""
+
+import time
+from collections import Counter
+
+from modules.analyzer.execution import ProjectExecutor
+from modules.analyzer.ml_analyzer import MLAnalyzer
+from modules.scanner.project_scanner import CombinedProjectScanner
+from modules.scanner.project_source.project_source_base import ProjectSource
+from modules.utils.logger import get_logger
+from modules.utils.metrics import Metrics
+
+logger = get_logger(__name__)
+
+
+class MultiRoleAnalyzer:
+    """Runs several role analyzers over the same per-file data."""
+
+    def __init__(self, analyzers: dict, executor: ProjectExecutor = None):
+        """
+        Initialize the fused analyzer.
+
+        Args:
+            analyzers (dict[AnalyzerRole, MLAnalyzer]): One configured analyzer per role.
+            executor (ProjectExecutor, optional): Backend used to process the projects.
+        """
+        self.analyzers = analyzers
+        self.executor = executor or ProjectExecutor()
+        self.scanner = CombinedProjectScanner(
+            [analyzer.scanner for analyzer in analyzers.values()]
+        )
+        # Files are read once for every role, with the reader of the first one.
+        self.source_reader = next(iter(analyzers.values())).source_reader
+        self.decision_only = any(analyzer.decision_only for analyzer in analyzers.values())
+
+    def warm_up(self):
+        """Load the knowledge bases of every role ahead of the analysis."""
+        for analyzer in self.analyzers.values():
+            analyzer.warm_up()
+
+    def drain_stats(self) -> dict:
+        """Return and reset the run statistics of every role."""
+        return {role: analyzer.drain_stats() for role, analyzer in self.analyzers.items()}
+
+    def merge_stats(self, stats):
+        """Add the statistics collected by a worker to every role."""
+        for role, role_stats in stats.items():
+            self.analyzers[role].merge_stats(role_stats)
+
+    def analyze_project(self, repo, project, directory, output_folders, role_kwargs):
+        """
+        Analyze a single project for every role.
+
+        Args:
+            repo (str | ProjectSource): Path of the project (checkout or bare repository).
+            project (str): Owner folder name.
+            directory (str): Repository folder name.
+            output_folders (dict[AnalyzerRole, str]): Output folder of every role.
+            role_kwargs (dict[AnalyzerRole, dict]): Extra analyzer arguments of every role.
+
+        Returns:
+            dict[AnalyzerRole, list]: The per-role project result rows.
+
+        Roles in decision-only mode stop being evaluated at their first piece of evidence, and
+        the walk stops once no role is left.
+        """
+        logger.info("Project: %s", project)
+        start = time.perf_counter()
+        rows = {role: [] for role in self.analyzers}
+        skipped = {role: [] for role in self.analyzers}
+        files = Counter()
+        active = dict(self.analyzers)
+        with ProjectSource.open(repo) as project_source:
+            walk = self.scanner.for_walk()
+            project_files = project_source.files(walk)
+            if self.decision_only:
+                project_files = MLAnalyzer.decision_order(project_files)
+            for file_path, relative_path in project_files:
+                if not active:
+                    break
+                ignore_rules = walk.ignore_rules_of(relative_path)
+                roles = [
+                    role for role, analyzer in active.items()
+                    if analyzer.scanner.accepts_path(
+                        relative_path, ignore_rules if analyzer.scanner.use_gitignore else ()
+                    )
+                ]
+                if not roles:
+                    continue
+
+                files.update(roles)
+                file_skipped = []
+                with Metrics.timer("stage_seconds", stage="read"):
+                    source = project_source.read(
+                        file_path, relative_path, self.source_reader, file_skipped
+                    )
+                if source is None:
+                    for role in roles:
+                        skipped[role].extend(file_skipped)
+                    continue
+
+                try:
+                    for role in roles:
+                        analyzer = self.analyzers[role]
+                        _, keywords, _ = analyzer.analyze_source(
+                            source, repo, **role_kwargs.get(role, {})
+                        )
+                        if keywords and analyzer.decision_only:
+                            rows[role] = analyzer.keyword_rows(keywords[:1], project, directory, source)
+                            del active[role]
+                        elif keywords:
+                            rows[role].extend(
+                                analyzer.keyword_rows(keywords, project, directory, source)
+                            )
+                finally:
+                    source.close()
+
+        for role, analyzer in self.analyzers.items():
+            analyzer.flush_cache()
+            analyzer.report_skipped(skipped[role], project, directory, output_folders[role])
+            Metrics.inc("files_scanned", files[role], role=analyzer.role_str)
+
+        project_rows = {
+            role: analyzer.save_project_results(
+                rows[role], project, directory, output_folders[role]
+            )
+            for role, analyzer in self.analyzers.items()
+        }
+        if Metrics.enabled:
+            Metrics.record_repo(
+                f'{project}/{directory}', "fused", time.perf_counter() - start,
+                files=sum(files.values()),
+                **{f'{role.value}_matches': len(role_rows) for role, role_rows in project_rows.items()}
+            )
+        return project_rows
+
+    def analyze_projects_set(self, input_folder, output_folders, role_kwargs=None):
+        """
+        Analyze all projects in a folder, streaming the rows into the results file of every role.
+
+        Returns:
+            dict[AnalyzerRole, int]: Number of rows written to results.csv for every role.
+        """
+        role_kwargs = role_kwargs or {}
+        tasks = [
+            (full_dir_path, project, dir_path, output_folders, role_kwargs)
+            for full_dir_path, project, dir_path in MLAnalyzer.iter_projects(input_folder)
+        ]
+        fingerprints = {
+            role: analyzer.project_fingerprints(tasks, role_kwargs.get(role, {}))
+            for role, analyzer in self.analyzers.items()
+        }
+        # A project is served from the evidence store only if it is unchanged for every role.
+        stored = [
+            all(fingerprints[role][index][1] for role in self.analyzers)
+            for index in range(len(tasks))
+        ]
+        analyzed = self.executor.map(
+            self, "analyze_project", [task for task, done in zip(tasks, stored) if not done]
+        )
+        writers = {
+            role: analyzer.results_writer(output_folders[role])
+            for role, analyzer in self.analyzers.items()
+        }
+        try:
+            for index, (_, project, directory, _, _) in enumerate(tasks):
+                if stored[index]:
+                    project_rows = {
+                        role: analyzer.stored_project_results(
+                            project, directory, output_folders[role]
+                        )
+                        for role, analyzer in self.analyzers.items()
+                    }
+                else:
+                    project_rows = next(analyzed)
+                    for role, analyzer in self.analyzers.items():
+                        analyzer.store_project_results(
+                            project_rows[role], project, directory, fingerprints[role][index][0]
+                        )
+                with Metrics.timer("stage_seconds", stage="write"):
+                    for role, rows in project_rows.items():
+                        writers[role].write_rows(rows)
+                        writers[role].flush()
+        finally:
+            for writer in writers.values():
+                writer.close()
+            for analyzer in self.analyzers.values():
+                if analyzer.evidence_store is not None:
+                    analyzer.evidence_store.close()
+
+        for analyzer in self.analyzers.values():
+            analyzer.report_stats()
+
+        return {role: writer.rows_written for role, writer in writers.items()}
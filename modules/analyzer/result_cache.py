@@ -0,0 +1,147 @@
+"""Persistent, content-addressed cache of per-file analysis results.
+
+Results of `MLAnalyzer.analyze_source` are stored in a SQLite database keyed by the SHA-256 of
+the file content together with everything else that can change the outcome: the analyzer
+role and class, the hash of the dictionaries, the keyword strategy and the rule flags (e.g.
+``rules_3``). Unchanged files of a re-run, as well as identical files vendored or forked into
+other repositories, are then served from the cache instead of being parsed and matched again.
+The file path is not part of the key: it is re-attached to the cached matches on every hit."""
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+
+from modules.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+class FileResultCache:
+    """SQLite-backed cache of (libraries, keywords, load keywords) per file content."""
+
+    SCHEMA_VERSION = 1
+    _FLUSH_SIZE = 256
+
+    def __init__(self, db_path):
+        """
+        Initialize the cache; the database is created on first use.
+
+        Args:
+            db_path (str): Location of the SQLite database.
+        """
+        self.db_path = str(db_path)
+        self.hits = 0
+        self.misses = 0
+        self._local = threading.local()
+        self._stats_lock = threading.Lock()
+
+    def __getstate__(self):
+        # Connections are per process and per thread: workers reopen the database.
+        state = self.__dict__.copy()
+        del state["_local"]
+        del state["_stats_lock"]
+        state["hits"] = state["misses"] = 0
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._local = threading.local()
+        self._stats_lock = threading.Lock()
+
+    def _connection(self) -> sqlite3.Connection:
+        """Return the connection of the current thread, creating the schema if needed."""
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            os.makedirs(os.path.dirname(os.path.abspath(self.db_path)), exist_ok=True)
+            connection = sqlite3.connect(self.db_path, timeout=60)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS file_results ("
+                "key TEXT PRIMARY KEY, libraries TEXT, keywords TEXT, load_keywords TEXT)"
+            )
+            connection.commit()
+            self._local.connection = connection
+            self._local.pending = []
+        return connection
+
+    @classmethod
+    def make_key(cls, content_hash, role, analyzer, dict_hash, strategy, flags) -> str:
+        """
+        Build the cache key of a file analysis.
+
+        Args:
+            content_hash (str): SHA-256 of the file content.
+            role (str): Analyzer role.
+            analyzer (str): Analyzer class name.
+            dict_hash (str): Combined hash of the dictionaries in use.
+            strategy (str): Keyword strategy class name.
+            flags (dict): Rule flags passed to the analyzer (e.g. ``rules_3``).
+
+        Returns:
+            str: The key.
+        """
+        flags = json.dumps(flags, sort_keys=True, default=str)
+        material = "\0".join(
+            [str(cls.SCHEMA_VERSION), content_hash, role, analyzer, dict_hash, strategy, flags]
+        )
+        return hashlib.sha256(material.encode("utf-8")).hexdigest()
+
+    def get(self, key, file):
+        """
+        Look up a cached result.
+
+        Args:
+            key (str): Cache key (see `make_key`).
+            file (str): Path to report in the cached keyword matches.
+
+        Returns:
+            tuple | None: (libraries, keywords, list_load_keywords), or None on a miss.
+        """
+        row = self._connection().execute(
+            "SELECT libraries, keywords, load_keywords FROM file_results WHERE key = ?", (key,)
+        ).fetchone()
+        with self._stats_lock:
+            if row is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+
+        libraries, keywords, list_load_keywords = (json.loads(value) for value in row)
+        for keyword in keywords:
+            if "file" in keyword:
+                keyword["file"] = file
+        return libraries, keywords, list_load_keywords
+
+    def put(self, key, libraries, keywords, list_load_keywords):
+        """Queue a result for storage (written in batches, see `flush`)."""
+        self._connection()
+        stored = [
+            {k: None if k == "file" else v for k, v in keyword.items()} for keyword in keywords
+        ]
+        self._local.pending.append(
+            (key, json.dumps(libraries), json.dumps(stored), json.dumps(list_load_keywords))
+        )
+        if len(self._local.pending) >= self._FLUSH_SIZE:
+            self.flush()
+
+    def flush(self):
+        """Write the queued results of the current thread in a single transaction."""
+        pending = getattr(self._local, "pending", None)
+        if not pending:
+            return
+        connection = self._connection()
+        with connection:
+            connection.executemany(
+                "INSERT OR REPLACE INTO file_results VALUES (?, ?, ?, ?)", pending
+            )
+        self._local.pending = []
+
+    def drain_stats(self) -> tuple:
+        """Return and reset the (hits, misses) counted since the last call."""
+        with self._stats_lock:
+            stats = (self.hits, self.misses)
+            self.hits = self.misses = 0
+        return stats
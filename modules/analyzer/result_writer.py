@@ -0,0 +1,228 @@
+"""Streaming writer for analysis result files.
+
+Rows are appended to the CSV as soon as a project finishes instead of being accumulated for
+the whole corpus: memory stays bounded by the writer buffer, and partial results of a long
+run are visible on disk while it is still in progress. The output matches what
+``pd.DataFrame(rows).to_csv(path, index=False)`` writes, and, like before, the file is only
+created once there is at least one row to write.
+
+Results can also be written in the columnar Parquet format (ResultFormat.PARQUET, requires
+the optional pyarrow dependency): string columns are dictionary-encoded and compressed, so the
+evidence of a large corpus takes a fraction of the CSV size, and readers load only the columns
+they need (`ResultFormat.read_columns`)."""
+
+import csv
+import os
+from enum import Enum
+
+import pandas as pd
+
+from modules.utils.logger import get_logger
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # optional dependency, only needed for the Parquet format
+    pa = pq = None
+
+logger = get_logger(__name__)
+
+
+class ResultFormat(Enum):
+    """File format of the analysis results."""
+    CSV = "csv"
+    PARQUET = "parquet"
+
+    @property
+    def extension(self) -> str:
+        """File name extension of the format (e.g. ``.csv``)."""
+        return f".{self.value}"
+
+    def writer(self, path_without_extension):
+        """Return the streaming writer of a results file of this format."""
+        path = f"{path_without_extension}{self.extension}"
+        if self is ResultFormat.PARQUET:
+            return ParquetResultWriter(path)
+        return StreamingResultWriter(path)
+
+    @classmethod
+    def of(cls, path):
+        """Return the format of a results file from its extension (None if not a results file)."""
+        extension = os.path.splitext(str(path))[1].lower()
+        for result_format in cls:
+            if extension == result_format.extension:
+                return result_format
+        return None
+
+    @staticmethod
+    def read_columns(path, columns) -> pd.DataFrame:
+        """
+        Read only some columns of a results file, whatever its format.
+
+        Args:
+            path (str): Location of the CSV or Parquet results file.
+            columns (list[str]): Columns to load.
+
+        Returns:
+            pd.DataFrame: The columns, with plain string (object) values.
+        """
+        if ResultFormat.of(path) is ResultFormat.PARQUET:
+            frame = pd.read_parquet(path, columns=columns)
+            # Dictionary-encoded columns are read as categoricals.
+            for column in frame.select_dtypes("category").columns:
+                frame[column] = frame[column].astype(object)
+            return frame
+        return pd.read_csv(path, usecols=columns)
+
+
+class StreamingResultWriter:
+    """Appends result rows to a CSV file through a bounded buffer."""
+
+    def __init__(self, path, buffer_size: int = 1000):
+        """
+        Initialize the writer; the file is opened lazily on the first row.
+
+        Args:
+            path (str): Location of the CSV file.
+            buffer_size (int): Maximum number of rows kept in memory before flushing.
+        """
+        self.path = path
+        self.buffer_size = buffer_size
+        self.rows_written = 0
+        self._buffer = []
+        self._columns = None
+        self._file = None
+        self._writer = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def write_rows(self, rows):
+        """Queue rows for writing, flushing whenever the buffer is full."""
+        for row in rows:
+            self._buffer.append(row)
+            if len(self._buffer) >= self.buffer_size:
+                self.flush()
+
+    def flush(self):
+        """Write the buffered rows and push them to disk."""
+        if not self._buffer:
+            return
+        if self._writer is None:
+            self._columns = list(self._buffer[0])
+            self._file = open(self.path, "w", newline="", encoding="utf-8")
+            self._writer = csv.writer(self._file, lineterminator=os.linesep)
+            self._writer.writerow(self._columns)
+
+        self._writer.writerows(
+            [["" if row.get(column) is None else row.get(column) for column in self._columns]
+             for row in self._buffer]
+        )
+        self._file.flush()
+        self.rows_written += len(self._buffer)
+        self._buffer = []
+
+    def close(self):
+        """Flush the remaining rows and close the file."""
+        self.flush()
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+            self._writer = None
+
+
+class ParquetResultWriter:
+    """Appends result rows to a Parquet file, one row group per full buffer.
+
+    The columns of the file are those of the first row group: the analyzers write the same
+    columns in every row, and a column first appearing in a later row group is an error. Integer
+    result columns are stored as int64, every other column as a dictionary-encoded string. A
+    Parquet file is only readable once closed, so `flush` only writes full row groups instead of
+    a tiny one per project.
+    """
+
+    # Result columns holding integers (or nothing).
+    INTEGER_COLUMNS = frozenset({"line_number"})
+
+    def __init__(self, path, buffer_size: int = 50000):
+        """
+        Initialize the writer; the file is opened lazily on the first row group.
+
+        Args:
+            path (str): Location of the Parquet file.
+            buffer_size (int): Number of rows of a row group.
+        """
+        if pa is None:
+            raise ImportError("The Parquet result format requires pyarrow (pip install pyarrow)")
+        self.path = path
+        self.buffer_size = buffer_size
+        self.rows_written = 0
+        self._buffer = []
+        self._schema = None
+        self._writer = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def write_rows(self, rows):
+        """Queue rows for writing, writing a row group whenever the buffer is full."""
+        for row in rows:
+            self._buffer.append(row)
+            if len(self._buffer) >= self.buffer_size:
+                self._write_row_group()
+
+    def flush(self):
+        """Write the buffered rows if they fill a row group."""
+        if len(self._buffer) >= self.buffer_size:
+            self._write_row_group()
+
+    @classmethod
+    def _build_schema(cls, columns):
+        """Return the schema of the given columns: int64 for `INTEGER_COLUMNS`, strings otherwise."""
+        return pa.schema([
+            pa.field(column, pa.int64()) if column in cls.INTEGER_COLUMNS
+            else pa.field(column, pa.dictionary(pa.int32(), pa.string()))
+            for column in columns
+        ])
+
+    def _write_row_group(self):
+        if not self._buffer:
+            return
+        columns = list(dict.fromkeys(column for row in self._buffer for column in row))
+        if self._writer is None:
+            self._schema = self._build_schema(columns)
+            self._writer = pq.ParquetWriter(self.path, self._schema, compression="zstd")
+        else:
+            added = [column for column in columns if column not in self._schema.names]
+            if added:
+                raise ValueError(
+                    f"Cannot add columns {added} to {self.path}: its schema was fixed by the first "
+                    f"row group ({self._schema.names})"
+                )
+
+        arrays = {}
+        for field in self._schema:
+            values = [row.get(field.name) for row in self._buffer]
+            if pa.types.is_dictionary(field.type):
+                values = [None if value is None else str(value) for value in values]
+            else:
+                for value in values:
+                    if value is not None and not isinstance(value, int):
+                        raise ValueError(f"Column {field.name} of {self.path} holds integers, not {value!r}")
+            arrays[field.name] = pa.array(values, type=field.type)
+        self._writer.write_table(pa.table(arrays, schema=self._schema))
+        self.rows_written += len(self._buffer)
+        self._buffer = []
+
+    def close(self):
+        """Write the remaining rows and the file footer."""
+        self._write_row_group()
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
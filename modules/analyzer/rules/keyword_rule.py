@@ -0,0 +1,36 @@
+"""Rule accepting the files that use a keyword of the libraries they import."""
+
+from modules.analyzer.rules.rule_base import Rule, RuleContext
+
+
+class KeywordRule(Rule):
+    """
+    Accepts the files matching a keyword of the dictionary rows of their imported libraries.
+
+    The matches are kept in the context and become the result rows of the file. Keyword
+    extraction reads the whole file, so the plan normally runs this rule last.
+    """
+
+    COST_HINT = 5e-4
+    REJECT_HINT = 0.5
+
+    def __init__(self, dict_type):
+        """
+        Initialize the rule.
+
+        Args:
+            dict_type (LibraryDictType | str): The library dictionary holding the keywords.
+        """
+        self.dict_type = dict_type
+
+    @property
+    def name(self) -> str:
+        return f"keywords[{self.dictionary_label(self.dict_type)}]"
+
+    def evaluate(self, context: RuleContext) -> bool:
+        if not context.imported_libraries(self.dict_type):
+            return False
+        context.keywords = context.analyzer.keyword_strategy.extract_keywords_from_source(
+            context.source, context.related(self.dict_type)
+        )
+        return bool(context.keywords)
@@ -0,0 +1,31 @@
+"""Rule accepting the files that import a library of a dictionary."""
+
+from modules.analyzer.rules.rule_base import Rule, RuleContext
+
+
+class LibraryRule(Rule):
+    """
+    Accepts the files importing at least one library of a dictionary.
+
+    Most files are rejected by the byte-level import prefilter of the knowledge base, without
+    being decoded, which makes this the cheapest and most selective rule.
+    """
+
+    COST_HINT = 2e-5
+    REJECT_HINT = 0.9
+
+    def __init__(self, dict_type):
+        """
+        Initialize the rule.
+
+        Args:
+            dict_type (LibraryDictType | str): The library dictionary.
+        """
+        self.dict_type = dict_type
+
+    @property
+    def name(self) -> str:
+        return f"libraries[{self.dictionary_label(self.dict_type)}]"
+
+    def evaluate(self, context: RuleContext) -> bool:
+        return bool(context.imported_libraries(self.dict_type))
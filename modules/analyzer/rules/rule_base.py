@@ -0,0 +1,129 @@
+"""Abstract base class for the classification rules of an analyzer, and their per-file context.
+
+A Rule is a predicate over a single file: the file is classified for the role only if every
+enabled rule of the analyzer accepts it. Rules do not depend on each other's order, so the
+RulePlan is free to evaluate them cheapest and most selective first. Intermediate results
+shared by several rules (e.g. the dictionary rows of the imported libraries) are computed
+once per file through the RuleContext."""
+
+from abc import ABC, abstractmethod
+from pathlib import Path
+
+import pandas as pd
+
+from modules.library_manager.library_filter import LibraryFilter
+
+
+class RuleContext:
+    """Per-file state of a rule plan evaluation: the file, the rule flags and the shared results."""
+
+    __slots__ = ("analyzer", "source", "flags", "keywords", "rejected_by", "_related", "_libraries")
+
+    def __init__(self, analyzer, source, flags):
+        """
+        Initialize the context of a file.
+
+        Args:
+            analyzer (MLAnalyzer): Analyzer running the rules (knowledge bases, keyword strategy).
+            source (SourceFile): The file being classified.
+            flags (dict): Rule flags of the analysis (e.g. ``rules_3``).
+        """
+        self.analyzer = analyzer
+        self.source = source
+        self.flags = flags
+        self.keywords = []
+        self.rejected_by = None
+        self._related = {}
+        self._libraries = {}
+
+    def related(self, dict_type) -> pd.DataFrame:
+        """
+        Return the dictionary rows of the libraries imported by the file.
+
+        The rows are kept on the SourceFile, so every rule, and every role analyzing the same
+        instance, filters the imports against a given dictionary only once.
+        """
+        related_dict = self._related.get(dict_type)
+        if related_dict is None:
+            knowledge_base = self.analyzer.knowledge_base(dict_type)
+            key = ("related", knowledge_base.content_hash)
+            related_dict = self.source.derived.get(key)
+            if related_dict is None:
+                related_dict = LibraryFilter.filter_source_libraries(self.source, knowledge_base)
+                self.source.derived[key] = related_dict
+            self._related[dict_type] = related_dict
+        return related_dict
+
+    def imported_libraries(self, dict_type) -> list:
+        """Return the libraries of a dictionary imported by the file."""
+        libraries = self._libraries.get(dict_type)
+        if libraries is None:
+            related_dict = self.related(dict_type)
+            libraries = related_dict['library'].tolist() if len(related_dict) else []
+            self._libraries[dict_type] = libraries
+        return libraries
+
+    @property
+    def libraries(self) -> list:
+        """Libraries of the role dictionary imported by the file, if a rule looked them up."""
+        if not self.analyzer.library_dicts:
+            return []
+        return self._libraries.get(self.analyzer.library_dicts[0], [])
+
+    def result(self) -> tuple:
+        """Return the (libraries, keywords, list_load_keywords) result of the file."""
+        keywords = self.keywords if self.rejected_by is None else []
+        return self.libraries, keywords, []
+
+
+class Rule(ABC):
+    """
+    Abstract base class for classification rules.
+
+    The hints are the planner's estimates until it has measured the rule on actual files.
+    """
+
+    # Rough duration of one evaluation, in seconds.
+    COST_HINT = 1e-4
+    # Rough share of the evaluated files the rule rejects.
+    REJECT_HINT = 0.5
+    # Names of the rule flags read by `enabled` (e.g. ``rules_3``).
+    FLAGS = ()
+
+    @property
+    @abstractmethod
+    def name(self) -> str:
+        """
+        Name of the rule in the statistics, cache keys and fingerprints.
+
+        It must tell apart every configuration of the rule that can change its outcome.
+        """
+
+    def enabled(self, flags) -> bool:
+        """
+        Determine whether the rule applies to an analysis with the given flags.
+
+        Args:
+            flags (dict): Rule flags of the analysis.
+
+        Returns:
+            bool: True if the rule is evaluated, False if it is skipped.
+        """
+        return True
+
+    @abstractmethod
+    def evaluate(self, context: RuleContext) -> bool:
+        """
+        Evaluate the rule on a file.
+
+        Args:
+            context (RuleContext): The file, the rule flags and the results shared between rules.
+
+        Returns:
+            bool: True if the file satisfies the rule, False if it is rejected.
+        """
+
+    @staticmethod
+    def dictionary_label(dict_type) -> str:
+        """Short name of a library dictionary (its enum member, or its file name)."""
+        return getattr(dict_type, "name", None) or Path(dict_type).stem
@@ -0,0 +1,132 @@
+"""Cost-based execution plan of the rules of an analyzer.
+
+The plan evaluates the enabled rules of a file one after the other and stops at the first
+rejection. Since the rules are independent predicates, the order does not change the outcome,
+only the time spent: the plan sorts them by expected cost per rejection (average duration
+divided by rejection rate), so cheap and selective rules run first. Both figures start from
+the hints of every rule and are then measured on the files of the run; the plan re-orders the
+rules every REPLAN_INTERVAL files. Worker processes adapt their own copy of the plan.
+
+Evaluations and rejections per rule are also drained into the analyzer run statistics (reported
+at the end of the run) and counted in the pipeline Metrics."""
+
+import time
+from collections import Counter
+
+from modules.analyzer.rules.rule_base import Rule, RuleContext
+from modules.utils.metrics import Metrics
+
+
+class RuleStats:
+    """Evaluations, rejections and total duration of a rule, and the part already drained."""
+
+    __slots__ = ("evaluations", "rejections", "seconds", "drained_evaluations", "drained_rejections")
+
+    def __init__(self):
+        self.evaluations = 0
+        self.rejections = 0
+        self.seconds = 0.0
+        self.drained_evaluations = 0
+        self.drained_rejections = 0
+
+
+class RulePlan:
+    """Orders and runs the rules of an analyzer."""
+
+    # Weight of the hints, in evaluations, against the measured figures.
+    PRIOR_WEIGHT = 8
+    # Files evaluated between two re-orderings of the rules.
+    REPLAN_INTERVAL = 100
+
+    def __init__(self, rules):
+        """
+        Initialize the plan.
+
+        Args:
+            rules (list[Rule]): The rules a file must satisfy.
+        """
+        self.rules = list(rules)
+        self.names = [rule.name for rule in self.rules]
+        self.stats = [RuleStats() for _ in self.rules]
+        # (rule, name, stats) of every rule, in evaluation order.
+        self.order = list(zip(self.rules, self.names, self.stats))
+        self._files = 0
+        self.replan()
+
+    @property
+    def signature(self) -> str:
+        """Names of the rules, in declaration order."""
+        return ",".join(self.names)
+
+    @property
+    def flags(self) -> frozenset:
+        """Names of the rule flags the rules of the plan read."""
+        return frozenset(flag for rule in self.rules for flag in rule.FLAGS)
+
+    @classmethod
+    def rank(cls, rule: Rule, stats: RuleStats) -> float:
+        """Expected duration spent per rejected file (lower runs first)."""
+        weight = cls.PRIOR_WEIGHT
+        cost = (stats.seconds + rule.COST_HINT * weight) / (stats.evaluations + weight)
+        reject_rate = (stats.rejections + rule.REJECT_HINT * weight) / (stats.evaluations + weight)
+        return cost / max(reject_rate, 1e-6)
+
+    def replan(self):
+        """Sort the rules by their current rank."""
+        self.order = sorted(self.order, key=lambda entry: self.rank(entry[0], entry[2]))
+
+    def evaluate(self, analyzer, source, flags) -> RuleContext:
+        """
+        Run the enabled rules on a file until one rejects it.
+
+        Args:
+            analyzer (MLAnalyzer): Analyzer owning the plan.
+            source (SourceFile): The file to classify.
+            flags (dict): Rule flags of the analysis.
+
+        Returns:
+            RuleContext: The context of the file, holding its result.
+        """
+        context = RuleContext(analyzer, source, flags)
+        metrics = Metrics.enabled
+        perf_counter = time.perf_counter
+        for rule, name, stats in self.order:
+            if not rule.enabled(flags):
+                continue
+            start = perf_counter()
+            passed = rule.evaluate(context)
+            stats.seconds += perf_counter() - start
+            stats.evaluations += 1
+            if metrics:
+                Metrics.inc("rule_evaluations", rule=name)
+            if not passed:
+                stats.rejections += 1
+                if metrics:
+                    Metrics.inc("rule_rejections", rule=name)
+                context.rejected_by = name
+                break
+
+        self._files += 1
+        if self._files % self.REPLAN_INTERVAL == 0:
+            self.replan()
+        return context
+
+    def drain_stats(self) -> Counter:
+        """Return the evaluations and rejections of every rule since the last call."""
+        drained = Counter()
+        for name, stats in zip(self.names, self.stats):
+            drained[f"rule_evaluations:{name}"] += stats.evaluations - stats.drained_evaluations
+            drained[f"rule_rejections:{name}"] += stats.rejections - stats.drained_rejections
+            stats.drained_evaluations = stats.evaluations
+            stats.drained_rejections = stats.rejections
+        return drained
+
+    def describe(self, run_stats) -> str:
+        """Summarize the rules, in plan order, with the evaluations and rejections of a run."""
+        parts = []
+        for _, name, _ in self.order:
+            evaluations = run_stats[f"rule_evaluations:{name}"]
+            rejections = run_stats[f"rule_rejections:{name}"]
+            share = 100 * rejections / evaluations if evaluations else 0.0
+            parts.append(f"{name} {evaluations} evaluated, {share:.1f}% rejected")
+        return " -> ".join(parts)
@@ -0,0 +1,44 @@
+"""Consumer Rule 3: reject the files calling the training methods of a producer library."""
+
+from modules.analyzer.rules.rule_base import Rule, RuleContext
+from modules.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+class TrainingMethodRule(Rule):
+    """
+    Accepts the files that do not use the training methods of the producer libraries they import.
+
+    The rule only applies when the analysis runs with the ``rules_3`` flag.
+    """
+
+    COST_HINT = 4e-5
+    REJECT_HINT = 0.3
+    FLAGS = ("rules_3",)
+
+    def __init__(self, dict_type):
+        """
+        Initialize the rule.
+
+        Args:
+            dict_type (LibraryDictType | str): The producer library dictionary.
+        """
+        self.dict_type = dict_type
+
+    @property
+    def name(self) -> str:
+        return f"no_training[{self.dictionary_label(self.dict_type)}]"
+
+    def enabled(self, flags) -> bool:
+        return bool(flags.get("rules_3", False))
+
+    def evaluate(self, context: RuleContext) -> bool:
+        if not context.imported_libraries(self.dict_type):
+            return True
+        source = context.source
+        if not source.searchable:
+            logger.error("Error reading file %s", source.path)
+            return True
+        related_dict = context.related(self.dict_type)
+        return not any(source.contains(keyword) for keyword in related_dict['Keyword'])
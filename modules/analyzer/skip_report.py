@@ -0,0 +1,44 @@
+"""Report of the files skipped during an analysis run.
+
+Skipped files are appended to `skipped_files.jsonl` in the run folder, one JSON object per
+file. The report is not a CSV on purpose: the result analysis reads every CSV of a run
+folder as project results. Each project is appended with a single write on a file opened in
+append mode, so the workers of a process pool can report concurrently."""
+
+import json
+import os
+
+from modules.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+class SkippedFilesReport:
+    """Appends skipped-file records to the report of a run folder."""
+
+    FILE_NAME = "skipped_files.jsonl"
+
+    @staticmethod
+    def append(output_folder, project_name: str, records):
+        """
+        Append the skipped files of a project.
+
+        Args:
+            output_folder (str): Run folder of the analysis.
+            project_name (str): ``<project>/<directory>`` name, as in the results.
+            records (list[dict]): ``{"path", "reason", "size"}`` record of every skipped file.
+        """
+        if not records:
+            return
+        payload = "".join(
+            json.dumps({"ProjectName": project_name, **record}) + "\n" for record in records
+        ).encode("utf-8")
+        path = os.path.join(output_folder, SkippedFilesReport.FILE_NAME)
+        try:
+            fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_APPEND, 0o644)
+            try:
+                os.write(fd, payload)
+            finally:
+                os.close(fd)
+        except OSError as e:
+            logger.error("Error writing %s: %s", path, e)
@@ -0,0 +1,70 @@
+"""Append-only journal of the clone attempts.
+
+Every finished clone (success or failure) is appended to a JSON-lines file as a single
+record, so recording an outcome costs one small write regardless of how many repositories
+were already processed, and a run interrupted at any point can be resumed: the last record
+of each project tells whether it still has to be cloned. A truncated last line (e.g. after a
+crash) is ignored on load."""
+
+import json
+import os
+import time
+from threading import Lock
+
+from modules.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+class CloneJournal:
+    """JSON-lines journal with the outcome of every clone attempt."""
+
+    CLONED = "cloned"
+    FAILED = "failed"
+
+    def __init__(self, path):
+        """
+        Initialize the journal.
+
+        Args:
+            path (str): Location of the JSON-lines file (created on the first record).
+        """
+        self.path = path
+        self._lock = Lock()
+
+    def load(self) -> dict:
+        """
+        Read the journal.
+
+        Returns:
+            dict[str, dict]: The last record of every project, keyed by ProjectName.
+        """
+        records = {}
+        if not os.path.exists(self.path):
+            return records
+        with open(self.path, encoding="utf-8") as f:
+            for line_number, line in enumerate(f, 1):
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    logger.warning("Ignoring malformed journal line %d of %s", line_number, self.path)
+                    continue
+                records[record["ProjectName"]] = record
+        return records
+
+    def record(self, project_name: str, status: str, **fields):
+        """
+        Append the outcome of a project.
+
+        Args:
+            project_name (str): ``owner/repo`` name of the project.
+            status (str): CLONED or FAILED.
+            **fields: Extra details (url, attempts, error, transient, duration, ...).
+        """
+        record = {"ProjectName": project_name, "status": status, "timestamp": time.time(), **fields}
+        line = json.dumps(record) + "\n"
+        with self._lock:
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(line)
+                f.flush()
@@ -1,88 +1,297 @@
 """Clone a list of GitHub repositories from a CSV and persist the outcome of each attempt.
 
-Given an input file, the component performs shallow clones (depth=1) into a target directory,
-executes operations concurrently via a thread pool, and records successes in cloned_log.csv
-and failures in errors.csv with sanitized messages.
+Given an input file, the component performs shallow clones (depth=1) into a target directory
+by running `git` in a bounded thread pool. Failures are classified as transient (network
+errors, timeouts, server errors), which are retried with exponential backoff, or permanent
+(missing or private repositories, ...), which are not. Each clone is written to a temporary
+`.partial` directory and moved into place only once complete.
 
-It automatically skips repositories already listed as cloned, ensuring idempotent runs.
-Paths (input/output/logs), the maximum number of repositories to process, and the degree of
-parallelism are configurable at instantiation.
+In SPARSE mode the clone is a blob-less partial clone (``--filter=blob:none``) whose sparse
+checkout only materializes the files matching the given patterns (e.g. ``*.py``, derived from
+the analyzers' file filters), so datasets, model weights and media are never downloaded.
+
+The outcome of every project is appended to an append-only journal (clone_journal.jsonl), so
+recording a result costs a single write, and a restarted run resumes where the previous one
+stopped: cloned projects and permanent failures are skipped, transient failures are retried.
+Projects already present in the repos directory (see RepoInventory, refreshed at the end of
+every run) are skipped as well.
+
+Paths (input/output/logs), the URL template (e.g. ``file:///srv/mirrors/{name}.git`` for
+local bare repositories), the maximum number of repositories to process, the retry policy
+and the degree of parallelism are configurable at instantiation.
 
 The goal is to provide a reusable, traceable acquisition step that cleanly separates configuration
 from execution and produces reproducible logs debugging."""
 
+import concurrent.futures
 import os
+import random
+import shutil
+import subprocess
+import time
+from collections import Counter
+from enum import Enum
 from pathlib import Path
-import concurrent.futures
-from threading import Lock
 
-import git
 import pandas as pd
-from git import Repo
 
+from modules.cloner.clone_journal import CloneJournal
+from modules.cloner.repo_inventory import RepoInventory
 from modules.utils.logger import get_logger
+from modules.utils.metrics import Metrics
 
 logger = get_logger(__name__)
 
 
+class CloneMode(Enum):
+    """How much of every repository is fetched."""
+    SHALLOW = "shallow"
+    SPARSE = "sparse"
+
+
+class CloneError(Exception):
+    """A failed clone, either transient (worth retrying) or permanent."""
+
+    def __init__(self, message: str, transient: bool):
+        super().__init__(message)
+        self.transient = transient
+
+
 class RepoCloner:
     """Handles cloning of GitHub repositories and logs the results or errors."""
 
-    def __init__(self, input_path, output_path, n_repos=5, log_dir=Path("./modules/cloner/log")):
+    DEFAULT_URL_TEMPLATE = "https://github.com/{name}.git"
+    PARTIAL_SUFFIX = RepoInventory.PARTIAL_SUFFIX
+    # Fragments of git error messages caused by the network or the server, not the repository.
+    TRANSIENT_ERRORS = (
+        "could not resolve host",
+        "temporary failure in name resolution",
+        "connection timed out",
+        "operation timed out",
+        "connection reset",
+        "connection refused",
+        "early eof",
+        "rpc failed",
+        "the remote end hung up unexpectedly",
+        "unexpected disconnect",
+        "returned error: 429",
+        "returned error: 500",
+        "returned error: 502",
+        "returned error: 503",
+        "returned error: 504",
+        "gnutls",
+        "ssl_read",
+    )
+
+    def __init__(
+            self,
+            input_path,
+            output_path,
+            n_repos=5,
+            log_dir=Path("./modules/cloner/log"),
+            url_template=DEFAULT_URL_TEMPLATE,
+            max_workers=8,
+            max_attempts=3,
+            backoff=2.0,
+            max_backoff=60.0,
+            timeout=600,
+            retry_failed=False,
+            clone_mode=CloneMode.SHALLOW,
+            sparse_patterns=None
+    ):
+        """
+        Initialize the cloner.
+
+        Args:
+            input_path (str): CSV listing the projects (column ProjectName, ``owner/repo``).
+            output_path (str): Folder receiving the ``owner/repo`` checkouts.
+            n_repos (int): Number of projects of the list to process.
+            log_dir (str): Folder of the clone journal.
+            url_template (str): Clone URL, with ``{name}`` replaced by the project name.
+            max_workers (int): Maximum number of concurrent clones.
+            max_attempts (int): Attempts per project for transient errors.
+            backoff (float): Base delay in seconds before a retry, doubled at each attempt.
+            max_backoff (float): Upper bound of the retry delay in seconds.
+            timeout (float): Seconds after which a clone is aborted (a transient error).
+            retry_failed (bool): Also retry projects that failed permanently in a previous run.
+            clone_mode (CloneMode): Shallow clone of everything, or sparse clone of the patterns.
+            sparse_patterns (List[str], optional): Gitignore-style patterns of the files checked
+                out in SPARSE mode; without patterns a SPARSE clone falls back to SHALLOW.
+        """
         self.input_path = input_path
         self.output_path = output_path
         self.n_repos = n_repos
-        self.writer_lock = Lock()
+        self.url_template = url_template
+        self.max_workers = max_workers
+        self.max_attempts = max_attempts
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.timeout = timeout
+        self.retry_failed = retry_failed
+        self.clone_mode = CloneMode(clone_mode)
+        self.sparse_patterns = list(sparse_patterns or [])
+        if self.clone_mode is CloneMode.SPARSE and not self.sparse_patterns:
+            logger.warning("Sparse clone mode without patterns: cloning whole repositories")
+            self.clone_mode = CloneMode.SHALLOW
+        # Written by earlier versions; still honoured when resuming.
         self.cloned_log_path = os.path.join(log_dir, 'cloned_log.csv')
-        self.error_log_path = os.path.join(log_dir, 'errors.csv')
+        self.journal = CloneJournal(os.path.join(log_dir, 'clone_journal.jsonl'))
+
+    # ---------------------------------------------------------------------
+    # Single clone
+    # ---------------------------------------------------------------------
+
+    def repo_url(self, repo_full_name: str) -> str:
+        """Return the clone URL of a project."""
+        return self.url_template.format(name=repo_full_name)
+
+    def clone_commands(self, url: str, dest_path: str) -> list:
+        """Return the git commands, run in sequence, cloning `url` into `dest_path`."""
+        if self.clone_mode is CloneMode.SHALLOW:
+            return [["git", "clone", "--depth", "1", "--quiet", "--", url, dest_path]]
+        return [
+            ["git", "clone", "--depth", "1", "--filter=blob:none", "--no-checkout", "--quiet",
+             "--", url, dest_path],
+            ["git", "-C", dest_path, "sparse-checkout", "set", "--no-cone", *self.sparse_patterns],
+            # Fetches the blobs of the selected files only.
+            ["git", "-C", dest_path, "checkout", "--quiet"],
+        ]
+
+    @classmethod
+    def is_transient(cls, message: str) -> bool:
+        """Tell whether a git error message denotes a transient failure."""
+        message = message.lower()
+        return any(fragment in message for fragment in cls.TRANSIENT_ERRORS)
+
+    def backoff_delay(self, attempt: int) -> float:
+        """Delay before retrying after the given failed attempt (exponential, with jitter)."""
+        delay = min(self.max_backoff, self.backoff * 2 ** (attempt - 1))
+        return delay * random.uniform(0.5, 1.5)
+
+    def _run_clone(self, url: str, dest_path: str):
+        """Clone into a temporary directory and move it into place once complete."""
+        partial_path = dest_path + self.PARTIAL_SUFFIX
+        shutil.rmtree(partial_path, ignore_errors=True)
+        os.makedirs(os.path.dirname(partial_path), exist_ok=True)
+        # Never wait for credentials: private or missing repositories must fail fast.
+        env = {**os.environ, "GIT_TERMINAL_PROMPT": "0"}
+        for command in self.clone_commands(url, partial_path):
+            try:
+                result = subprocess.run(
+                    command, capture_output=True, text=True, timeout=self.timeout, env=env,
+                    check=False
+                )
+            except subprocess.TimeoutExpired as e:
+                shutil.rmtree(partial_path, ignore_errors=True)
+                raise CloneError(
+                    f"git {command[1]} timed out after {self.timeout}s", transient=True
+                ) from e
+            except OSError as e:
+                raise CloneError(f"cannot run git: {e}", transient=False) from e
+
+            if result.returncode != 0:
+                shutil.rmtree(partial_path, ignore_errors=True)
+                message = " ".join(result.stderr.split()) or f"git exited with {result.returncode}"
+                raise CloneError(message, self.is_transient(message))
+        try:
+            os.replace(partial_path, dest_path)
+        except OSError as e:
+            shutil.rmtree(partial_path, ignore_errors=True)
+            raise CloneError(f"cannot move the clone into place: {e}", transient=False) from e
 
-    def _clone_repo(self, row):
-        """Clone a single GitHub repository and log results."""
+    def _clone_repo(self, row) -> str:
+        """Clone a single GitHub repository, retrying transient errors, and journal the outcome."""
         repo_full_name = row["ProjectName"]
-        repo_url = f'https://github.com/{repo_full_name}.git'
+        repo_url = self.repo_url(repo_full_name)
         dest_path = os.path.join(self.output_path, repo_full_name)
 
-        try:
-            logger.info("Cloning %s", repo_full_name)
-            Repo.clone_from(repo_url, str(dest_path), depth=1)
-            logger.info("Cloned %s", repo_full_name)
-        except git.exc.GitError as e:
-            logger.error("Error cloning %s", repo_full_name)
-            with self.writer_lock:
-                with open(self.error_log_path, 'a', encoding='utf-8') as error_log:
-                    error = str(e).replace("'", "").replace("\n", "")
-                    error_log.write(f"{repo_full_name},{repo_url},'{error}'\n")
-            return
-
-        with self.writer_lock:
+        if os.path.isdir(os.path.join(dest_path, ".git")):
+            logger.info("Already cloned %s", repo_full_name)
+            self.journal.record(repo_full_name, CloneJournal.CLONED, url=repo_url, attempts=0)
+            return CloneJournal.CLONED
+
+        start = time.monotonic()
+        for attempt in range(1, self.max_attempts + 1):
             try:
-                cloned_log = pd.read_csv(self.cloned_log_path)
-                cloned_log = pd.concat([cloned_log, pd.DataFrame([row])], ignore_index=True)
-                cloned_log.to_csv(self.cloned_log_path, index=False)
-            except Exception as e:
-                logger.error("Error saving log for %s: %s", repo_full_name, e)
+                logger.info("Cloning %s", repo_full_name)
+                Metrics.inc("clone_attempts")
+                with Metrics.timer("stage_seconds", stage="clone"):
+                    self._run_clone(repo_url, dest_path)
+            except CloneError as e:
+                if e.transient and attempt < self.max_attempts:
+                    delay = self.backoff_delay(attempt)
+                    logger.warning(
+                        "Transient error cloning %s (attempt %d/%d), retrying in %.1fs: %s",
+                        repo_full_name, attempt, self.max_attempts, delay, e
+                    )
+                    time.sleep(delay)
+                    continue
+                logger.error("Error cloning %s: %s", repo_full_name, e)
+                self.journal.record(
+                    repo_full_name, CloneJournal.FAILED, url=repo_url, attempts=attempt,
+                    transient=e.transient, error=str(e), duration=time.monotonic() - start
+                )
+                return CloneJournal.FAILED
+
+            logger.info("Cloned %s", repo_full_name)
+            self.journal.record(
+                repo_full_name, CloneJournal.CLONED, url=repo_url, attempts=attempt,
+                duration=time.monotonic() - start
+            )
+            return CloneJournal.CLONED
+        return CloneJournal.FAILED
+
+    # ---------------------------------------------------------------------
+    # Whole list
+    # ---------------------------------------------------------------------
+
+    def completed_projects(self) -> set:
+        """Projects a resumed run must not clone again."""
+        completed = set()
+        for name, record in self.journal.load().items():
+            if record["status"] == CloneJournal.CLONED:
+                completed.add(name)
+            elif not record.get("transient", False) and not self.retry_failed:
+                completed.add(name)
+
+        if os.path.exists(self.cloned_log_path):
+            completed.update(pd.read_csv(self.cloned_log_path)['ProjectName'])
+
+        # Checkouts, bare repositories or archives inventoried by a previous run.
+        for name, record in RepoInventory.load(self.output_path).records.items():
+            if os.path.exists(record["repo_path"]):
+                completed.add(name)
+        return completed
 
     def load_repos_to_clone(self):
-        """Load repository list from CSV and exclude already cloned ones."""
+        """Load repository list from CSV and exclude the ones completed by previous runs."""
         df = pd.read_csv(self.input_path, delimiter=",")
         df = df.head(self.n_repos)
+        return df[~df['ProjectName'].isin(self.completed_projects())]
 
-        if os.path.exists(self.cloned_log_path):
-            cloned_log = pd.read_csv(self.cloned_log_path)
-            df = df[~df['ProjectName'].isin(cloned_log['ProjectName'])]
-        else:
-            pd.DataFrame(columns=['ProjectName', 'repo_url', 'ml_libs', 'count']).to_csv(
-                self.cloned_log_path,
-                index=False
-            )
-        return df
+    def clone_all(self, max_workers=None) -> Counter:
+        """Clone all repositories concurrently and journal the results.
 
-    def clone_all(self, max_workers=None):
-        """Clone all repositories concurrently and log the results."""
+        Returns:
+            Counter: Number of projects per outcome (cloned/failed).
+        """
         df = self.load_repos_to_clone()
         logger.info("To analyze: %d repositories", len(df))
 
-        with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
+        outcomes = Counter()
+        with concurrent.futures.ThreadPoolExecutor(
+                max_workers=max_workers or self.max_workers
+        ) as executor:
             futures = [executor.submit(self._clone_repo, row) for _, row in df.iterrows()]
-            for _ in concurrent.futures.as_completed(futures):
-                pass
+            for future in concurrent.futures.as_completed(futures):
+                outcome = future.result()
+                outcomes[outcome] += 1
+                Metrics.inc("clones", outcome=outcome)
+
+        logger.info(
+            "Clone summary: %d cloned, %d failed",
+            outcomes[CloneJournal.CLONED], outcomes[CloneJournal.FAILED]
+        )
+        if os.path.isdir(self.output_path):
+            RepoInventory.build(self.output_path, footprint=False)
+        return outcomes
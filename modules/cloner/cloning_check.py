@@ -1,15 +1,17 @@
 """Utility to verify which GitHub repositories were successfully cloned.
 
-This module reads the list of projects from an input CSV, inspects the output
-directory on disk, and produces two reports:
+This module reads the list of projects from an input CSV, inventories the output
+directory on disk in a single pass (see RepoInventory) and produces two reports:
 - not_cloned_repos.csv : projects listed in the CSV but not found on disk
-- effective_repos.csv  : complete list of repositories actually detected on disk
+- effective_repos.csv  : complete list of repositories actually detected on disk,
+  with their kind, HEAD commit, number of files and size
 """
 
 import os
 from pathlib import Path
 import pandas as pd
 
+from modules.cloner.repo_inventory import RepoInventory
 from modules.utils.logger import get_logger
 logger = get_logger(__name__)
 
@@ -23,29 +25,34 @@ class RepoInspector:
         self.output_path = output_path
         self.not_cloned_repos = os.path.join(log_dir, 'not_cloned_repos.csv')
         self.effective_repos = os.path.join(log_dir, 'effective_repos.csv')
+        self._inventory = None
 
     # ---------------------------------------------------------------------
     # Filesystem checks
     # ---------------------------------------------------------------------
 
+    @property
+    def inventory(self) -> RepoInventory:
+        """Inventory of the output folder, refreshed once per inspector."""
+        if self._inventory is None:
+            self._inventory = RepoInventory.build(self.output_path)
+        return self._inventory
+
     def check_cloned_repo(self, project_name):
-        """Check if the repository directory exists and is not empty."""
-        repo_base_path = os.path.join(self.output_path, project_name.split('/')[0])
-        if os.path.exists(repo_base_path):
-            return len(os.listdir(str(repo_base_path))) > 0
-        return False
+        """Check if the repository is present in the output folder."""
+        return project_name in self.inventory
 
     # ---------------------------------------------------------------------
     # DataFrame selections
     # ---------------------------------------------------------------------
 
     def get_not_cloned_list(self, df):
-        """Return list of repositories from the input CSV that were not cloned."""
-        return [row for _, row in df.iterrows() if not self.check_cloned_repo(row['ProjectName'])]
+        """Return the rows of the input CSV whose repository was not cloned."""
+        return df[~df['ProjectName'].isin(self.inventory.project_names)]
 
     def get_cloned_list(self, df):
-        """Return list of repositories from the input CSV that were cloned."""
-        return [row for _, row in df.iterrows() if self.check_cloned_repo(row['ProjectName'])]
+        """Return the rows of the input CSV whose repository was cloned."""
+        return df[df['ProjectName'].isin(self.inventory.project_names)]
 
     # ---------------------------------------------------------------------
     # Aggregated detections
@@ -53,28 +60,11 @@ class RepoInspector:
 
     def count_effective_repos(self):
         """Count total number of cloned repositories across all directories."""
-        count = 0
-        for dir_name in os.listdir(self.output_path):
-            full_dir = os.path.join(self.output_path, dir_name)
-            if os.path.isdir(full_dir):
-                count += len(os.listdir(full_dir))
-        return count
+        return len(self.inventory)
 
     def get_effective_repos(self):
         """Return a DataFrame with all detected cloned repositories and their paths."""
-        repos = pd.DataFrame(columns=['ProjectName', 'repo_path'])
-        for dir_name in os.listdir(self.output_path):
-            dir_path = os.path.join(self.output_path, dir_name)
-            if not os.path.isdir(dir_path):
-                continue
-            for repo in os.listdir(dir_path):
-                repo_path = os.path.join(dir_path, repo)
-                project_name = f"{dir_name}/{repo}"
-                repos = pd.concat([repos, pd.DataFrame({
-                    'ProjectName': [project_name],
-                    'repo_path': [repo_path]
-                })], ignore_index=True)
-        return repos
+        return self.inventory.frame()
 
     # ---------------------------------------------------------------------
     # Orchestration
@@ -85,6 +75,7 @@ class RepoInspector:
         if os.path.exists(self.not_cloned_repos):
             os.remove(self.not_cloned_repos)
 
+        self._inventory = None
         df = pd.read_csv(self.csv_input_path)
         not_cloned = self.get_not_cloned_list(df)
         cloned = self.get_cloned_list(df)
@@ -92,7 +83,8 @@ class RepoInspector:
         logger.info('cloned: %d repos', len(cloned))
         logger.info('not cloned: %d repos', len(not_cloned))
 
-        pd.DataFrame(not_cloned).to_csv(self.not_cloned_repos, index=False)
+        os.makedirs(os.path.dirname(self.not_cloned_repos) or ".", exist_ok=True)
+        not_cloned.to_csv(self.not_cloned_repos, index=False)
 
         effective_count = self.count_effective_repos()
         logger.info('effective repos: %d', effective_count)
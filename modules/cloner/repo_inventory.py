@@ -0,0 +1,278 @@
+"""Inventory of the repositories present in the repos directory.
+
+RepoInventory lists the `<owner>/<name>` projects of the repos directory in a single
+`os.scandir` pass (checkouts, bare repositories and archives, as recognized by the analyzer
+project sources) and records, for each of them, its path, kind, HEAD commit (read from the
+git metadata, without running git), number of files and size on disk.
+
+The inventory is persisted next to the repositories (`.repo_inventory.csv`) and rebuilt
+incrementally: a project whose HEAD commit and modification time did not change keeps its
+recorded file count and size, so refreshing the inventory of a large tree only costs a few
+`stat` calls per project. The cloner, the clone inspector and the analyzer all share it."""
+
+import os
+from typing import Optional
+
+import pandas as pd
+
+from modules.scanner.project_source.project_source_base import ProjectSource
+# Register the bare-repository and archive sources recognized in the repos directory.
+from modules.scanner.project_source import archive_source  # pylint: disable=unused-import
+from modules.scanner.project_source import git_object_source  # pylint: disable=unused-import
+from modules.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+class RepoInventory:
+    """Index of the projects of a repos directory, keyed by ProjectName (``owner/name``)."""
+
+    FILE_NAME = ".repo_inventory.csv"
+    # Suffix of the directories of clones in progress (or interrupted), which are not projects.
+    PARTIAL_SUFFIX = ".partial"
+    # When several entries of an owner have the same project name (e.g. `name/` and
+    # `name.tar.gz`), the one of the first kind in this order is inventoried.
+    KIND_PRIORITY = ("directory", "git", "archive")
+    COLUMNS = [
+        "ProjectName", "repo_path", "kind", "head_commit", "file_count", "size_bytes", "mtime_ns"
+    ]
+    _DTYPES = {"head_commit": str, "file_count": "Int64", "size_bytes": "Int64", "mtime_ns": "Int64"}
+
+    def __init__(self, repos_path, records: Optional[dict] = None):
+        """
+        Initialize the inventory.
+
+        Args:
+            repos_path (str): Directory holding the ``<owner>/<name>`` projects.
+            records (dict[str, dict], optional): Record of every project, by ProjectName.
+        """
+        self.repos_path = str(repos_path)
+        self.records = records or {}
+
+    def __len__(self):
+        return len(self.records)
+
+    def __contains__(self, project_name):
+        return project_name in self.records
+
+    @property
+    def index_path(self) -> str:
+        """Location of the persisted inventory."""
+        return os.path.join(self.repos_path, self.FILE_NAME)
+
+    @property
+    def project_names(self) -> set:
+        """Names of the inventoried projects."""
+        return set(self.records)
+
+    # ---------------------------------------------------------------------
+    # Persistence
+    # ---------------------------------------------------------------------
+
+    @classmethod
+    def load(cls, repos_path) -> "RepoInventory":
+        """Read the persisted inventory of a repos directory (empty if there is none)."""
+        inventory = cls(repos_path)
+        if not os.path.exists(inventory.index_path):
+            return inventory
+        try:
+            frame = pd.read_csv(inventory.index_path, dtype=cls._DTYPES)
+        except (OSError, ValueError) as e:
+            logger.warning("Ignoring unreadable inventory %s: %s", inventory.index_path, e)
+            return inventory
+        frame["head_commit"] = frame["head_commit"].fillna("")
+        inventory.records = {
+            record["ProjectName"]: record for record in frame.to_dict("records")
+        }
+        return inventory
+
+    def save(self):
+        """Persist the inventory, replacing the previous one atomically."""
+        temporary_path = self.index_path + ".tmp"
+        try:
+            self.frame().to_csv(temporary_path, index=False)
+            os.replace(temporary_path, self.index_path)
+        except OSError as e:
+            logger.warning("Cannot write inventory %s: %s", self.index_path, e)
+
+    def frame(self) -> pd.DataFrame:
+        """Return the inventory as a DataFrame with the COLUMNS."""
+        return pd.DataFrame(list(self.records.values()), columns=self.COLUMNS).astype(
+            {"file_count": "Int64", "size_bytes": "Int64", "mtime_ns": "Int64"}
+        )
+
+    # ---------------------------------------------------------------------
+    # Scan
+    # ---------------------------------------------------------------------
+
+    @classmethod
+    def build(cls, repos_path, footprint: bool = True, persist: bool = True) -> "RepoInventory":
+        """
+        Scan the repos directory, reusing the persisted records of unchanged projects.
+
+        Args:
+            repos_path (str): Directory holding the ``<owner>/<name>`` projects.
+            footprint (bool): Whether to count the files and bytes of new or changed
+                projects (otherwise they are left unknown until a later build).
+            persist (bool): Whether to write the refreshed inventory.
+
+        Returns:
+            RepoInventory: The up-to-date inventory.
+        """
+        previous = cls.load(repos_path).records
+        inventory = cls(repos_path)
+        reused = 0
+        for owner, entry, source_class in cls._scan(str(repos_path)):
+            project_name = f"{owner}/{source_class.project_name(entry.name)}"
+            try:
+                mtime_ns = entry.stat().st_mtime_ns
+            except OSError:
+                continue
+            record = {
+                "ProjectName": project_name,
+                "repo_path": entry.path,
+                "kind": source_class.KIND,
+                "head_commit": cls.head_commit(entry.path),
+                "file_count": pd.NA,
+                "size_bytes": pd.NA,
+                "mtime_ns": mtime_ns,
+            }
+            old = previous.get(project_name)
+            if (old is not None and not pd.isna(old["file_count"])
+                    and (old["repo_path"], old["head_commit"], old["mtime_ns"])
+                    == (record["repo_path"], record["head_commit"], mtime_ns)):
+                record["file_count"], record["size_bytes"] = old["file_count"], old["size_bytes"]
+                reused += 1
+            elif footprint:
+                record["file_count"], record["size_bytes"] = cls.footprint(entry.path)
+            kept = inventory.records.get(project_name)
+            if kept is not None:
+                if cls._kind_rank(kept["kind"]) > cls._kind_rank(record["kind"]):
+                    kept, record = record, kept
+                logger.warning(
+                    "Project %s found at %s and %s: skipping the latter",
+                    project_name, kept["repo_path"], record["repo_path"]
+                )
+                inventory.records[project_name] = kept
+                continue
+            inventory.records[project_name] = record
+
+        logger.debug("Inventory of %s: %d projects, %d unchanged", repos_path, len(inventory), reused)
+        if persist:
+            inventory.save()
+        return inventory
+
+    @classmethod
+    def _kind_rank(cls, kind: str) -> int:
+        return cls.KIND_PRIORITY.index(kind) if kind in cls.KIND_PRIORITY else len(cls.KIND_PRIORITY)
+
+    @classmethod
+    def _scan(cls, repos_path: str):
+        """Yield (owner, entry, ProjectSource class) for every project, in directory order.
+
+        The directories of interrupted clones (`PARTIAL_SUFFIX`) are not projects.
+        """
+        try:
+            with os.scandir(repos_path) as owners:
+                owner_entries = [owner for owner in owners if owner.is_dir()]
+        except OSError as e:
+            logger.error("Cannot list %s: %s", repos_path, e)
+            return
+
+        for owner in owner_entries:
+            try:
+                with os.scandir(owner.path) as iterator:
+                    entries = list(iterator)
+            except OSError as e:
+                logger.debug("Cannot list %s: %s", owner.path, e)
+                continue
+            for entry in entries:
+                if entry.name.endswith(cls.PARTIAL_SUFFIX):
+                    continue
+                source_class = ProjectSource.source_class(entry.path)
+                if source_class is not None:
+                    yield owner.name, entry, source_class
+
+    @staticmethod
+    def _read_text(path: str) -> str:
+        with open(path, encoding="utf-8", errors="replace") as f:
+            return f.read().strip()
+
+    @classmethod
+    def head_commit(cls, repo_path: str) -> str:
+        """
+        Read the commit checked out in a repository from its git metadata.
+
+        Args:
+            repo_path (str): Checkout (with a `.git` directory or file) or bare repository.
+
+        Returns:
+            str: The commit hash, or ``""`` if it cannot be determined (no git metadata,
+            unborn branch, ...).
+        """
+        git_dir = os.path.join(repo_path, ".git")
+        try:
+            if os.path.isfile(git_dir):
+                # Worktrees and submodules: ".git" holds "gitdir: <path>".
+                pointer = cls._read_text(git_dir)
+                git_dir = os.path.join(repo_path, pointer.partition("gitdir:")[2].strip())
+            elif not os.path.isdir(git_dir):
+                git_dir = repo_path
+            head = cls._read_text(os.path.join(git_dir, "HEAD"))
+        except OSError:
+            return ""
+
+        if not head.startswith("ref:"):
+            return head
+        ref = head[len("ref:"):].strip()
+        try:
+            return cls._read_text(os.path.join(git_dir, *ref.split("/")))
+        except OSError:
+            pass
+        try:
+            with open(os.path.join(git_dir, "packed-refs"), encoding="utf-8") as f:
+                for line in f:
+                    commit, _, name = line.strip().partition(" ")
+                    if name == ref:
+                        return commit
+        except OSError:
+            pass
+        return ""
+
+    @staticmethod
+    def footprint(path: str) -> tuple:
+        """
+        Count the files and bytes on disk below a path (an archive counts as one file).
+
+        Returns:
+            tuple[int, int]: (file count, size in bytes).
+        """
+        if not os.path.isdir(path):
+            try:
+                return 1, os.stat(path).st_size
+            except OSError:
+                return 0, 0
+
+        count = size = 0
+        stack = [path]
+        while stack:
+            try:
+                with os.scandir(stack.pop()) as iterator:
+                    for entry in iterator:
+                        try:
+                            if entry.is_dir(follow_symlinks=False):
+                                stack.append(entry.path)
+                            else:
+                                count += 1
+                                size += entry.stat(follow_symlinks=False).st_size
+                        except OSError:
+                            continue
+            except OSError:
+                continue
+        return count, size
+
+    def projects(self):
+        """Yield (repo_path, owner, name) for every project, in directory order."""
+        for project_name, record in self.records.items():
+            owner, _, name = project_name.partition("/")
+            yield record["repo_path"], owner, name
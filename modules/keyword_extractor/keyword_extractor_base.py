@@ -8,6 +8,8 @@ library, file path, and line number. """
 
 from abc import ABC, abstractmethod
 
+from modules.utils.metrics import Metrics
+
 
 class KeywordExtractionStrategy(ABC):
     """Abstract base class for keyword extraction from source files."""
@@ -24,3 +26,32 @@ class KeywordExtractionStrategy(ABC):
         Returns:
             list[dict]: A list of extracted keyword data, each represented as a dictionary.
         """
+
+    def extract_keywords_from_source(self, source, related_dict) -> list[dict]:
+        """
+        Extract keywords from an already read SourceFile.
+
+        Strategies that do not override this method fall back to reading the file by path.
+
+        Args:
+            source (SourceFile): The file content shared by the analysis stages.
+            related_dict: A filtered dictionary of relevant keywords/libraries.
+
+        Returns:
+            list[dict]: A list of extracted keyword data, each represented as a dictionary.
+        """
+        return self.extract_keywords(source.path, related_dict)
+
+    @staticmethod
+    def record_metrics(strategy: str, evaluations: int, matches):
+        """
+        Count the keyword evaluations of a file and its matches per library (metrics enabled).
+
+        Args:
+            strategy (str): Name of the strategy, used as metric label.
+            evaluations (int): Number of (line, keyword) pairs evaluated.
+            matches (list[dict]): Matches extracted from the file.
+        """
+        Metrics.inc("keyword_evaluations", evaluations, strategy=strategy)
+        for match in matches:
+            Metrics.inc("keyword_matches", library=match['library'])
@@ -3,6 +3,7 @@
 import re
 from modules.keyword_extractor.keyword_extractor_base import KeywordExtractionStrategy
 from modules.utils.logger import get_logger
+from modules.utils.metrics import Metrics
 
 logger = get_logger(__name__)
 
@@ -16,21 +17,7 @@ class DefaultKeywordMatcher(KeywordExtractionStrategy):
 
         try:
             with open(file, "r", encoding="utf-8") as f:
-                for line_number, line in enumerate(f, 1):
-                    for _, row in related_dict.iterrows():
-                        keyword = row['Keyword']
-                        library = row['library']
-                        pattern = self.build_regex(keyword)
-
-                        if re.search(pattern, line):
-                            keyword = keyword.replace("\\", "")
-                            matches.append({
-                                'keyword': keyword,
-                                'library': library,
-                                'file': file,
-                                'line': line.strip(),
-                                'line_number': line_number
-                            })
+                self._match_lines(f, file, related_dict, matches)
         except UnicodeDecodeError:
             logger.error("Error reading file %s", file)
         except FileNotFoundError:
@@ -38,6 +25,37 @@ class DefaultKeywordMatcher(KeywordExtractionStrategy):
 
         return matches
 
+    def extract_keywords_from_source(self, source, related_dict):
+        """Extract keywords from the lines of an already read SourceFile."""
+        matches = []
+        if not source.searchable:
+            logger.error("Error reading file %s", source.path)
+            return matches
+
+        with Metrics.timer("stage_seconds", stage="keyword_match"):
+            self._match_lines(source.lines, source.path, related_dict, matches)
+        if Metrics.enabled:
+            self.record_metrics(type(self).__name__, len(source.lines) * len(related_dict), matches)
+        return matches
+
+    def _match_lines(self, lines, file, related_dict, matches):
+        """Append to `matches` every (line, keyword) pair whose regex matches."""
+        for line_number, line in enumerate(lines, 1):
+            for _, row in related_dict.iterrows():
+                keyword = row['Keyword']
+                library = row['library']
+                pattern = self.build_regex(keyword)
+
+                if re.search(pattern, line):
+                    keyword = keyword.replace("\\", "")
+                    matches.append({
+                        'keyword': keyword,
+                        'library': library,
+                        'file': file,
+                        'line': line.strip(),
+                        'line_number': line_number
+                    })
+
     @staticmethod
     def build_regex(keyword):
         """Build a regex pattern from a keyword with optional escaping."""
@@ -0,0 +1,247 @@
+"""Keyword extraction strategy that matches all dictionary keywords in a single pass.
+
+Instead of evaluating every (line, keyword) pair, the keywords of the filtered dictionary are
+compiled once into a single alternation regex. The combined pattern runs once over the whole
+file buffer to locate the candidate lines, and only those lines are checked against the
+per-keyword patterns, so the output is identical to DefaultKeywordMatcher.
+
+For bytes-level sources (memory-mapped files) the combined pattern runs on the raw bytes and
+only the hit lines are decoded before being verified. Only the candidate lines count as keyword
+evaluations in the pipeline Metrics."""
+
+import re
+from functools import lru_cache
+
+from modules.keyword_extractor.keyword_extractor_base import KeywordExtractionStrategy
+from modules.keyword_extractor.keyword_extractor_default import DefaultKeywordMatcher
+from modules.utils.logger import get_logger
+from modules.utils.metrics import Metrics
+
+logger = get_logger(__name__)
+
+_FALLBACK_ENCODING = "ISO-8859-1"
+_COUNT_CHUNK_SIZE = 1 << 20
+
+
+def _count_newlines(data, start, end, carriage_returns=False):
+    """
+    Count the line breaks of data[start:end] through bounded slices (memory maps have no count()).
+
+    With `carriage_returns`, a CRLF and a bare CR also count as one line break, as in the
+    universal-newline text; `end` must not split a CRLF.
+    """
+    count = 0
+    while start < end:
+        chunk_end = min(start + _COUNT_CHUNK_SIZE, end)
+        if carriage_returns and chunk_end < end and data[chunk_end - 1:chunk_end + 1] == b"\r\n":
+            # Keep a CRLF in a single chunk.
+            chunk_end += 1
+        chunk = data[start:chunk_end]
+        count += chunk.count(b"\n")
+        if carriage_returns:
+            count += chunk.count(b"\r") - chunk.count(b"\r\n")
+        start = chunk_end
+    return count
+
+
+class CompiledKeywordSet:
+    """Keywords of a filtered dictionary compiled into one combined matcher."""
+
+    def __init__(self, rows):
+        """
+        Compile the per-keyword patterns and the combined alternation.
+
+        Args:
+            rows (tuple): Sequence of (keyword, library) pairs, in dictionary order.
+        """
+        self.rows = rows
+        self.patterns = [DefaultKeywordMatcher.build_regex(keyword) for keyword, _ in rows]
+        alternatives = dict.fromkeys(pattern.pattern for pattern in self.patterns)
+        combined = "|".join(f"(?:{alternative})" for alternative in alternatives)
+        self.combined = re.compile(combined, re.IGNORECASE) if alternatives else None
+        self.combined_bytes = re.compile(
+            combined.encode("utf-8"), re.IGNORECASE
+        ) if alternatives else None
+
+    def candidate_lines(self, text):
+        """
+        Run the combined matcher once over the buffer and yield the hit lines.
+
+        Args:
+            text (str): Whole file content.
+
+        Yields:
+            tuple: (line_number, line_start, line_end) for every line with at least one hit.
+        """
+        if self.combined is None:
+            return
+
+        line_number = 1
+        scanned_up_to = 0
+        last_line_end = -1
+        for hit in self.combined.finditer(text):
+            start = hit.start()
+            if start < last_line_end:
+                continue
+            line_number += text.count("\n", scanned_up_to, start)
+            line_start = text.rfind("\n", 0, start) + 1
+            line_end = text.find("\n", start)
+            line_end = len(text) if line_end == -1 else line_end + 1
+            scanned_up_to = line_start
+            last_line_end = line_end
+            yield line_number, line_start, line_end
+
+    def candidate_byte_lines(self, data, carriage_returns=False):
+        """
+        Same as `candidate_lines` on raw bytes (bytes or a memory map, which is not copied).
+
+        Args:
+            data (bytes | mmap.mmap): Whole file content.
+            carriage_returns (bool): Whether the content holds CR characters; a CRLF and a bare
+                CR then end a line too, numbering the lines like the universal-newline text.
+
+        Yields:
+            tuple: (line_number, line_start, line_end) for every line with at least one hit,
+            the line end including its line break.
+        """
+        if self.combined_bytes is None:
+            return
+
+        line_number = 1
+        scanned_up_to = 0
+        last_line_end = -1
+        for hit in self.combined_bytes.finditer(data):
+            start = hit.start()
+            if start < last_line_end:
+                continue
+            line_start = data.rfind(b"\n", 0, start) + 1
+            line_end = data.find(b"\n", start)
+            line_end = len(data) if line_end == -1 else line_end + 1
+            if carriage_returns:
+                line_start = max(line_start, data.rfind(b"\r", line_start, start) + 1)
+                carriage_return = data.find(b"\r", start, line_end)
+                if carriage_return != -1:
+                    line_end = carriage_return + 1
+                    if data[line_end:line_end + 1] == b"\n":
+                        line_end += 1
+            line_number += _count_newlines(data, scanned_up_to, line_start, carriage_returns)
+            scanned_up_to = line_start
+            last_line_end = line_end
+            yield line_number, line_start, line_end
+
+    def record_metrics(self, candidates, matches):
+        """Count the candidate lines evaluated against every keyword, and the matches."""
+        KeywordExtractionStrategy.record_metrics(
+            MultiPatternKeywordMatcher.__name__, candidates * len(self.rows), matches
+        )
+
+    def match_text(self, text, file):
+        """
+        Extract keyword matches from a file buffer.
+
+        Args:
+            text (str): Whole file content with universal newlines.
+            file (str): Path reported in the matches.
+
+        Returns:
+            list[dict]: Matches with keyword, library, file, line and line number.
+        """
+        matches = []
+        candidates = 0
+        for line_number, line_start, line_end in self.candidate_lines(text):
+            candidates += 1
+            line = text[line_start:line_end]
+            for (keyword, library), pattern in zip(self.rows, self.patterns):
+                if pattern.search(line):
+                    matches.append({
+                        'keyword': keyword.replace("\\", ""),
+                        'library': library,
+                        'file': file,
+                        'line': line.strip(),
+                        'line_number': line_number
+                    })
+        if Metrics.enabled:
+            self.record_metrics(candidates, matches)
+        return matches
+
+    def match_bytes(self, data, file):
+        """
+        Extract keyword matches from raw file content, decoding only the hit lines.
+
+        Args:
+            data (bytes | mmap.mmap): Whole file content.
+            file (str): Path reported in the matches.
+
+        Returns:
+            list[dict]: Matches with keyword, library, file, line and line number.
+        """
+        # Rare: CR and CRLF line endings are handled in place, never on a normalized copy.
+        carriage_returns = data.find(b"\r") != -1
+
+        matches = []
+        candidates = 0
+        for line_number, line_start, line_end in self.candidate_byte_lines(data, carriage_returns):
+            candidates += 1
+            raw = data[line_start:line_end]
+            try:
+                line = raw.decode("utf-8")
+            except UnicodeDecodeError:
+                line = raw.decode(_FALLBACK_ENCODING)
+                Metrics.inc("decode_fallbacks", component="keyword_matcher")
+            if carriage_returns and line.endswith(("\r\n", "\r")):
+                # Same line as in the universal-newline text.
+                line = line.rstrip("\r\n") + "\n"
+            for (keyword, library), pattern in zip(self.rows, self.patterns):
+                if pattern.search(line):
+                    matches.append({
+                        'keyword': keyword.replace("\\", ""),
+                        'library': library,
+                        'file': file,
+                        'line': line.strip(),
+                        'line_number': line_number
+                    })
+        if Metrics.enabled:
+            self.record_metrics(candidates, matches)
+        return matches
+
+
+@lru_cache(maxsize=256)
+def compile_keyword_set(rows):
+    """Return the (cached) compiled matcher for a tuple of (keyword, library) pairs."""
+    return CompiledKeywordSet(rows)
+
+
+class MultiPatternKeywordMatcher(KeywordExtractionStrategy):
+    """Keyword extraction running one combined regex over the whole file buffer."""
+
+    @staticmethod
+    def compile(related_dict):
+        """Compile (or fetch from cache) the matcher for a filtered keyword dictionary."""
+        rows = tuple(zip(related_dict['Keyword'], related_dict['library']))
+        return compile_keyword_set(rows)
+
+    def extract_keywords(self, file, related_dict):
+        """Extract keywords from the file based on the provided keyword dictionary."""
+        try:
+            with open(file, "r", encoding="utf-8") as f:
+                text = f.read()
+        except UnicodeDecodeError:
+            logger.error("Error reading file %s", file)
+            return []
+        except FileNotFoundError:
+            logger.error("Error finding file %s", file)
+            return []
+
+        return self.compile(related_dict).match_text(text, file)
+
+    def extract_keywords_from_source(self, source, related_dict):
+        """Extract keywords from the text, or the raw bytes of bytes-level sources, of a SourceFile."""
+        if not source.searchable:
+            logger.error("Error reading file %s", source.path)
+            return []
+
+        with Metrics.timer("stage_seconds", stage="keyword_match"):
+            keyword_set = self.compile(related_dict)
+            if source.bytes_level:
+                return keyword_set.match_bytes(source.data, source.path)
+            return keyword_set.match_text(source.text, source.path)
@@ -0,0 +1,83 @@
+"""Cheap import gate run on raw file bytes before any import parsing.
+
+Most scanned files import no dictionary library at all. A library can only be reported for a
+file whose bytes contain both ``import `` and the library name, so the ImportPrefilter checks
+exactly that with literal searches over the undecoded content and lets the full line-by-line
+import parsing run only for candidate files. Imported module paths are then resolved with a
+LibraryTrie, which maps dotted names such as ``torch.nn`` or ``sklearn.x`` to their dictionary
+library in a single walk."""
+
+import re
+
+
+class LibraryTrie:
+    """Trie of dictionary library names keyed by dotted module components."""
+
+    # Key of the library name stored on a node; module components are never None.
+    _TERMINAL = None
+
+    def __init__(self, libraries):
+        """
+        Build the trie.
+
+        Args:
+            libraries (Iterable[str]): Library names, possibly dotted (e.g. ``tensorflow.keras``).
+        """
+        self._root = {}
+        for library in libraries:
+            node = self._root
+            for component in library.split("."):
+                node = node.setdefault(component, {})
+            node[self._TERMINAL] = library
+
+    def resolve(self, module: str):
+        """
+        Return the dictionary library an imported module belongs to.
+
+        The shortest dictionary entry that prefixes the module path wins, so for top-level
+        library names the result is the first component of the import, as before.
+
+        Args:
+            module (str): Imported name as extracted from the source (e.g. ``torch.nn``).
+
+        Returns:
+            str | None: The library name, or None if the module is not in the dictionary.
+        """
+        node = self._root
+        for component in module.strip().split("."):
+            node = node.get(component.strip())
+            if node is None:
+                return None
+            library = node.get(self._TERMINAL)
+            if library is not None:
+                return library
+        return None
+
+
+class ImportPrefilter:
+    """Literal byte-level check telling whether a file may import a dictionary library."""
+
+    def __init__(self, libraries):
+        """
+        Compile the literal search over the top-level names of the libraries.
+
+        Args:
+            libraries (Iterable[str]): Library names of the dictionary.
+        """
+        libraries = sorted(set(libraries))
+        self.trie = LibraryTrie(libraries)
+        roots = sorted({library.split(".")[0] for library in libraries}, key=len, reverse=True)
+        self._names = re.compile(
+            b"|".join(re.escape(root.encode("utf-8")) for root in roots)
+        ) if roots else None
+
+    def is_candidate(self, data: bytes) -> bool:
+        """Return False only when the raw content cannot import any dictionary library."""
+        # find() rather than `in`: `data` may be a memory map, whose `in` only tests single bytes.
+        if self._names is None or data.find(b"import ") == -1:
+            return False
+        return self._names.search(data) is not None
+
+    def resolve(self, module: str):
+        """Resolve an imported module path to its dictionary library (see LibraryTrie)."""
+        return self.trie.resolve(module)
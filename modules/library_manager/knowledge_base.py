@@ -0,0 +1,193 @@
+"""Compiled, process-wide knowledge base built from the library dictionary CSVs.
+
+A KnowledgeBase wraps one LibraryDictType CSV: it is parsed once per process, indexes the
+dictionary rows by library, and precompiles the keyword patterns and the byte-level import
+prefilter. The compiled form is also persisted on disk, keyed by a format version and the
+SHA-256 of the CSV content, so that other processes (e.g. pool workers) load it without
+parsing the CSV again. Editing the CSV
+changes its hash and transparently invalidates both the in-memory and the on-disk copy."""
+
+import hashlib
+import io
+import os
+import pickle
+from pathlib import Path
+from threading import Lock
+
+import pandas as pd
+
+from modules.keyword_extractor.keyword_extractor_default import DefaultKeywordMatcher
+from modules.library_manager.import_prefilter import ImportPrefilter
+from modules.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+class KnowledgeBase:
+    """Library dictionary indexed by library name, with precompiled keyword patterns."""
+
+    FORMAT_VERSION = 2
+    DEFAULT_CACHE_DIR = Path("./io/cache/knowledge_base")
+    _RELATED_CACHE_SIZE = 1024
+
+    _instances = {}
+    _lock = Lock()
+
+    def __init__(self, source_path, content_hash: str, frame: pd.DataFrame):
+        """
+        Index a parsed dictionary.
+
+        Args:
+            source_path (str): Path of the CSV the dictionary was read from.
+            content_hash (str): SHA-256 of the CSV content.
+            frame (pd.DataFrame): The parsed dictionary (columns library, Keyword, ...).
+        """
+        self.source_path = str(source_path)
+        self.content_hash = content_hash
+        self.frame = frame
+        self.library_rows = {}
+        for position, library in enumerate(frame["library"]):
+            self.library_rows.setdefault(library, []).append(position)
+        self.libraries = frozenset(self.library_rows)
+        self.import_prefilter = ImportPrefilter(self.libraries)
+        self.patterns = {
+            keyword: DefaultKeywordMatcher.build_regex(keyword)
+            for keyword in dict.fromkeys(frame["Keyword"])
+        }
+        self._related = {}
+        self._stat = None
+
+    # ---------------------------------------------------------------------
+    # Loading
+    # ---------------------------------------------------------------------
+
+    @classmethod
+    def load(cls, dict_path, cache_dir=None) -> "KnowledgeBase":
+        """
+        Return the process-wide knowledge base for a dictionary CSV.
+
+        The CSV is only re-read when its size or modification time changed since the last
+        call; a changed CSV is recompiled (or loaded from its on-disk compiled form).
+
+        Args:
+            dict_path (str | LibraryDictType): Path to the dictionary CSV.
+            cache_dir (str, optional): Folder holding the compiled forms.
+
+        Returns:
+            KnowledgeBase: The shared instance for that dictionary.
+        """
+        path = os.path.abspath(os.fspath(getattr(dict_path, "value", dict_path)))
+        stat = os.stat(path)
+        signature = (stat.st_size, stat.st_mtime_ns)
+
+        with cls._lock:
+            instance = cls._instances.get(path)
+            if instance is not None and instance._stat == signature:
+                return instance
+
+            with open(path, "rb") as f:
+                raw = f.read()
+            content_hash = hashlib.sha256(raw).hexdigest()
+
+            if instance is None or instance.content_hash != content_hash:
+                instance = cls._load_compiled(path, raw, content_hash, cache_dir)
+            instance._stat = signature
+            cls._instances[path] = instance
+            return instance
+
+    @classmethod
+    def load_all(cls, dict_types, cache_dir=None) -> dict:
+        """Load the knowledge bases of several dictionaries, keyed by dictionary type."""
+        return {dict_type: cls.load(dict_type, cache_dir) for dict_type in dict_types}
+
+    @classmethod
+    def compiled_path(cls, dict_path, content_hash: str, cache_dir=None) -> Path:
+        """Return the on-disk location of the compiled form for a dictionary version."""
+        cache_dir = Path(cache_dir or cls.DEFAULT_CACHE_DIR)
+        stem = Path(dict_path).stem
+        return cache_dir / f"{stem}-v{cls.FORMAT_VERSION}-{content_hash[:16]}.pkl"
+
+    @classmethod
+    def _load_compiled(cls, path, raw: bytes, content_hash: str, cache_dir) -> "KnowledgeBase":
+        """Load the compiled form matching the CSV content, building it when missing."""
+        compiled_path = cls.compiled_path(path, content_hash, cache_dir)
+        try:
+            with open(compiled_path, "rb") as f:
+                instance = pickle.load(f)
+            if (isinstance(instance, cls) and instance.content_hash == content_hash
+                    and getattr(instance, "format_version", None) == cls.FORMAT_VERSION):
+                instance.source_path = path
+                return instance
+            logger.warning("Discarding stale compiled dictionary %s", compiled_path)
+        except FileNotFoundError:
+            pass
+        except (OSError, pickle.UnpicklingError, EOFError, AttributeError) as e:
+            logger.warning("Error loading compiled dictionary %s: %s", compiled_path, e)
+
+        instance = cls(path, content_hash, pd.read_csv(io.BytesIO(raw), delimiter=","))
+        instance.save(compiled_path)
+        return instance
+
+    def save(self, compiled_path):
+        """Atomically persist the compiled form of this knowledge base."""
+        compiled_path = Path(compiled_path)
+        try:
+            compiled_path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = compiled_path.with_name(f"{compiled_path.name}.{os.getpid()}.tmp")
+            with open(tmp_path, "wb") as f:
+                pickle.dump(self, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, compiled_path)
+        except OSError as e:
+            logger.warning("Error saving compiled dictionary %s: %s", compiled_path, e)
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state["format_version"] = self.FORMAT_VERSION
+        state["_related"] = {}
+        state["_stat"] = None
+        return state
+
+    # ---------------------------------------------------------------------
+    # Queries
+    # ---------------------------------------------------------------------
+
+    def related(self, libraries) -> pd.DataFrame:
+        """
+        Return the dictionary rows of the given libraries, in dictionary order.
+
+        Equivalent to ``frame[frame["library"].isin(libraries)]``; results are cached per
+        library set, so files importing the same libraries share the same DataFrame.
+
+        Args:
+            libraries (Iterable[str]): Library names (unknown names are ignored).
+
+        Returns:
+            pd.DataFrame: The matching dictionary rows.
+        """
+        used = self.libraries.intersection(libraries)
+        related = self._related.get(used)
+        if related is None:
+            positions = sorted(
+                position for library in used for position in self.library_rows[library]
+            )
+            related = self.frame.iloc[positions]
+            if len(self._related) >= self._RELATED_CACHE_SIZE:
+                self._related.clear()
+            self._related[used] = related
+        return related
+
+    def resolve_imports(self, file_libraries) -> set:
+        """Map raw imported names to the dictionary libraries they belong to."""
+        resolve = self.import_prefilter.resolve
+        return {library for library in map(resolve, file_libraries) if library is not None}
+
+    def keywords(self, library: str) -> list:
+        """Return the keywords listed for a library."""
+        return self.frame["Keyword"].iloc[self.library_rows.get(library, [])].tolist()
+
+    def pattern(self, keyword: str):
+        """Return the precompiled regex of a keyword."""
+        pattern = self.patterns.get(keyword)
+        if pattern is None:
+            pattern = DefaultKeywordMatcher.build_regex(keyword)
+        return pattern
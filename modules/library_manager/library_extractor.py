@@ -8,6 +8,7 @@ encodings) are logged via the global logger and handled gracefully, making the
 extractor safe to use across large codebases."""
 
 from modules.utils.logger import get_logger
+from modules.utils.metrics import Metrics
 
 logger = get_logger(__name__)
 
@@ -18,21 +19,27 @@ class LibraryExtractor:
     @staticmethod
     def get_libraries_from_file(file_path: str) -> list:
         """Extract a list of libraries imported in a given source file."""
-        libraries = []
         try:
             with open(file_path, "r", encoding="utf-8") as f:
                 lines = f.readlines()
         except UnicodeDecodeError:
+            Metrics.inc("decode_fallbacks", component="library_extractor")
             try:
                 with open(file_path, "r", encoding="ISO-8859-1") as f:
                     lines = f.readlines()
             except UnicodeDecodeError:
                 logger.error("Error reading file %s", file_path)
-                return libraries
+                return []
         except FileNotFoundError:
             logger.error("Error finding file %s", file_path)
-            return libraries
+            return []
+
+        return LibraryExtractor.get_libraries_from_lines(lines)
 
+    @staticmethod
+    def get_libraries_from_lines(lines) -> list:
+        """Extract a list of libraries imported in already decoded source lines."""
+        libraries = []
         for line in lines:
             line = line.lstrip()
             if "import " in line:
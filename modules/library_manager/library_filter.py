@@ -1,8 +1,22 @@
-"""Module for filtering relevant libraries from a file based on a dictionary."""
+"""Module for filtering relevant libraries from a file based on a dictionary.
+
+When the dictionary is a KnowledgeBase, files are first checked against its byte-level import
+prefilter: files that cannot import any dictionary library are rejected without decoding or
+parsing them, and imported names are resolved through the library trie.
+
+Rejected and candidate files are counted per dictionary in the pipeline Metrics, and the time
+spent filtering is recorded as the ``library_filter`` stage."""
+
+import os
 
 import pandas as pd
 
+from modules.library_manager.knowledge_base import KnowledgeBase
 from modules.library_manager.library_extractor import LibraryExtractor
+from modules.utils.logger import get_logger
+from modules.utils.metrics import Metrics
+
+logger = get_logger(__name__)
 
 
 class LibraryFilter:
@@ -10,13 +24,65 @@ class LibraryFilter:
 
     @staticmethod
     def load_dict(path: str) -> pd.DataFrame:
-        """Load the library dictionary from a CSV file."""
-        return pd.read_csv(path, delimiter=",")
+        """Load the library dictionary from a CSV file.
+
+        The dictionary is served by the process-wide KnowledgeBase, so the CSV is parsed
+        only once; the returned DataFrame is shared and must not be modified.
+        """
+        return KnowledgeBase.load(path).frame
 
     @staticmethod
-    def filter_used_libraries(file_path: str, library_dict: pd.DataFrame) -> pd.DataFrame:
-        """Filter and return libraries from the file that are present in the dictionary."""
+    def filter_used_libraries(file_path: str, library_dict) -> pd.DataFrame:
+        """Filter and return libraries from the file that are present in the dictionary.
+
+        Args:
+            file_path (str): Path of the source file.
+            library_dict (pd.DataFrame | KnowledgeBase): The library dictionary.
+        """
+        if isinstance(library_dict, KnowledgeBase):
+            try:
+                with open(file_path, "rb") as f:
+                    data = f.read()
+            except FileNotFoundError:
+                logger.error("Error finding file %s", file_path)
+                data = b""
+            if not library_dict.import_prefilter.is_candidate(data):
+                return library_dict.related(())
+
         file_libraries = LibraryExtractor.get_libraries_from_file(file_path)
+        return LibraryFilter.filter_libraries(file_libraries, library_dict)
+
+    @staticmethod
+    def filter_source_libraries(source, library_dict) -> pd.DataFrame:
+        """Same as `filter_used_libraries`, reusing the content and imports of a SourceFile."""
+        with Metrics.timer("stage_seconds", stage="library_filter"):
+            if (isinstance(library_dict, KnowledgeBase)
+                    and not library_dict.import_prefilter.is_candidate(source.data)):
+                if Metrics.enabled:
+                    Metrics.inc("prefilter_rejected", dictionary=LibraryFilter.dictionary_label(library_dict))
+                return library_dict.related(())
+            related_dict = LibraryFilter.filter_libraries(source.imports, library_dict)
+        if Metrics.enabled and not related_dict.empty:
+            Metrics.inc("candidate_files", dictionary=LibraryFilter.dictionary_label(library_dict))
+        return related_dict
+
+    @staticmethod
+    def dictionary_label(library_dict) -> str:
+        """Name of a dictionary in the metrics (its CSV file name)."""
+        if isinstance(library_dict, KnowledgeBase):
+            return os.path.basename(library_dict.source_path)
+        return "dataframe"
+
+    @staticmethod
+    def filter_libraries(file_libraries, library_dict) -> pd.DataFrame:
+        """Return the dictionary rows of the imported libraries.
+
+        Args:
+            file_libraries (list): Raw imported names, as returned by LibraryExtractor.
+            library_dict (pd.DataFrame | KnowledgeBase): The library dictionary.
+        """
+        if isinstance(library_dict, KnowledgeBase):
+            return library_dict.related(library_dict.resolve_imports(file_libraries))
 
         clean_libs = [
             lib.split(".")[0].strip()
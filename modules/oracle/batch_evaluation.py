@@ -0,0 +1,175 @@
+"""
+This module defines the BatchEvaluator component, which compares every analysis run of a role
+(the `output/<role>/<role>_N` folders) with the oracle at once.
+
+The oracle is read once, the ProjectName column of every results file is gathered into a single
+boolean prediction matrix (oracle projects x runs), and the confusion matrices and metrics
+(precision, recall, F1-score, accuracy) of all runs are computed with a few vectorized
+reductions. The outcome is a single comparison table, so that many dictionary variants can be
+compared side by side; the figures of every run are the same as those of the Merger.
+"""
+
+import os
+import re
+
+import numpy as np
+import pandas as pd
+
+from modules.analyzer.result_writer import ResultFormat
+from modules.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+class BatchEvaluator:
+    """Evaluates all the analysis runs of a role against the oracle in one pass."""
+
+    COLUMNS = ["run", "tp", "fp", "tn", "fn", "precision", "recall", "f1", "accuracy"]
+
+    def __init__(self, column_name, oracle_path, base_output_path, file_name="results.csv"):
+        """
+        Initialize BatchEvaluator with role and paths.
+
+        Args:
+            column_name (str): Role name (e.g., 'producer', 'consumer').
+            oracle_path (str): Path to the oracle directory.
+            base_output_path (str): Base path of the analysis output (holding `<role>/<role>_N`).
+            file_name (str): Name of the aggregated results file of every run
+                (results.csv or results.parquet).
+        """
+        self.column_name = column_name
+        self.oracle_path = oracle_path
+        self.base_output_path = base_output_path
+        self.file_name = file_name
+
+    def load_oracle(self) -> pd.DataFrame:
+        """Read the oracle of the role (ProjectName, Is_Real_ML_<role>)."""
+        oracle_file = os.path.join(self.oracle_path, f"oracle_{self.column_name}.csv")
+        if not os.path.exists(oracle_file):
+            raise FileNotFoundError(f"Oracle file not found: {oracle_file}")
+        return pd.read_csv(oracle_file)
+
+    def run_folders(self) -> list:
+        """
+        List the runs of the role having a results file, in run order.
+
+        Returns:
+            list[tuple[str, str]]: (run name, results file path) of every run.
+        """
+        role_folder = os.path.join(self.base_output_path, self.column_name)
+        if not os.path.isdir(role_folder):
+            return []
+
+        def run_order(name):
+            match = re.search(r"_(\d+)$", name)
+            return (int(match.group(1)) if match else float("inf"), name)
+
+        runs = []
+        for name in sorted(os.listdir(role_folder), key=run_order):
+            results_file = os.path.join(role_folder, name, self.file_name)
+            if os.path.isfile(results_file):
+                runs.append((name, results_file))
+        return runs
+
+    @staticmethod
+    def predicted_projects(results_file) -> pd.Series:
+        """Return the ProjectName column of a results file (empty if it has no rows)."""
+        try:
+            return ResultFormat.read_columns(results_file, ["ProjectName"])["ProjectName"]
+        except pd.errors.EmptyDataError:
+            return pd.Series([], dtype=object)
+
+    def prediction_matrix(self, oracle: pd.DataFrame, runs: list) -> np.ndarray:
+        """
+        Build the predictions of every run for the oracle projects.
+
+        Args:
+            oracle (pd.DataFrame): Oracle of the role.
+            runs (list[tuple[str, str]]): (run name, results file path) of every run.
+
+        Returns:
+            np.ndarray: Boolean matrix, True where a run classifies an oracle project as ML.
+        """
+        predicted = np.zeros((len(oracle), len(runs)), dtype=bool)
+        if not runs:
+            return predicted
+
+        names = [self.predicted_projects(results_file) for _, results_file in runs]
+        run_indexes = np.repeat(np.arange(len(runs)), [len(projects) for projects in names])
+        project_indexes = pd.Index(oracle["ProjectName"]).get_indexer(
+            pd.concat(names, ignore_index=True)
+        )
+        in_oracle = project_indexes >= 0
+        predicted[project_indexes[in_oracle], run_indexes[in_oracle]] = True
+        return predicted
+
+    @staticmethod
+    def confusion_metrics(real: np.ndarray, predicted: np.ndarray) -> dict:
+        """
+        Compute the confusion matrix and metrics of every run.
+
+        Args:
+            real (np.ndarray): Boolean oracle labels, one per project.
+            predicted (np.ndarray): Boolean predictions, one column per run.
+
+        Returns:
+            dict[str, np.ndarray]: tp, fp, tn, fn, precision, recall, f1 and accuracy per run.
+        """
+        real = real[:, np.newaxis]
+        tp = (predicted & real).sum(axis=0)
+        fp = (predicted & ~real).sum(axis=0)
+        tn = (~predicted & ~real).sum(axis=0)
+        fn = (~predicted & real).sum(axis=0)
+
+        def ratio(numerator, denominator):
+            return np.divide(
+                numerator, denominator,
+                out=np.zeros(len(denominator), dtype=float), where=denominator > 0
+            )
+
+        precision = ratio(tp, tp + fp)
+        recall = ratio(tp, tp + fn)
+        f1 = ratio(2 * precision * recall, precision + recall)
+        accuracy = ratio(tp + tn, tp + tn + fp + fn)
+        return {
+            "tp": tp, "fp": fp, "tn": tn, "fn": fn,
+            "precision": precision, "recall": recall, "f1": f1, "accuracy": accuracy,
+        }
+
+    def evaluate(self) -> pd.DataFrame:
+        """
+        Evaluate every run of the role.
+
+        Returns:
+            pd.DataFrame: One row per run with the COLUMNS.
+        """
+        oracle = self.load_oracle()
+        runs = self.run_folders()
+        real = (oracle[f"Is_Real_ML_{self.column_name}"] == "Yes").to_numpy()
+        metrics = self.confusion_metrics(real, self.prediction_matrix(oracle, runs))
+        return pd.DataFrame({"run": [name for name, _ in runs], **metrics}, columns=self.COLUMNS)
+
+    def reporting(self) -> pd.DataFrame:
+        """
+        Evaluate every run and save the comparison table in the verifying folder.
+
+        Returns:
+            pd.DataFrame: The comparison table.
+        """
+        table = self.evaluate()
+        output_dir = os.path.join(self.oracle_path, "verifying")
+        os.makedirs(output_dir, exist_ok=True)
+        output_file = os.path.join(output_dir, f"{self.column_name}_runs_comparison.csv")
+        table.to_csv(output_file, index=False)
+
+        logger.info(
+            "Evaluated %d %s runs. Comparison saved in %s", len(table), self.column_name, output_file
+        )
+        if not table.empty:
+            best = table.loc[table["f1"].idxmax()]
+            logger.info(
+                "Best %s run: %s (Precision: %s, Recall: %s, F1: %s, Accuracy: %s)",
+                self.column_name, best["run"], best["precision"], best["recall"],
+                best["f1"], best["accuracy"]
+            )
+        return table
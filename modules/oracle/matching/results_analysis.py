@@ -2,7 +2,9 @@
 
 import os
 import pandas as pd
+from modules.analyzer.evidence_store import EvidenceStore
 from modules.analyzer.ml_roles import AnalyzerRole
+from modules.analyzer.result_writer import ResultFormat
 
 
 class ResultAnalysis:
@@ -13,7 +15,8 @@ class ResultAnalysis:
         role: AnalyzerRole,
         oracle_path: str,
         base_folder_path: str,
-        results_subdir: str
+        results_subdir: str,
+        evidence_store_path: str = None
     ):
         """
         Initialize ResultAnalysis.
@@ -24,31 +27,46 @@ class ResultAnalysis:
             base_folder_path (str): Root path containing result subdirectories.
             results_subdir (str): Subdirectory within the role folder.
             file_name (str): Output file name (without full path).
+            evidence_store_path (str, optional): Evidence store to read the results of the role
+                from, instead of the files of the results subdirectory.
         """
         self.role = role
         self.role_str = str(role.value)
         self.oracle_path = oracle_path
         self.folder_path = os.path.join(base_folder_path, self.role_str, results_subdir)
         self.file_name = results_subdir
+        self.evidence_store_path = evidence_store_path
+
+    def detected_projects(self):
+        """Yield the ProjectName column of every results file (or of the evidence store)."""
+        if self.evidence_store_path is not None:
+            with EvidenceStore(self.evidence_store_path) as store:
+                yield store.role_results(self.role_str, ["ProjectName"])["ProjectName"]
+            return
+
+        for filename in os.listdir(self.folder_path):
+            if ResultFormat.of(filename) is not None:
+                file_path = os.path.join(self.folder_path, filename)
+                yield ResultFormat.read_columns(file_path, ["ProjectName"])["ProjectName"]
 
     def start_analysis(self):
         """Compare predictions with oracle and export result to CSV."""
         oracle_file = os.path.join(self.oracle_path, f"oracle_{self.role_str}.csv")
         if not os.path.exists(oracle_file):
             raise FileNotFoundError(f"Oracle file not found: {oracle_file}")
-        if not os.path.isdir(self.folder_path):
+        if self.evidence_store_path is not None:
+            if not os.path.exists(self.evidence_store_path):
+                raise FileNotFoundError(f"Evidence store not found: {self.evidence_store_path}")
+        elif not os.path.isdir(self.folder_path):
             raise FileNotFoundError(f"Results folder not found: {self.folder_path}")
 
         oracle_df = pd.read_csv(oracle_file)
         result_df = oracle_df[["ProjectName", f"Is_Real_ML_{self.role_str}"]].copy()
         result_df[f"is ML {self.role_str}"] = "No"
 
-        for filename in os.listdir(self.folder_path):
-            if filename.endswith(".csv"):
-                file_path = os.path.join(self.folder_path, filename)
-                df = pd.read_csv(file_path)
-                matching = result_df["ProjectName"].isin(df["ProjectName"])
-                result_df.loc[matching, f"is ML {self.role_str}"] = "Yes"
+        for projects in self.detected_projects():
+            matching = result_df["ProjectName"].isin(projects)
+            result_df.loc[matching, f"is ML {self.role_str}"] = "Yes"
 
         output_dir = os.path.join(self.oracle_path, "matching")
         os.makedirs(output_dir, exist_ok=True)
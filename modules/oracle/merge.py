@@ -11,7 +11,10 @@ and auditable assessment of MARK’s classification performance.
 import os
 import pandas as pd
 
+from modules.analyzer.evidence_store import EvidenceStore
+from modules.analyzer.result_writer import ResultFormat
 from modules.utils.logger import get_logger
+from modules.utils.metrics import Metrics
 
 logger = get_logger(__name__)
 
@@ -63,13 +66,15 @@ class Merger:
 
         Args:
             df_oracle (str): Path to oracle CSV.
-            df_result (str): Path to produced result CSV.
+            df_result (str): Path to produced result file (CSV or Parquet), or to an
+                evidence store holding the results of the role.
 
         Returns:
             pd.DataFrame: Merged DataFrame
         """
         df_oracle = pd.read_csv(df_oracle)
-        df_result = pd.read_csv(df_result)
+        # Only the two columns used below are read.
+        df_result = self.read_results(df_result, ['ProjectName', f'Is ML {self.column_name}'])
 
         df_result.rename(
             columns={f'Is ML {self.column_name}': f'Is_ML_{self.column_name}'},
@@ -93,6 +98,24 @@ class Merger:
 
         return df_joint
 
+    def read_results(self, result_path, columns):
+        """
+        Read some columns of the results of the role.
+
+        Args:
+            result_path (str): Results file (CSV or Parquet) or evidence store.
+            columns (list[str]): Columns to load.
+
+        Returns:
+            pd.DataFrame: The columns.
+        """
+        if EvidenceStore.is_store(result_path):
+            if not os.path.exists(result_path):
+                raise FileNotFoundError(f"Evidence store not found: {result_path}")
+            with EvidenceStore(result_path) as store:
+                return store.role_results(self.column_name, columns)
+        return ResultFormat.read_columns(result_path, columns)
+
     def reporting(self, base_output_path, dir_result, file_name):
         """
         Generate report by computing metrics and saving false cases.
@@ -100,15 +123,35 @@ class Merger:
         Args:
             base_output_path (str): Base path for results.
             dir_result (str): Subfolder with role result.
-            file_name (str): Name of the produced CSV.
+            file_name (str): Name of the produced results file (results.csv or results.parquet).
         """
-        result_path = os.path.join(base_output_path, self.column_name, dir_result, file_name)
-        df_joint = self.join(
-            os.path.join(self.oracle_path, f"oracle_{self.column_name}.csv"),
-            result_path
-        )
+        self.report(os.path.join(base_output_path, self.column_name, dir_result, file_name))
 
-        precision, recall, f1, accuracy = self.calc_performance_metrics(df_joint)
+    def reporting_from_store(self, evidence_store_path):
+        """
+        Generate the report from the results of the role recorded in an evidence store.
+
+        Args:
+            evidence_store_path (str): Location of the evidence store.
+        """
+        self.report(evidence_store_path)
+
+    def report(self, result_path):
+        """
+        Compute the metrics of a results file or evidence store and save the false cases.
+
+        Args:
+            result_path (str): Results file (CSV or Parquet) or evidence store.
+        """
+        file_name = os.path.basename(str(result_path))
+        with Metrics.timer("stage_seconds", stage="merger"):
+            df_joint = self.join(
+                os.path.join(self.oracle_path, f"oracle_{self.column_name}.csv"),
+                result_path
+            )
+
+            precision, recall, f1, accuracy = self.calc_performance_metrics(df_joint)
+        Metrics.inc("merger_projects", len(df_joint), role=self.column_name)
 
         false_pos = self.get_false_positives(df_joint, self.column_name)
         false_pos_path = os.path.join(
@@ -0,0 +1,87 @@
+"""Cheap detection of binary, generated and oversized source files.
+
+Some repositories ship `.py` files that are not hand-written code: protobuf and other
+generated stubs, embedded weights or minified data. They rarely carry evidence but can be
+orders of magnitude larger than the rest of the project. ContentScreen inspects a bounded
+prefix of the raw bytes (no decoding, no copy of the file) and returns the reason for
+skipping such a file, which the analyzers report in `skipped_files.jsonl`."""
+
+import re
+from typing import Optional
+
+
+class ContentScreen:
+    """Heuristics deciding whether a source file should be skipped before analysis."""
+
+    TOO_LARGE = "too_large"
+    BINARY = "binary"
+    GENERATED = "generated"
+    MINIFIED = "minified"
+
+    GENERATED_MARKERS = re.compile(
+        rb"@generated|DO NOT EDIT|Generated by the protocol buffer compiler"
+        rb"|(?i:auto-?generated (?:file|code|by))|(?i:this file (?:was|is) (?:automatically )?generated)"
+    )
+
+    def __init__(
+            self,
+            max_size: int = 10 * 1024 * 1024,
+            header_size: int = 2048,
+            sample_size: int = 64 * 1024,
+            max_line_length: int = 10000,
+            max_mean_line_length: int = 300
+    ):
+        """
+        Initialize the heuristics.
+
+        Args:
+            max_size (int): Files larger than this many bytes are skipped (None disables the cap).
+            header_size (int): Bytes at the start of the file searched for generated-code markers.
+            sample_size (int): Bytes at the start of the file used for the NUL-byte and line-length checks.
+            max_line_length (int): A longer line in the sample marks the file as minified data.
+            max_mean_line_length (int): A higher mean line length in the sample marks the file as minified.
+        """
+        self.max_size = max_size
+        self.header_size = header_size
+        self.sample_size = sample_size
+        self.max_line_length = max_line_length
+        self.max_mean_line_length = max_mean_line_length
+
+    def oversized(self, size: int) -> bool:
+        """Whether a file of `size` bytes exceeds the size cap."""
+        return self.max_size is not None and size > self.max_size
+
+    def classify(self, data) -> Optional[str]:
+        """
+        Return why a file should be skipped, or None if it looks like regular source code.
+
+        Args:
+            data (bytes | mmap.mmap): Raw content of the file.
+
+        Returns:
+            str | None: One of TOO_LARGE, BINARY, GENERATED or MINIFIED.
+        """
+        size = len(data)
+        if self.oversized(size):
+            return self.TOO_LARGE
+        if not size:
+            return None
+
+        sample = data[:self.sample_size]
+        if b"\0" in sample:
+            return self.BINARY
+        if self.GENERATED_MARKERS.search(sample, 0, self.header_size):
+            return self.GENERATED
+
+        lines = sample.split(b"\n")
+        if len(sample) < size:
+            # The last line of the sample may continue past it.
+            lines.pop()
+            if not lines:
+                return self.MINIFIED
+        longest = max(map(len, lines))
+        if longest > self.max_line_length:
+            return self.MINIFIED
+        if len(sample) / len(lines) > self.max_mean_line_length:
+            return self.MINIFIED
+        return None
@@ -4,11 +4,22 @@ import re
 
 from modules.scanner.file_filter.file_filter_base import FileFilter
 
+_EXCLUDED_PATTERN = re.compile(r"test|example|eval|validat", re.IGNORECASE)
+# Directories are matched on whole name tokens, so that e.g. ``retrieval/`` or ``latest/``
+# are not pruned with their whole subtree.
+_EXCLUDED_DIRECTORY_TOKENS = frozenset({
+    "test", "tests", "example", "examples", "eval", "evals",
+    "evaluation", "evaluations", "validation", "validations",
+})
+_DIRECTORY_TOKEN_SEPARATORS = re.compile(r"[_.-]")
+
 
 class ExcludeTestFilesFilter(FileFilter):
     """
     A filter that excludes files typically associated with tests, examples,
-    evaluations, or validations based on filename patterns.
+    evaluations, or validations based on filename patterns. Directories are pruned
+    when a token of their name (split on ``_``, ``-`` and ``.``) is one of these
+    words (e.g. ``tests/``, ``examples/``, ``unit_tests/``).
     """
 
     def accept(self, file_name: str) -> bool:
@@ -21,4 +32,17 @@ class ExcludeTestFilesFilter(FileFilter):
         Returns:
             bool: True if the file is acceptable, False if it should be excluded.
         """
-        return not re.search(r"test|example|eval|validat", file_name, re.IGNORECASE)
+        return not _EXCLUDED_PATTERN.search(file_name)
+
+    def accept_directory(self, dir_name: str) -> bool:
+        """
+        Check whether a directory should be scanned (i.e., is not a test or example folder).
+
+        Args:
+            dir_name (str): The name of the directory to check.
+
+        Returns:
+            bool: True if the directory is acceptable, False if its subtree should be skipped.
+        """
+        tokens = _DIRECTORY_TOKEN_SEPARATORS.split(dir_name.lower())
+        return _EXCLUDED_DIRECTORY_TOKENS.isdisjoint(tokens)
@@ -1,5 +1,7 @@
 """File filter that accepts files based on their extensions."""
 
+from typing import List
+
 from modules.scanner.file_filter.file_filter_base import FileFilter
 
 
@@ -28,3 +30,12 @@ class ExtensionFilter(FileFilter):
             bool: True if the file matches one of the allowed extensions, False otherwise.
         """
         return any(file_name.endswith(ext) for ext in self.extensions)
+
+    def checkout_patterns(self) -> List[str]:
+        """
+        Describe the accepted files as sparse-checkout patterns (e.g. ``*.py``).
+
+        Returns:
+            List[str]: One pattern per allowed extension.
+        """
+        return [f"*{ext}" for ext in self.extensions]
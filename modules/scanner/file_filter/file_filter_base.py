@@ -1,6 +1,7 @@
 """Abstract base class for file filters used in project scanning."""
 
 from abc import ABC, abstractmethod
+from typing import List, Optional
 
 
 class FileFilter(ABC):
@@ -19,3 +20,30 @@ class FileFilter(ABC):
         Returns:
             bool: True if the file is accepted, False otherwise.
         """
+
+    def accept_directory(self, dir_name: str) -> bool:
+        """
+        Determine whether the files below a directory may be accepted at all.
+
+        Rejected directories are pruned by the scanner without being listed. Filters that
+        only look at file names keep the default, which accepts every directory.
+
+        Args:
+            dir_name (str): Name of the directory to evaluate.
+
+        Returns:
+            bool: True if the directory should be scanned, False otherwise.
+        """
+        return True
+
+    def checkout_patterns(self) -> Optional[List[str]]:
+        """
+        Describe the accepted files as gitignore-style patterns for a sparse checkout.
+
+        The patterns may match more files than the filter accepts, never fewer. Filters that
+        do not restrict the files to a known set of patterns keep the default.
+
+        Returns:
+            List[str] | None: Patterns of the accepted files, or None if any file may be accepted.
+        """
+        return None
@@ -0,0 +1,166 @@
+"""Matching of `.gitignore` patterns against project-relative paths.
+
+IgnoreRules compiles the patterns of one `.gitignore` file; the rules of a repository are the
+stack of the files found from its root down to the scanned directory. As in git, the last
+matching pattern decides, deeper files take precedence over their parents, ``!`` re-includes
+a path, a trailing ``/`` restricts a pattern to directories and a pattern containing a ``/``
+is anchored to the directory of its `.gitignore`. Paths are always ``/``-separated and
+relative to the repository root, so the same rules apply to directory walks, git trees and
+archive members."""
+
+import re
+from typing import Optional
+
+from modules.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+class IgnoreRules:
+    """Compiled patterns of a single `.gitignore` file."""
+
+    FILE_NAME = ".gitignore"
+
+    def __init__(self, patterns, base: str = ""):
+        """
+        Compile the patterns.
+
+        Args:
+            patterns (Iterable[str]): Lines of the `.gitignore` file.
+            base (str): Directory of the `.gitignore`, relative to the repository root
+                (``""`` for the root, otherwise ending with ``/``).
+        """
+        self.base = base
+        self.rules = []
+        for line in patterns:
+            rule = self._compile(line)
+            if rule is not None:
+                self.rules.append(rule)
+
+    @classmethod
+    def from_file(cls, path: str, base: str = "") -> Optional["IgnoreRules"]:
+        """Read a `.gitignore` file; returns None if it is unreadable or has no pattern."""
+        try:
+            with open(path, encoding="utf-8", errors="replace") as f:
+                rules = cls(f.read().splitlines(), base)
+        except OSError as e:
+            logger.debug("Error reading %s: %s", path, e)
+            return None
+        return rules if rules.rules else None
+
+    @classmethod
+    def from_bytes(cls, data: bytes, base: str = "") -> Optional["IgnoreRules"]:
+        """Parse the content of a `.gitignore` (e.g. a git blob); returns None if it has no pattern."""
+        rules = cls(data.decode("utf-8", errors="replace").splitlines(), base)
+        return rules if rules.rules else None
+
+    @staticmethod
+    def _compile(line: str):
+        """Translate a `.gitignore` line into (regex, negated, directory_only)."""
+        line = line.rstrip("\n\r")
+        if not line or line.startswith("#"):
+            return None
+        # Trailing spaces are ignored unless escaped.
+        stripped = line.rstrip(" ")
+        if stripped.endswith("\\") and len(stripped) < len(line):
+            stripped += " "
+        line = stripped
+
+        negated = line.startswith("!")
+        if negated:
+            line = line[1:]
+        elif line.startswith("\\!") or line.startswith("\\#"):
+            line = line[1:]
+
+        directory_only = line.endswith("/")
+        line = line.rstrip("/")
+        if not line:
+            return None
+
+        anchored = "/" in line
+        line = line.lstrip("/")
+        body = IgnoreRules._translate(line)
+        prefix = "^" if anchored else "^(?:.*/)?"
+        return re.compile(f"{prefix}{body}$", re.DOTALL), negated, directory_only
+
+    @staticmethod
+    def _translate(pattern: str) -> str:
+        """Translate a glob with git's ``**`` semantics into a regex body."""
+        parts = []
+        i, n = 0, len(pattern)
+        while i < n:
+            char = pattern[i]
+            if char == "*":
+                if pattern.startswith("**", i):
+                    at_start = i == 0 or pattern[i - 1] == "/"
+                    if at_start and pattern.startswith("**/", i):
+                        parts.append("(?:.*/)?")
+                        i += 3
+                        continue
+                    if at_start and i + 2 == n:
+                        parts.append(".*")
+                        i += 2
+                        continue
+                    i += 2
+                    parts.append("[^/]*")
+                    continue
+                parts.append("[^/]*")
+            elif char == "?":
+                parts.append("[^/]")
+            elif char == "[":
+                start = i + 1
+                if pattern[start:start + 1] in ("!", "^"):
+                    start += 1
+                if pattern[start:start + 1] == "]":
+                    start += 1
+                end = pattern.find("]", start)
+                if end == -1:
+                    parts.append(re.escape(char))
+                else:
+                    content = pattern[i + 1:end]
+                    negate = content[:1] in ("!", "^")
+                    if negate:
+                        content = content[1:]
+                    content = content.replace("\\", "\\\\").replace("[", "\\[")
+                    if content.startswith("]"):
+                        content = "\\" + content
+                    parts.append(f"[{'^' if negate else ''}{content}]")
+                    i = end
+            elif char == "\\" and i + 1 < n:
+                i += 1
+                parts.append(re.escape(pattern[i]))
+            else:
+                parts.append(re.escape(char))
+            i += 1
+        return "".join(parts)
+
+    def match(self, relative_path: str, is_dir: bool) -> Optional[bool]:
+        """
+        Match a path against the patterns of this file.
+
+        Args:
+            relative_path (str): Path relative to the repository root.
+            is_dir (bool): Whether the path is a directory.
+
+        Returns:
+            bool | None: True if ignored, False if re-included, None if no pattern matches.
+        """
+        if not relative_path.startswith(self.base):
+            return None
+        local_path = relative_path[len(self.base):]
+        for regex, negated, directory_only in reversed(self.rules):
+            if directory_only and not is_dir:
+                continue
+            if regex.match(local_path):
+                return not negated
+        return None
+
+    @staticmethod
+    def is_ignored(rules_stack, relative_path: str, is_dir: bool) -> bool:
+        """Return whether a path is ignored by a stack of rules (root first)."""
+        ignored = False
+        for rules in rules_stack:
+            result = rules.match(relative_path, is_dir)
+            if result is not None:
+                ignored = result
+        return ignored
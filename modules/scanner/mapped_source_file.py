@@ -0,0 +1,81 @@
+"""Memory-mapped source file matched at the bytes level.
+
+MappedSourceFile maps the file instead of reading it, so a large file costs no copy and no
+decoding up front: the import prefilter, the combined keyword regex and the consumer Rule 3
+lookups all run directly on the mapped bytes, and only the lines holding an import statement
+or a keyword hit are decoded (UTF-8, falling back to ISO-8859-1 like SourceFile). Files that
+are not valid UTF-8 are therefore still searched instead of being given up on. Strategies
+working on the text or the lines (e.g. DefaultKeywordMatcher) still get them: the whole
+content is then decoded once, from a copy of the map."""
+
+import mmap
+from functools import cached_property
+
+from modules.library_manager.library_extractor import LibraryExtractor
+from modules.scanner.source_file import SourceFile
+
+
+class MappedSourceFile(SourceFile):
+    """Source file whose content is a read-only memory map of the file."""
+
+    bytes_level = True
+
+    @classmethod
+    def read(cls, path: str) -> "MappedSourceFile":
+        """Map a file from disk without reading it."""
+        with open(path, "rb") as f:
+            try:
+                data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            except ValueError:
+                # Empty files cannot be mapped.
+                data = b""
+        return cls(path, data)
+
+    @property
+    def searchable(self) -> bool:
+        """Bytes-level matching does not depend on the encoding."""
+        return True
+
+    def contains(self, keyword: str) -> bool:
+        """Whether the raw content contains `keyword` verbatim, without decoding it."""
+        return self.data.find(keyword.encode("utf-8")) != -1
+
+    @cached_property
+    def _decoded(self):
+        """Decode a copy of the whole content, only for the stages needing the text or the lines."""
+        return self.decode(bytes(self.data))
+
+    def decode_line(self, start: int, end: int) -> str:
+        """Decode the bytes of a single line."""
+        raw = self.data[start:end]
+        try:
+            return raw.decode("utf-8")
+        except UnicodeDecodeError:
+            return raw.decode(self.FALLBACK_ENCODING)
+
+    @cached_property
+    def imports(self) -> list:
+        """Libraries referenced by the import statements, decoding only the lines that hold one."""
+        data = self.data
+        lines = []
+        position = data.find(b"import ")
+        while position != -1:
+            start = data.rfind(b"\n", 0, position) + 1
+            end = data.find(b"\n", position)
+            end = len(data) if end == -1 else end + 1
+            line = self.decode_line(start, end)
+            if "\r" in line:
+                # Same universal-newline split as the decoded text.
+                parts = line.replace("\r\n", "\n").replace("\r", "\n").split("\n")
+                lines.extend(part + "\n" for part in parts[:-1])
+                if parts[-1]:
+                    lines.append(parts[-1])
+            else:
+                lines.append(line)
+            position = data.find(b"import ", end)
+        return LibraryExtractor.get_libraries_from_lines(lines)
+
+    def close(self):
+        """Unmap the file."""
+        if isinstance(self.data, mmap.mmap):
+            self.data.close()
@@ -0,0 +1,236 @@
+"""Streaming reader for Jupyter notebooks (.ipynb).
+
+Notebooks often embed megabytes of outputs (base64 images, logs) next to a few kilobytes of
+code. NotebookParser walks the notebook JSON directly on a memory-mapped file (or an
+in-memory buffer): it only decodes the ``cell_type`` and ``source`` fields of each cell and
+skips every other value (outputs, attachments, metadata) by jumping between quotes and
+brackets, without ever materializing it. Both nbformat 4 (``cells``) and nbformat 3
+(``worksheets[].cells[]`` with ``input``) layouts are supported.
+
+NotebookSourceFile exposes the code cells to the analysis pipeline as a regular SourceFile
+whose text is the concatenation of the code cells; matches are located back to their cell
+index and to the line within that cell."""
+
+import hashlib
+import json
+import mmap
+import re
+from bisect import bisect_right
+from functools import cached_property
+
+from modules.scanner.source_file import SourceFile
+
+_WHITESPACE = re.compile(rb"[ \t\n\r]*")
+_STRUCTURAL = re.compile(rb'["\[\]{}]')
+_SCALAR_END = re.compile(rb"[,\]}\s]")
+_BACKSLASH = 0x5C
+
+
+class NotebookParser:
+    """Pull parser extracting the code cells of a notebook from a bytes-like buffer."""
+
+    def __init__(self, buffer):
+        """
+        Initialize the parser.
+
+        Args:
+            buffer (bytes | mmap.mmap): Raw notebook content.
+        """
+        self.buffer = buffer
+        self.pos = 0
+
+    def code_cells(self) -> list:
+        """
+        Extract the code cells of the notebook.
+
+        Returns:
+            list[tuple[int, str]]: (cell index, source) of every code cell, in notebook order.
+
+        Raises:
+            ValueError: If the content is not a well-formed notebook.
+        """
+        cells = []
+        for key in self._iter_object():
+            if key == "cells":
+                self._parse_cells(cells, "source")
+            elif key == "worksheets":
+                for _ in self._iter_array():
+                    for worksheet_key in self._iter_object():
+                        if worksheet_key == "cells":
+                            self._parse_cells(cells, "input")
+                        else:
+                            self._skip_value()
+            else:
+                self._skip_value()
+        return cells
+
+    def _parse_cells(self, cells, source_key):
+        """Append the code cells of a ``cells`` array to `cells`."""
+        for index in self._iter_array():
+            cell_type, source = None, None
+            for key in self._iter_object():
+                if key == "cell_type":
+                    cell_type = self._read_string()
+                elif key == source_key:
+                    source = self._read_json()
+                else:
+                    self._skip_value()
+            if cell_type == "code" and source:
+                cells.append((index, "".join(source) if isinstance(source, list) else source))
+
+    # ---------------------------------------------------------------------
+    # Tokenizer
+    # ---------------------------------------------------------------------
+
+    def _peek(self) -> bytes:
+        self.pos = _WHITESPACE.match(self.buffer, self.pos).end()
+        return self.buffer[self.pos:self.pos + 1]
+
+    def _expect(self, char: bytes):
+        if self._peek() != char:
+            raise ValueError(f"Expected {char!r} at offset {self.pos}")
+        self.pos += 1
+
+    def _iter_object(self):
+        """Yield the keys of an object; the caller consumes each value before resuming."""
+        self._expect(b"{")
+        if self._peek() == b"}":
+            self.pos += 1
+            return
+        while True:
+            key = self._read_string()
+            self._expect(b":")
+            yield key
+            separator = self._peek()
+            self.pos += 1
+            if separator == b"}":
+                return
+            if separator != b",":
+                raise ValueError(f"Malformed object at offset {self.pos - 1}")
+
+    def _iter_array(self):
+        """Yield the index of each element; the caller consumes each element before resuming."""
+        self._expect(b"[")
+        if self._peek() == b"]":
+            self.pos += 1
+            return
+        index = 0
+        while True:
+            yield index
+            index += 1
+            separator = self._peek()
+            self.pos += 1
+            if separator == b"]":
+                return
+            if separator != b",":
+                raise ValueError(f"Malformed array at offset {self.pos - 1}")
+
+    def _string_end(self, start: int) -> int:
+        """Return the offset just past the string starting at `start` (its opening quote)."""
+        pos = start + 1
+        while True:
+            end = self.buffer.find(b'"', pos)
+            if end == -1:
+                raise ValueError(f"Unterminated string at offset {start}")
+            backslashes = 0
+            while self.buffer[end - 1 - backslashes] == _BACKSLASH:
+                backslashes += 1
+            if backslashes % 2 == 0:
+                return end + 1
+            pos = end + 1
+
+    def _read_string(self) -> str:
+        if self._peek() != b'"':
+            raise ValueError(f"Expected a string at offset {self.pos}")
+        start = self.pos
+        self.pos = self._string_end(start)
+        return json.loads(self.buffer[start:self.pos])
+
+    def _read_json(self):
+        """Decode the next value (only used for small values such as cell sources)."""
+        self._peek()
+        start = self.pos
+        self._skip_value()
+        return json.loads(self.buffer[start:self.pos])
+
+    def _skip_value(self):
+        """Move past the next value without decoding it."""
+        char = self._peek()
+        if char == b'"':
+            self.pos = self._string_end(self.pos)
+            return
+        if char in (b"{", b"["):
+            depth = 0
+            pos = self.pos
+            while True:
+                match = _STRUCTURAL.search(self.buffer, pos)
+                if match is None:
+                    raise ValueError(f"Unterminated value at offset {self.pos}")
+                token = match.group()
+                if token == b'"':
+                    pos = self._string_end(match.start())
+                    continue
+                depth += 1 if token in (b"{", b"[") else -1
+                pos = match.end()
+                if depth == 0:
+                    self.pos = pos
+                    return
+        match = _SCALAR_END.search(self.buffer, self.pos)
+        self.pos = match.start() if match else len(self.buffer)
+
+
+@SourceFile.register_reader(".ipynb")
+class NotebookSourceFile(SourceFile):
+    """Code cells of a notebook, exposed as a single source text."""
+
+    def __init__(self, path: str, cells):
+        """
+        Build the source text from the code cells.
+
+        Args:
+            path (str): Location of the notebook, as reported in the results.
+            cells (list[tuple[int, str]]): (cell index, source) of every code cell.
+        """
+        chunks = []
+        self.cell_indexes = []
+        self.cell_first_lines = []
+        line = 1
+        for index, source in cells:
+            source = source.replace("\r\n", "\n").replace("\r", "\n")
+            if not source.endswith("\n"):
+                source += "\n"
+            chunks.append(source)
+            self.cell_indexes.append(index)
+            self.cell_first_lines.append(line)
+            line += source.count("\n")
+        super().__init__(path, "".join(chunks).encode("utf-8"))
+
+    @classmethod
+    def read(cls, path: str) -> "NotebookSourceFile":
+        """Stream the code cells out of a notebook on disk through a memory map."""
+        with open(path, "rb") as f:
+            try:
+                buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            except ValueError:
+                # Empty files cannot be mapped.
+                return cls(path, [])
+            with buffer:
+                return cls(path, NotebookParser(buffer).code_cells())
+
+    @classmethod
+    def parse(cls, path: str, data: bytes) -> "NotebookSourceFile":
+        """Extract the code cells of a notebook already loaded in memory."""
+        return cls(path, NotebookParser(data).code_cells() if data.strip() else [])
+
+    @cached_property
+    def content_hash(self) -> str:
+        """SHA-256 of the code cells, distinct from a .py file with the same text."""
+        return hashlib.sha256(b"ipynb\0" + self.data).hexdigest()
+
+    def locate(self, line_number: int) -> tuple:
+        """Return the (where, line_number) of a line: the cell it belongs to and its line in it."""
+        position = bisect_right(self.cell_first_lines, line_number) - 1
+        if position < 0:
+            return self.path, line_number
+        cell_line = line_number - self.cell_first_lines[position] + 1
+        return f"{self.path}#cell={self.cell_indexes[position]}", cell_line
@@ -1,8 +1,20 @@
-"""Module for scanning project directories and collecting valid source files."""
+"""Module for scanning project directories and collecting valid source files.
 
+ProjectScanner walks a checkout with `os.scandir` and yields the accepted files lazily, in the
+same order as `os.walk` (the files of a directory, then its subdirectories). Whole directories
+are pruned before being listed: version-control metadata, virtual environments and other
+vendored trees, paths ignored by the `.gitignore` files of the project, and directories
+rejected by a FileFilter. The same rules are available on relative paths (`accepts_path`) and
+on whole listings (`scan_listing`) for sources that are not directory trees, such as git trees
+or archives, and can be exported as
+sparse-checkout patterns (`checkout_patterns`) so that a clone only fetches the scanned files."""
+
+import copy
+import os
 from typing import List, Optional
 
 from modules.scanner.file_filter.file_filter_base import FileFilter
+from modules.scanner.ignore_rules import IgnoreRules
 from modules.utils.logger import get_logger
 
 logger = get_logger(__name__)
@@ -11,9 +23,273 @@ logger = get_logger(__name__)
 class ProjectScanner:
     """Scans project folders to collect source files that match given filter criteria."""
 
+    DEFAULT_EXCLUDED_DIRS = frozenset({
+        ".git", ".hg", ".svn", "__pycache__", ".ipynb_checkpoints",
+        "venv", ".venv", "virtualenv", ".tox", ".nox", ".eggs",
+        "site-packages", "dist-packages", "node_modules",
+        ".mypy_cache", ".pytest_cache",
+    })
+    # A directory holding this file is a virtual environment, whatever its name.
+    VIRTUALENV_MARKER = "pyvenv.cfg"
+
+    def __init__(
+            self,
+            filters: Optional[List[FileFilter]] = None,
+            excluded_dirs=DEFAULT_EXCLUDED_DIRS,
+            use_gitignore: bool = True
+    ):
+        """
+        Initialize the scanner.
+
+        Args:
+            filters (List[FileFilter], optional): Filters every file (and directory) must pass.
+            excluded_dirs (Iterable[str]): Directory names pruned wherever they appear.
+            use_gitignore (bool): Whether to honour the `.gitignore` files of the project.
+        """
+        self.filters = filters or []
+        self.excluded_dirs = frozenset(excluded_dirs or ())
+        self.use_gitignore = use_gitignore
+
     @staticmethod
     def is_valid_file(filename: str, filters: List[FileFilter]) -> bool:
         """
         Check whether the given file is accepted by all configured filters.
         """
         return all(file_filter.accept(filename) for file_filter in filters)
+
+    def accepts_file(self, filename: str) -> bool:
+        """Check whether a file name passes the filters."""
+        return self.is_valid_file(filename, self.filters)
+
+    def accepts_directory(self, dirname: str) -> bool:
+        """Check whether the files below a directory may be scanned at all."""
+        if dirname in self.excluded_dirs:
+            return False
+        return all(file_filter.accept_directory(dirname) for file_filter in self.filters)
+
+    def accepts_path(self, relative_path: str, ignore_rules=()) -> bool:
+        """
+        Apply the scanning rules to a `/`-separated path relative to the project root.
+
+        Only the virtual-environment marker check, which needs the directory listing, is not
+        applied here.
+
+        Args:
+            relative_path (str): Path of a file inside the project (e.g. ``src/train.py``).
+            ignore_rules (Sequence[IgnoreRules]): `.gitignore` rules of the project, root first.
+
+        Returns:
+            bool: True if a directory scan would yield the file.
+        """
+        *directories, filename = relative_path.strip("/").split("/")
+        prefix = ""
+        for directory in directories:
+            prefix += directory
+            if not self.accepts_directory(directory) or (
+                    ignore_rules and IgnoreRules.is_ignored(ignore_rules, prefix, True)
+            ):
+                return False
+            prefix += "/"
+        if ignore_rules and IgnoreRules.is_ignored(ignore_rules, relative_path, False):
+            return False
+        return self.accepts_file(filename)
+
+    def checkout_patterns(self) -> Optional[List[str]]:
+        """
+        Describe the files the scanner may yield as no-cone sparse-checkout patterns.
+
+        The patterns of the accepted files (e.g. ``*.py``) are followed by the `.gitignore`
+        files, when honoured, the virtual-environment markers (so that virtual environments
+        are pruned in a sparse checkout too) and exclusions of the pruned directories. They
+        may select more files than the scan yields, never fewer.
+
+        Returns:
+            List[str] | None: Sparse-checkout patterns, or None if any file may be yielded.
+        """
+        patterns = self._included_patterns()
+        if patterns is None:
+            return None
+        if self.use_gitignore:
+            patterns.append(f"**/{IgnoreRules.FILE_NAME}")
+        patterns.append(f"**/{self.VIRTUALENV_MARKER}")
+        patterns.extend(f"!**/{name}/**" for name in sorted(self.excluded_dirs))
+        return patterns
+
+    def _included_patterns(self) -> Optional[List[str]]:
+        # A file passes every filter, so the patterns of any restricting filter cover it.
+        for file_filter in self.filters:
+            patterns = file_filter.checkout_patterns()
+            if patterns is not None:
+                return list(patterns)
+        return None
+
+    def scan(self, root: str):
+        """
+        Yield the accepted files of a project.
+
+        Args:
+            root (str): Path of the project checkout.
+
+        Yields:
+            tuple[str, str]: (path, path relative to `root` with `/` separators) of every file.
+        """
+        yield from self._scan_directory(root, "", ())
+
+    def scan_listing(self, paths, read_file=None):
+        """
+        Yield the accepted files among the listing of a project stored elsewhere than on disk.
+
+        The listing is visited like a directory: the files of a directory (sorted by name),
+        then its subdirectories, with the same pruning, virtual-environment and `.gitignore`
+        rules as `scan`.
+
+        Args:
+            paths (Iterable[str]): `/`-separated path of every file, relative to the project root.
+            read_file (Callable[[str], bytes], optional): Returns the content of a listed file
+                (raising OSError on failure); used to load the `.gitignore` files.
+
+        Yields:
+            str: The relative path of every accepted file.
+        """
+        directories = {"": ([], [])}
+        for path in paths:
+            *parents, name = path.split("/")
+            prefix = ""
+            for parent in parents:
+                child = f"{prefix}{parent}/"
+                if child not in directories:
+                    directories[child] = ([], [])
+                    directories[prefix][1].append(parent)
+                prefix = child
+            directories[prefix][0].append(name)
+        yield from self._scan_listing(directories, "", (), read_file)
+
+    def _visit(self, relative: str, ignore_rules: tuple):
+        """Called with the `.gitignore` rules in force in every directory walked."""
+
+    def _ignored(self, ignore_rules: tuple, relative_path: str, is_dir: bool) -> bool:
+        """Whether the walk skips a path ignored by the `.gitignore` rules."""
+        return IgnoreRules.is_ignored(ignore_rules, relative_path, is_dir)
+
+    def _scan_listing(self, directories: dict, relative: str, ignore_rules: tuple, read_file):
+        files, subdirectories = directories[relative]
+        if relative and self.VIRTUALENV_MARKER in files:
+            return
+        if self.use_gitignore and read_file is not None and IgnoreRules.FILE_NAME in files:
+            try:
+                rules = IgnoreRules.from_bytes(read_file(relative + IgnoreRules.FILE_NAME), relative)
+            except OSError as e:
+                logger.debug("Error reading %s%s: %s", relative, IgnoreRules.FILE_NAME, e)
+                rules = None
+            if rules is not None:
+                ignore_rules = (*ignore_rules, rules)
+        self._visit(relative, ignore_rules)
+
+        for name in sorted(files):
+            relative_path = relative + name
+            if (self.accepts_file(name)
+                    and not self._ignored(ignore_rules, relative_path, False)):
+                yield relative_path
+
+        for name in sorted(subdirectories):
+            relative_path = relative + name
+            if (self.accepts_directory(name)
+                    and not self._ignored(ignore_rules, relative_path, True)):
+                yield from self._scan_listing(
+                    directories, relative_path + "/", ignore_rules, read_file
+                )
+
+    def _scan_directory(self, path: str, relative: str, ignore_rules: tuple):
+        try:
+            with os.scandir(path) as iterator:
+                entries = list(iterator)
+        except OSError as e:
+            logger.debug("Error scanning %s: %s", path, e)
+            return
+
+        names = {entry.name for entry in entries}
+        if relative and self.VIRTUALENV_MARKER in names:
+            return
+        if self.use_gitignore and IgnoreRules.FILE_NAME in names:
+            rules = IgnoreRules.from_file(os.path.join(path, IgnoreRules.FILE_NAME), relative)
+            if rules is not None:
+                ignore_rules = (*ignore_rules, rules)
+        self._visit(relative, ignore_rules)
+
+        subdirectories = []
+        for entry in entries:
+            relative_path = relative + entry.name
+            try:
+                is_dir = entry.is_dir()
+            except OSError:
+                is_dir = False
+
+            if is_dir:
+                # Like os.walk, symbolic links to directories are not followed.
+                if (not entry.is_symlink() and self.accepts_directory(entry.name)
+                        and not self._ignored(ignore_rules, relative_path, True)):
+                    subdirectories.append((entry.path, relative_path))
+            elif (self.accepts_file(entry.name)
+                  and not self._ignored(ignore_rules, relative_path, False)):
+                yield entry.path, relative_path
+
+        for subdirectory, relative_path in subdirectories:
+            yield from self._scan_directory(subdirectory, relative_path + "/", ignore_rules)
+
+
+class CombinedProjectScanner(ProjectScanner):
+    """Scanner yielding the files accepted by at least one of several scanners.
+
+    Used to walk a project once on behalf of several analyzers; each of them then checks the
+    yielded relative paths with its own `accepts_path`. The `.gitignore` files are read when
+    one of the scanners honours them, but only prune the walk when all of them do: a copy of
+    the scanner made with `for_walk` records the rules in force in every directory, for the
+    scanners honouring them (`ignore_rules_of`).
+    """
+
+    def __init__(self, scanners: List[ProjectScanner]):
+        """
+        Initialize the combined scanner.
+
+        Args:
+            scanners (List[ProjectScanner]): The scanners of every analyzer.
+        """
+        super().__init__(
+            excluded_dirs=frozenset.intersection(*(s.excluded_dirs for s in scanners)),
+            use_gitignore=any(scanner.use_gitignore for scanner in scanners)
+        )
+        self.scanners = scanners
+        self.prune_ignored = all(scanner.use_gitignore for scanner in scanners)
+        self.directory_rules = {}
+
+    def for_walk(self) -> "CombinedProjectScanner":
+        """Return a copy of the scanner recording the `.gitignore` rules of a single walk."""
+        walk = copy.copy(self)
+        walk.directory_rules = {}
+        return walk
+
+    def ignore_rules_of(self, relative_path: str) -> tuple:
+        """Return the `.gitignore` rules in force for a file yielded by the walk, root first."""
+        directory, separator, _ = relative_path.rpartition("/")
+        return self.directory_rules.get(directory + separator, ())
+
+    def _visit(self, relative: str, ignore_rules: tuple):
+        self.directory_rules[relative] = ignore_rules
+
+    def _ignored(self, ignore_rules: tuple, relative_path: str, is_dir: bool) -> bool:
+        return self.prune_ignored and super()._ignored(ignore_rules, relative_path, is_dir)
+
+    def accepts_file(self, filename: str) -> bool:
+        return any(scanner.accepts_file(filename) for scanner in self.scanners)
+
+    def accepts_directory(self, dirname: str) -> bool:
+        return any(scanner.accepts_directory(dirname) for scanner in self.scanners)
+
+    def _included_patterns(self) -> Optional[List[str]]:
+        included = {}
+        for scanner in self.scanners:
+            patterns = scanner._included_patterns()  # pylint: disable=protected-access
+            if patterns is None:
+                return None
+            included.update(dict.fromkeys(patterns))
+        return list(included)
@@ -0,0 +1,205 @@
+"""Project sources reading repository archives in place, without extracting them.
+
+TarArchiveSource (.tar, .tar.gz/.tgz, .tar.bz2, .tar.xz) streams the archive, so compressed
+tarballs are never decompressed to disk nor sought backwards: a first pass lists the members
+and keeps the `.gitignore` files, the scanner rules are applied to the listing, and a second
+pass feeds the bytes of the accepted members to the analysis in archive order. Files read out
+of that order (e.g. after the decision-only reordering) are looked up by name on a seekable
+handle of the archive, opened on first use.
+ZipArchiveSource reads the central directory and decompresses the accepted members only.
+
+Member paths are matched relative to the project root: the single top-level directory of
+GitHub-style archives (``name-main/``) is not part of it. Files are reported as
+``<archive>!/<member>``."""
+
+import os
+import tarfile
+import zipfile
+
+from modules.scanner.ignore_rules import IgnoreRules
+from modules.scanner.project_source.project_source_base import ProjectSource
+from modules.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+class ArchiveSource(ProjectSource):
+    """Project stored in an archive file."""
+
+    KIND = "archive"
+    SUFFIXES = ()
+    SEPARATOR = "!/"
+
+    @classmethod
+    def accepts(cls, location) -> bool:
+        return os.path.isfile(location) and str(location).lower().endswith(cls.SUFFIXES)
+
+    @classmethod
+    def project_name(cls, name: str) -> str:
+        lowered = name.lower()
+        for suffix in cls.SUFFIXES:
+            if lowered.endswith(suffix):
+                return name[:-len(suffix)]
+        return name
+
+    def member_path(self, name: str) -> str:
+        """Path reported in the results for an archive member."""
+        return f"{self.location}{self.SEPARATOR}{name}"
+
+    @staticmethod
+    def member_name(name: str) -> str:
+        """Normalize a member name (no leading ``./`` or ``/``)."""
+        while name.startswith("./"):
+            name = name[2:]
+        return name.lstrip("/")
+
+    @staticmethod
+    def root_prefix(names) -> str:
+        """Return the top-level directory shared by every member (e.g. ``name-main/``), if any."""
+        top = None
+        for name in names:
+            head, separator, _ = name.partition("/")
+            if not separator or (top is not None and head != top):
+                return ""
+            top = head
+        return "" if top is None else f"{top}/"
+
+
+@ProjectSource.register
+class TarArchiveSource(ArchiveSource):
+    """Project stored in a (possibly compressed) tarball, read as a stream."""
+
+    SUFFIXES = (".tar", ".tar.gz", ".tgz", ".tar.bz2", ".tbz2", ".tar.xz", ".txz")
+
+    def __init__(self, location):
+        super().__init__(location)
+        self._current = None
+        self._members_info = {}
+        self._archive = None
+
+    def _members(self):
+        """Stream the regular file members, yielding (archive, member, normalized name)."""
+        with tarfile.open(self.location, mode="r|*") as archive:
+            for member in archive:
+                if member.isfile():
+                    yield archive, member, self.member_name(member.name)
+
+    def _list(self, read_ignore_files: bool):
+        """First pass: return the member names and the content of the `.gitignore` files."""
+        names = []
+        ignore_files = {}
+        self._members_info = {}
+        for archive, member, name in self._members():
+            names.append(name)
+            self._members_info[name] = (member.name, member.size)
+            if read_ignore_files and os.path.basename(name) == IgnoreRules.FILE_NAME:
+                ignore_files[name] = archive.extractfile(member).read()
+        return names, ignore_files
+
+    def files(self, scanner):
+        try:
+            names, ignore_files = self._list(scanner.use_gitignore)
+        except (OSError, tarfile.TarError) as e:
+            logger.error("Error reading archive %s: %s", self.location, e)
+            return
+
+        prefix = self.root_prefix(names)
+
+        def read_ignore_file(relative_path):
+            try:
+                return ignore_files[prefix + relative_path]
+            except KeyError as e:
+                raise OSError(f"{relative_path} not listed") from e
+
+        accepted = set(scanner.scan_listing(
+            [name[len(prefix):] for name in names], read_ignore_file
+        ))
+        try:
+            for archive, member, name in self._members():
+                relative_path = name[len(prefix):]
+                if relative_path not in accepted:
+                    continue
+                accepted.discard(relative_path)
+                # Only the current member of a stream can be read from it.
+                path = self.member_path(name)
+                self._current = (path, archive, member)
+                yield path, relative_path
+        except (OSError, tarfile.TarError) as e:
+            logger.error("Error reading archive %s: %s", self.location, e)
+        finally:
+            self._current = None
+
+    def _seekable_member(self, name: str):
+        """Return the seekable archive handle and the member of a file, by normalized name."""
+        if self._archive is None:
+            self._archive = tarfile.open(self.location, mode="r:*")
+        return self._archive, self._archive.getmember(self._members_info[name][0])
+
+    def read(self, path, relative_path, source_reader, skipped=None):
+        name = path[len(self.location) + len(self.SEPARATOR):]
+        streamed = self._current is not None and self._current[0] == path
+
+        def load():
+            try:
+                if streamed:
+                    _, archive, member = self._current
+                else:
+                    archive, member = self._seekable_member(name)
+                return archive.extractfile(member).read()
+            except (KeyError, tarfile.TarError) as e:
+                raise OSError(str(e)) from e
+
+        return source_reader.read_content(path, self._members_info[name][1], load, skipped)
+
+    def close(self):
+        """Close the seekable handle of the archive, if one was opened."""
+        if self._archive is not None:
+            self._archive.close()
+            self._archive = None
+
+
+@ProjectSource.register
+class ZipArchiveSource(ArchiveSource):
+    """Project stored in a zip file, read through its central directory."""
+
+    SUFFIXES = (".zip",)
+
+    def __init__(self, location):
+        super().__init__(location)
+        self._archive = None
+        self._infos = {}
+
+    def read_file(self, relative_path: str) -> bytes:
+        """Decompress a member, by path relative to the project root."""
+        try:
+            return self._archive.read(self._infos[relative_path])
+        except (KeyError, RuntimeError, zipfile.BadZipFile) as e:
+            raise OSError(f"cannot read {relative_path}: {e}") from e
+
+    def files(self, scanner):
+        try:
+            self._archive = zipfile.ZipFile(self.location)
+        except (OSError, zipfile.BadZipFile) as e:
+            logger.error("Error reading archive %s: %s", self.location, e)
+            return
+
+        infos = {
+            self.member_name(info.filename): info
+            for info in self._archive.infolist() if not info.is_dir()
+        }
+        prefix = self.root_prefix(infos)
+        self._infos = {name[len(prefix):]: info for name, info in infos.items()}
+        for relative_path in scanner.scan_listing(self._infos, self.read_file):
+            yield self.member_path(prefix + relative_path), relative_path
+
+    def read(self, path, relative_path, source_reader, skipped=None):
+        return source_reader.read_content(
+            path, self._infos[relative_path].file_size,
+            lambda: self.read_file(relative_path), skipped
+        )
+
+    def close(self):
+        """Close the zip file."""
+        if self._archive is not None:
+            self._archive.close()
+            self._archive = None
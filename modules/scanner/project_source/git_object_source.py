@@ -0,0 +1,143 @@
+"""Project source reading a bare git repository without checking it out.
+
+GitObjectSource lists the tree of a revision (HEAD by default) with a single
+`git ls-tree`, applies the scanner rules to the listed paths (the `.gitignore` files are read
+from the tree as well) and streams the content of the accepted blobs over one long-lived
+`git cat-file --batch` process per repository. Nothing is written to disk.
+
+Files are reported at the path they would have in a checkout next to the repository
+(``repos/owner/name.git`` is reported as ``repos/owner/name``), so the results are the same
+as those of a checkout-based run. Symbolic links and submodules are not followed."""
+
+import os
+import subprocess
+
+from modules.scanner.project_source.project_source_base import ProjectSource
+from modules.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+@ProjectSource.register
+class GitObjectSource(ProjectSource):
+    """Bare git repository read from its object database."""
+
+    KIND = "git"
+    SUFFIX = ".git"
+    BLOB_MODES = (b"100644", b"100755")
+
+    def __init__(self, location, ref: str = "HEAD"):
+        """
+        Initialize the source.
+
+        Args:
+            location (str): Path of the bare repository.
+            ref (str): Revision whose tree is analyzed (branch, tag or commit).
+        """
+        super().__init__(location)
+        self.ref = ref
+        root = self.location.rstrip("/\\")
+        self.root = root[:-len(self.SUFFIX)] if root.endswith(self.SUFFIX) else root
+        self._blobs = {}
+        self._process = None
+
+    @staticmethod
+    def accepts(location) -> bool:
+        """Whether a location is a bare repository (HEAD, objects/ and refs/, no work tree)."""
+        return (
+            # The metadata directory of a checkout is not a project of its own.
+            os.path.basename(os.path.normpath(location)) != ".git"
+            and os.path.isfile(os.path.join(location, "HEAD"))
+            and os.path.isdir(os.path.join(location, "objects"))
+            and os.path.isdir(os.path.join(location, "refs"))
+        )
+
+    @classmethod
+    def project_name(cls, name: str) -> str:
+        return name[:-len(cls.SUFFIX)] if name.endswith(cls.SUFFIX) else name
+
+    def list_tree(self) -> dict:
+        """
+        List the regular files of the tree of `ref`.
+
+        Returns:
+            dict[str, tuple[str, int]]: (object name, size) of every file, by relative path.
+        """
+        command = [
+            "git", "--git-dir", self.location,
+            "ls-tree", "-r", "-l", "-z", "--full-tree", self.ref
+        ]
+        try:
+            result = subprocess.run(command, capture_output=True, check=False)
+        except OSError as e:
+            logger.error("Cannot run git on %s: %s", self.location, e)
+            return {}
+        if result.returncode != 0:
+            logger.error(
+                "Cannot list %s of %s: %s",
+                self.ref, self.location, result.stderr.decode("utf-8", "replace").strip()
+            )
+            return {}
+
+        blobs = {}
+        for record in result.stdout.split(b"\0"):
+            if not record:
+                continue
+            meta, _, path = record.partition(b"\t")
+            mode, object_type, object_name, size = meta.split()
+            if object_type == b"blob" and mode in self.BLOB_MODES:
+                blobs[os.fsdecode(path)] = (object_name.decode("ascii"), int(size))
+        return blobs
+
+    def cat_file(self, object_name: str) -> bytes:
+        """
+        Return the content of an object, through the `git cat-file --batch` process.
+
+        Raises:
+            OSError: If git cannot be run or the object is missing.
+        """
+        if self._process is None:
+            self._process = subprocess.Popen(
+                ["git", "--git-dir", self.location, "cat-file", "--batch"],
+                stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL
+            )
+        process = self._process
+        process.stdin.write(object_name.encode("ascii") + b"\n")
+        process.stdin.flush()
+        header = process.stdout.readline().split()
+        if len(header) != 3:
+            raise OSError(f"object {object_name} not found in {self.location}")
+        data = process.stdout.read(int(header[2]))
+        process.stdout.read(1)  # newline terminating the object
+        return data
+
+    def read_file(self, relative_path: str) -> bytes:
+        """Return the content of a file of the tree."""
+        return self.cat_file(self._blobs[relative_path][0])
+
+    def files(self, scanner):
+        self._blobs = self.list_tree()
+        for relative_path in scanner.scan_listing(self._blobs, self.read_file):
+            yield os.path.join(self.root, *relative_path.split("/")), relative_path
+
+    def read(self, path, relative_path, source_reader, skipped=None):
+        _, size = self._blobs[relative_path]
+        return source_reader.read_content(
+            path, size, lambda: self.read_file(relative_path), skipped
+        )
+
+    def close(self):
+        """Stop the `git cat-file` process."""
+        if self._process is None:
+            return
+        process, self._process = self._process, None
+        try:
+            process.stdin.close()
+        except OSError:
+            pass
+        try:
+            process.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            process.kill()
+            process.wait()
+        process.stdout.close()
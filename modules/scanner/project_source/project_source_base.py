@@ -0,0 +1,117 @@
+"""Abstract base class for the places the files of a project are read from.
+
+A ProjectSource lists the files of one project through a ProjectScanner and turns the
+accepted ones into SourceFile instances through a SourceReader, so the analyzers work the
+same way on a checkout (DirectorySource) and on sources that are not directory trees, such
+as bare git repositories. Sources register themselves with `ProjectSource.register`;
+`ProjectSource.open` picks the one able to read a location, defaulting to a directory."""
+
+import os
+from abc import ABC, abstractmethod
+from typing import Optional
+
+from modules.scanner.project_scanner import ProjectScanner
+from modules.scanner.source_file import SourceFile
+from modules.scanner.source_reader import SourceReader
+
+
+class ProjectSource(ABC):
+    """Files of a single project, wherever they are stored."""
+
+    # Short name of the kind of storage (e.g. in the repository inventory).
+    KIND = None
+    _sources = []
+
+    def __init__(self, location):
+        """
+        Initialize the source.
+
+        Args:
+            location (str): Path of the project (checkout, repository, ...).
+        """
+        self.location = str(location)
+
+    @classmethod
+    def register(cls, source_class):
+        """Decorator registering a ProjectSource subclass tried by `open`."""
+        cls._sources.append(source_class)
+        return source_class
+
+    @classmethod
+    def source_class(cls, location):
+        """Return the ProjectSource class able to read a location, or None if there is none."""
+        for source_class in cls._sources:
+            if source_class.accepts(location):
+                return source_class
+        return DirectorySource if os.path.isdir(location) else None
+
+    @classmethod
+    def open(cls, location) -> "ProjectSource":
+        """Return the source of a location (a ProjectSource instance is returned as is)."""
+        if isinstance(location, ProjectSource):
+            return location
+        source_class = cls.source_class(location) or DirectorySource
+        return source_class(location)
+
+    @staticmethod
+    def accepts(location) -> bool:
+        """Whether this kind of source can read the given location."""
+        return False
+
+    @staticmethod
+    def project_name(name: str) -> str:
+        """Name reported in the results for a project stored under the given file name."""
+        return name
+
+    @abstractmethod
+    def files(self, scanner: ProjectScanner):
+        """
+        Yield the files of the project accepted by a scanner.
+
+        Args:
+            scanner (ProjectScanner): Rules selecting the files.
+
+        Yields:
+            tuple[str, str]: (path reported in the results, `/`-separated relative path).
+        """
+
+    @abstractmethod
+    def read(
+            self, path: str, relative_path: str, source_reader: SourceReader, skipped=None
+    ) -> Optional[SourceFile]:
+        """
+        Read a file yielded by `files`.
+
+        Args:
+            path (str): Path of the file, as yielded by `files`.
+            relative_path (str): Relative path of the file, as yielded by `files`.
+            source_reader (SourceReader): Reader (and screen) of the analysis.
+            skipped (list, optional): Receives the records of the files skipped by the screen.
+
+        Returns:
+            SourceFile | None: The content, or None if unreadable or skipped.
+        """
+
+    def close(self):
+        """Release the resources held by the source."""
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def __str__(self):
+        return self.location
+
+
+class DirectorySource(ProjectSource):
+    """Project checked out in a directory."""
+
+    KIND = "directory"
+
+    def files(self, scanner: ProjectScanner):
+        return scanner.scan(self.location)
+
+    def read(self, path, relative_path, source_reader, skipped=None):
+        return source_reader.read(path, skipped)
@@ -0,0 +1,157 @@
+"""Per-file source buffer shared by every analysis stage.
+
+A SourceFile reads the bytes of a file once, detects the encoding once (UTF-8, falling back to
+ISO-8859-1 like the import extractor always did) and lazily exposes the decoded text, its lines,
+the line offsets and the parsed import list. Import extraction, consumer Rule 3 and keyword
+matching all work on the same instance instead of reopening and re-decoding the file, and the
+rules of every role share what they derive from it (see RuleContext).
+
+File types needing a dedicated reader (e.g. Jupyter notebooks) register a SourceFile subclass
+for their extension; `SourceFile.open` and `SourceFile.from_bytes` dispatch on it."""
+
+import hashlib
+import os
+from bisect import bisect_right
+from functools import cached_property
+from itertools import accumulate
+
+from modules.library_manager.library_extractor import LibraryExtractor
+from modules.utils.metrics import Metrics
+
+
+class SourceFile:
+    """Contents of a source file, read and decoded once."""
+
+    FALLBACK_ENCODING = "ISO-8859-1"
+    # Whether keyword matching runs on the raw bytes (see MappedSourceFile).
+    bytes_level = False
+
+    _readers = {}
+
+    def __init__(self, path: str, data: bytes):
+        """
+        Wrap the raw content of a file.
+
+        Args:
+            path (str): Location of the file, as reported in the results.
+            data (bytes): Raw file content.
+        """
+        self.path = path
+        self.data = data
+        # Results derived from the content by the analysis rules (e.g. the dictionary rows of
+        # the imported libraries), shared by every analyzer reading this instance.
+        self.derived = {}
+
+    @classmethod
+    def register_reader(cls, extension: str):
+        """Decorator registering a SourceFile subclass for files with the given extension."""
+        def inner_wrapper(wrapped_class):
+            cls._readers[extension.lower()] = wrapped_class
+            return wrapped_class
+
+        return inner_wrapper
+
+    @classmethod
+    def reader_for(cls, path: str):
+        """Return the SourceFile class able to read the given path."""
+        return cls._readers.get(os.path.splitext(str(path))[1].lower(), SourceFile)
+
+    @classmethod
+    def open(cls, path: str) -> "SourceFile":
+        """Read a file from disk with the reader registered for its extension."""
+        return cls.reader_for(path).read(path)
+
+    @classmethod
+    def from_bytes(cls, path: str, data: bytes) -> "SourceFile":
+        """Wrap in-memory content with the reader registered for the path extension."""
+        return cls.reader_for(path).parse(path, data)
+
+    @classmethod
+    def read(cls, path: str) -> "SourceFile":
+        """Read a file from disk in a single I/O call."""
+        with open(path, "rb") as f:
+            return cls(path, f.read())
+
+    @classmethod
+    def parse(cls, path: str, data: bytes) -> "SourceFile":
+        """Wrap content that has already been loaded (e.g. from an archive or a git blob)."""
+        return cls(path, data)
+
+    @cached_property
+    def content_hash(self) -> str:
+        """SHA-256 of the raw content."""
+        return hashlib.sha256(self.data).hexdigest()
+
+    @classmethod
+    def decode(cls, data: bytes) -> tuple:
+        """Decode raw content with universal newlines, returning (text, encoding)."""
+        try:
+            text = data.decode("utf-8")
+            encoding = "utf-8"
+        except UnicodeDecodeError:
+            text = data.decode(cls.FALLBACK_ENCODING)
+            encoding = cls.FALLBACK_ENCODING
+            Metrics.inc("decode_fallbacks", component="source_file")
+        if "\r" in text:
+            # Same universal-newline translation as open() in text mode.
+            text = text.replace("\r\n", "\n").replace("\r", "\n")
+        return text, encoding
+
+    @cached_property
+    def _decoded(self):
+        """Decode the content once, returning (text, encoding)."""
+        return self.decode(self.data)
+
+    @property
+    def encoding(self) -> str:
+        """Encoding the content was decoded with."""
+        return self._decoded[1]
+
+    @property
+    def is_utf8(self) -> bool:
+        """Whether the content is valid UTF-8 (stages reading strict UTF-8 skip it otherwise)."""
+        return self.encoding == "utf-8"
+
+    @property
+    def searchable(self) -> bool:
+        """Whether the keyword stages can search the content (strict UTF-8 text)."""
+        return self.is_utf8
+
+    @property
+    def text(self) -> str:
+        """Decoded content with universal newlines."""
+        return self._decoded[0]
+
+    @cached_property
+    def lines(self) -> list:
+        """Lines of the text, with line endings, as returned by ``readlines()``."""
+        parts = self.text.split("\n")
+        lines = [part + "\n" for part in parts[:-1]]
+        if parts[-1]:
+            lines.append(parts[-1])
+        return lines
+
+    @cached_property
+    def line_offsets(self) -> list:
+        """Offset in ``text`` at which every line starts."""
+        return [0, *accumulate(len(line) for line in self.lines)][:len(self.lines) or 1]
+
+    def line_number_at(self, offset: int) -> int:
+        """Return the 1-based line number containing a text offset."""
+        return bisect_right(self.line_offsets, offset)
+
+    @cached_property
+    def imports(self) -> list:
+        """Libraries referenced by the import statements of the file."""
+        return LibraryExtractor.get_libraries_from_lines(self.lines)
+
+    def contains(self, keyword: str) -> bool:
+        """Whether the text contains `keyword` verbatim."""
+        return keyword in self.text
+
+    def close(self):
+        """Release the resources held by the content (nothing to do for in-memory content)."""
+
+    def locate(self, line_number: int) -> tuple:
+        """Return the (where, line_number) reported for a line of ``text``."""
+        return self.path, line_number
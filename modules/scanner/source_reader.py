@@ -0,0 +1,127 @@
+"""Reading of scanned files into SourceFile instances.
+
+SourceReader picks the SourceFile class for every path (the reader registered for its
+extension, or a MappedSourceFile in bytes-level mode) and, when a ContentScreen is configured,
+skips binary, generated, minified or oversized source files before they reach the analysis.
+Every skip is returned to the caller so that it can be reported. Content that is not a file
+on disk (git blobs, archive members) goes through the same screen with `read_content`.
+Bytes read and skipped files are counted in the pipeline Metrics."""
+
+import os
+from typing import Optional
+
+from modules.scanner.content_screen import ContentScreen
+from modules.scanner.mapped_source_file import MappedSourceFile
+from modules.scanner.source_file import SourceFile
+from modules.utils.logger import get_logger
+from modules.utils.metrics import Metrics
+
+logger = get_logger(__name__)
+
+
+class SourceReader:
+    """Turns file paths into SourceFile instances according to the scanning mode."""
+
+    def __init__(self, memory_map: bool = False, screen: Optional[ContentScreen] = None):
+        """
+        Initialize the reader.
+
+        Args:
+            memory_map (bool): Map plain source files and match them at the bytes level.
+            screen (ContentScreen, optional): Heuristics used to skip non hand-written files.
+        """
+        self.memory_map = memory_map
+        self.screen = screen
+
+    def read(self, path: str, skipped: Optional[list] = None) -> Optional[SourceFile]:
+        """
+        Read a file, returning None if it is unreadable or skipped by the screen.
+
+        Args:
+            path (str): Path of the file.
+            skipped (list, optional): Receives a ``{"path", "reason", "size"}`` record for
+                every file skipped by the screen.
+
+        Returns:
+            SourceFile | None: The file content.
+        """
+        if not os.path.isfile(path):
+            return None
+
+        reader = SourceFile.reader_for(path)
+        try:
+            if reader is not SourceFile:
+                # Dedicated readers (e.g. notebooks) extract the code themselves.
+                return self._counted(reader.read(path))
+
+            if self.screen is not None:
+                size = os.path.getsize(path)
+                if self.screen.oversized(size):
+                    self._skip(skipped, path, ContentScreen.TOO_LARGE, size)
+                    return None
+
+            source = (MappedSourceFile if self.memory_map else SourceFile).read(path)
+        except (OSError, ValueError) as e:
+            logger.error("Error reading file %s: %s", path, e)
+            Metrics.inc("files_skipped", reason="unreadable")
+            return None
+
+        return self._screened(source, skipped)
+
+    def read_content(
+            self, path: str, size: int, load, skipped: Optional[list] = None
+    ) -> Optional[SourceFile]:
+        """
+        Wrap content that is not a file on disk, returning None if it is unreadable or skipped.
+
+        Args:
+            path (str): Location of the content, as reported in the results.
+            size (int): Size of the content in bytes, checked before loading it.
+            load (Callable[[], bytes]): Returns the content (raising OSError on failure).
+            skipped (list, optional): Receives a ``{"path", "reason", "size"}`` record for
+                every content skipped by the screen.
+
+        Returns:
+            SourceFile | None: The content.
+        """
+        reader = SourceFile.reader_for(path)
+        try:
+            if reader is not SourceFile:
+                return self._counted(reader.parse(path, load()))
+
+            if self.screen is not None and self.screen.oversized(size):
+                self._skip(skipped, path, ContentScreen.TOO_LARGE, size)
+                return None
+
+            source = (MappedSourceFile if self.memory_map else SourceFile).parse(path, load())
+        except (OSError, ValueError) as e:
+            logger.error("Error reading file %s: %s", path, e)
+            Metrics.inc("files_skipped", reason="unreadable")
+            return None
+
+        return self._screened(source, skipped)
+
+    def _screened(self, source: SourceFile, skipped) -> Optional[SourceFile]:
+        """Return the source, or None if the screen classifies it as not hand-written."""
+        self._counted(source)
+        if self.screen is not None:
+            reason = self.screen.classify(source.data)
+            if reason is not None:
+                self._skip(skipped, source.path, reason, len(source.data))
+                source.close()
+                return None
+        return source
+
+    @staticmethod
+    def _counted(source: SourceFile) -> SourceFile:
+        """Count the bytes of a read file (the code cells, for a notebook)."""
+        if Metrics.enabled:
+            Metrics.inc("bytes_read", len(source.data))
+        return source
+
+    @staticmethod
+    def _skip(skipped, path, reason, size):
+        logger.info("Skipping %s file %s (%d bytes)", reason, path, size)
+        Metrics.inc("files_skipped", reason=reason)
+        if skipped is not None:
+            skipped.append({"path": path, "reason": reason, "size": size})
@@ -1,18 +1,208 @@
-"""Logging utility for the MARK project."""
+"""Logging utility for the MARK project.
 
+Every logger returned by `get_logger` shares a single QueueHandler: logging calls only enqueue
+the record, and a background QueueListener writes it to the console and to the one log file
+of the run (``logs/mark_2_<timestamp>.log``, or ``.jsonl`` with structured JSON-lines output).
+Worker processes forward their records to the parent through a multiprocessing queue (see
+`worker_log_relay` and `attach_worker`), so they end up in the same run log.
+
+Messages emitted for every file (e.g. the keyword matches) go through a LogSampler, which lets
+only a sample of them through and reports how many were suppressed."""
+
+import atexit
+import json
 import logging
+import multiprocessing
 import os
+import queue
 import sys
+import threading
+import time
+from contextlib import contextmanager
 from datetime import datetime
+from logging.handlers import QueueHandler, QueueListener
+
+LOG_FORMAT = "[%(asctime)s] [%(levelname)s] %(message)s"
+DATE_FORMAT = "%H:%M:%S"
+
+_lock = threading.RLock()
+_settings = {"log_dir": "logs", "structured": False, "level": logging.INFO, "console": True}
+_queue = queue.SimpleQueue()
+_queue_handler = QueueHandler(_queue)
+_listener = None
+_handlers = []
+_samplers = {}
+# Spawned workers import this module themselves; forked ones inherit the parent's queue content.
+_imported_in_worker = multiprocessing.parent_process() is not None
+
+
+class JsonLinesFormatter(logging.Formatter):
+    """Formats every record as one JSON object per line."""
+
+    def format(self, record):
+        entry = {
+            "time": datetime.fromtimestamp(record.created).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "process": record.process,
+            "message": record.getMessage(),
+        }
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            entry["exception"] = record.exc_text
+        return json.dumps(entry, ensure_ascii=False)
+
+
+class LogSampler:
+    """Lets through one message in `every`, and at most `per_second` messages per second."""
+
+    def __init__(self, every: int = 1, per_second=None):
+        """
+        Initialize the sampler.
+
+        Args:
+            every (int): Keep one message out of `every` (1 keeps them all).
+            per_second (float, optional): Maximum number of messages kept per second.
+        """
+        self.configure(every, per_second)
+
+    def configure(self, every: int = 1, per_second=None):
+        """Change the sampling policy and reset the counters."""
+        self.every = max(1, int(every))
+        self.per_second = per_second
+        self.seen = 0
+        self.suppressed = 0
+        self._window = 0
+        self._window_count = 0
+
+    def allow(self) -> bool:
+        """Tell whether the next message is kept (counting it as suppressed otherwise)."""
+        self.seen += 1
+        if (self.seen - 1) % self.every:
+            self.suppressed += 1
+            return False
+        if self.per_second is not None:
+            window = int(time.monotonic())
+            if window != self._window:
+                self._window, self._window_count = window, 0
+            if self._window_count >= self.per_second:
+                self.suppressed += 1
+                return False
+            self._window_count += 1
+        return True
+
+    def log(self, logger: logging.Logger, level: int, msg: str, *args):
+        """Log a message if the sampler keeps it, mentioning the messages suppressed before it."""
+        if not logger.isEnabledFor(level) or not self.allow():
+            return
+        if self.suppressed:
+            msg += " (%d similar messages suppressed)"
+            args = (*args, self.suppressed)
+            self.suppressed = 0
+        logger.log(level, msg, *args)
+
+
+def get_sampler(name: str) -> LogSampler:
+    """Return the process-wide LogSampler of a kind of message (created keeping everything)."""
+    with _lock:
+        sampler = _samplers.get(name)
+        if sampler is None:
+            sampler = _samplers[name] = LogSampler()
+        return sampler
+
+
+def _in_worker() -> bool:
+    return multiprocessing.parent_process() is not None
+
+
+def _set_level(level):
+    """Apply the level to every logger writing to the run log."""
+    _queue_handler.setLevel(level)
+    for logger in list(logging.root.manager.loggerDict.values()):
+        if isinstance(logger, logging.Logger) and _queue_handler in logger.handlers:
+            logger.setLevel(level)
+
+
+def _build_handlers() -> list:
+    formatter = logging.Formatter(LOG_FORMAT, DATE_FORMAT)
+    handlers = []
+    if _settings["console"]:
+        console_handler = logging.StreamHandler()
+        console_handler.setFormatter(formatter)
+        handlers.append(console_handler)
+
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    extension = "jsonl" if _settings["structured"] else "log"
+    log_file = os.path.join(_settings["log_dir"], f"mark_2_{timestamp}.{extension}")
+    # The file is only created when the first record is written.
+    os.makedirs(_settings["log_dir"], exist_ok=True)
+    file_handler = logging.FileHandler(log_file, encoding="utf-8", delay=True)
+    file_handler.setFormatter(JsonLinesFormatter() if _settings["structured"] else formatter)
+    handlers.append(file_handler)
+    return handlers
 
 
-def get_logger(name: str = "MARK", log_dir: str = "logs") -> logging.Logger:
+def _start_listener():
+    global _listener, _handlers  # pylint: disable=global-statement
+    _handlers = _build_handlers()
+    _listener = QueueListener(_queue, *_handlers, respect_handler_level=True)
+    _listener.start()
+
+
+def _stop_listener():
+    """Write the queued records and close the run log."""
+    global _listener  # pylint: disable=global-statement
+    with _lock:
+        if _listener is not None:
+            _listener.stop()
+            _listener = None
+        for handler in _handlers:
+            handler.close()
+
+
+atexit.register(_stop_listener)
+
+
+def configure_logging(
+        log_dir=None,
+        structured=None,
+        level=None,
+        console=None,
+        samplers=None
+):
+    """
+    Configure the run log (unset arguments keep their current value).
+
+    Args:
+        log_dir (str, optional): Directory of the run log.
+        structured (bool, optional): Write the run log as JSON lines instead of text.
+        level (int, optional): Minimum level of the records of the MARK loggers.
+        console (bool, optional): Also print the records on the console.
+        samplers (dict[str, dict], optional): ``every``/``per_second`` settings of LogSamplers,
+            by name (e.g. ``{"matches": {"every": 100}}``).
+    """
+    with _lock:
+        for key, value in (
+                ("log_dir", log_dir), ("structured", structured), ("level", level), ("console", console)
+        ):
+            if value is not None:
+                _settings[key] = value
+        _set_level(_settings["level"])
+        for name, policy in (samplers or {}).items():
+            get_sampler(name).configure(**policy)
+        if not _in_worker():
+            _stop_listener()
+            _start_listener()
+
+
+def get_logger(name: str = "MARK", log_dir: str = None) -> logging.Logger:
     """
-    Create and return a configured logger instance.
+    Return a logger writing to the shared run log.
 
     Args:
         name (str): Name of the logger.
-        log_dir (str): Directory where log files are saved.
+        log_dir (str, optional): Directory of the run log, if it is not started yet.
 
     Returns:
         logging.Logger: Configured logger instance.
@@ -20,29 +210,66 @@ def get_logger(name: str = "MARK", log_dir: str = "logs") -> logging.Logger:
     is_debug = hasattr(sys, "gettrace") and sys.gettrace() is not None
     logging.raiseExceptions = is_debug
 
-    os.makedirs(log_dir, exist_ok=True)
-    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-    log_file = os.path.join(log_dir, f"mark_2_{timestamp}.log")
-
     logger = logging.getLogger(name)
+    with _lock:
+        if _listener is None and not _in_worker():
+            if log_dir is not None:
+                _settings["log_dir"] = log_dir
+            _start_listener()
+        if _queue_handler not in logger.handlers:
+            logger.setLevel(_settings["level"])
+            logger.addHandler(_queue_handler)
 
-    if logger.hasHandlers():
-        return logger  # Prevent duplicate handlers if already configured
+    return logger
 
-    logger.setLevel(logging.INFO)
 
-    formatter = logging.Formatter(
-        "[%(asctime)s] [%(levelname)s] %(message)s", "%H:%M:%S"
-    )
+@contextmanager
+def worker_log_relay(context=None):
+    """
+    Relay the records of worker processes to the run log for the duration of the block.
 
-    # Console handler
-    console_handler = logging.StreamHandler()
-    console_handler.setFormatter(formatter)
-    logger.addHandler(console_handler)
+    Args:
+        context (multiprocessing.context.BaseContext, optional): Start method context of the
+            workers (e.g. ``multiprocessing.get_context("spawn")``), if not the default one.
 
-    # File handler
-    file_handler = logging.FileHandler(log_file, encoding="utf-8")
-    file_handler.setFormatter(formatter)
-    logger.addHandler(file_handler)
+    Yields:
+        dict: The argument to pass to `attach_worker` in every worker process.
+    """
+    relay_queue = (context or multiprocessing).Queue()
+    listener = QueueListener(relay_queue, *_handlers, respect_handler_level=True)
+    listener.start()
+    try:
+        yield {
+            "queue": relay_queue,
+            "level": _settings["level"],
+            "samplers": {
+                name: {"every": sampler.every, "per_second": sampler.per_second}
+                for name, sampler in _samplers.items()
+            },
+        }
+    finally:
+        listener.stop()
+        relay_queue.close()
+        relay_queue.join_thread()
 
-    return logger
+
+def attach_worker(relay):
+    """
+    Send the records of this worker process to the parent (see `worker_log_relay`).
+
+    Records logged before (e.g. while a spawned worker imported the modules) are forwarded too.
+    """
+    with _lock:
+        pending = _queue_handler.queue
+        _queue_handler.queue = relay["queue"]
+        _settings["level"] = relay["level"]
+        _set_level(relay["level"])
+        for name, policy in relay["samplers"].items():
+            get_sampler(name).configure(**policy)
+    if not _imported_in_worker or pending is relay["queue"]:
+        return
+    while True:
+        try:
+            relay["queue"].put_nowait(pending.get_nowait())
+        except queue.Empty:
+            break
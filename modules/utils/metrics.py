@@ -0,0 +1,298 @@
+"""Process-wide pipeline metrics: counters, latency histograms and per-repository timings.
+
+Metrics collects what `log_and_time` cannot tell apart: files scanned and skipped, bytes
+read, decoding fallbacks, candidate files, keyword evaluations, matches per library, and the
+latency of every stage (reading, library filtering, keyword matching, writing, cloning,
+merging) and of every repository. It is disabled by default: every recording call then
+returns after a single attribute check, and hot loops check `Metrics.enabled` before
+computing what they would record.
+
+Worker processes collect their own metrics, which the ProjectExecutor drains after every task
+and merges into the parent, the same way as the analyzer statistics. At the end of a run the
+metrics are exported as JSON and as a Prometheus textfile (for the node_exporter textfile
+collector)."""
+
+import json
+import os
+import threading
+import time
+from bisect import bisect_left
+from collections import Counter
+from contextlib import nullcontext
+from datetime import datetime, timezone
+
+from modules.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+_NULL_TIMER = nullcontext()
+
+
+class Histogram:
+    """Latency histogram with fixed bucket upper bounds, in seconds."""
+
+    BUCKETS = (
+        0.0001, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5,
+        1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 300.0, float("inf")
+    )
+
+    __slots__ = ("counts", "total", "count")
+
+    def __init__(self, counts=None, total: float = 0.0, count: int = 0):
+        self.counts = list(counts) if counts is not None else [0] * len(self.BUCKETS)
+        self.total = total
+        self.count = count
+
+    def observe(self, value: float):
+        """Record one observation."""
+        self.counts[bisect_left(self.BUCKETS, value)] += 1
+        self.total += value
+        self.count += 1
+
+    def merge(self, counts, total, count):
+        """Add the observations of another histogram."""
+        self.counts = [a + b for a, b in zip(self.counts, counts)]
+        self.total += total
+        self.count += count
+
+    def cumulative(self) -> list:
+        """Return the (upper bound, cumulative count) of every bucket, as Prometheus expects."""
+        result, running = [], 0
+        for bound, bucket_count in zip(self.BUCKETS, self.counts):
+            running += bucket_count
+            result.append((bound, running))
+        return result
+
+
+class _Timer:
+    """Context manager observing its duration in a histogram."""
+
+    __slots__ = ("name", "labels", "start")
+
+    def __init__(self, name, labels):
+        self.name = name
+        self.labels = labels
+        self.start = None
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        Metrics.observe(self.name, time.perf_counter() - self.start, **self.labels)
+
+
+class Metrics:
+    """Registry of the metrics of the current process (disabled by default)."""
+
+    PREFIX = "mark_"
+    JSON_FILE = "metrics.json"
+    PROMETHEUS_FILE = "metrics.prom"
+
+    enabled = False
+    _lock = threading.Lock()
+    _counters = Counter()
+    _histograms = {}
+    _repos = {}
+    _started = None
+
+    @classmethod
+    def enable(cls, enabled: bool = True):
+        """Turn the collection on (or off)."""
+        cls.enabled = enabled
+        if enabled and cls._started is None:
+            cls._started = datetime.now(timezone.utc).isoformat(timespec="seconds")
+
+    @staticmethod
+    def _key(name, labels) -> tuple:
+        return name, tuple(sorted(labels.items()))
+
+    # ---------------------------------------------------------------------
+    # Recording
+    # ---------------------------------------------------------------------
+
+    @classmethod
+    def inc(cls, name: str, value=1, **labels):
+        """Add `value` to a counter (e.g. ``Metrics.inc("files_skipped", reason="binary")``)."""
+        if not cls.enabled:
+            return
+        key = cls._key(name, labels)
+        with cls._lock:
+            cls._counters[key] += value
+
+    @classmethod
+    def observe(cls, name: str, seconds: float, **labels):
+        """Record a latency in a histogram."""
+        if not cls.enabled:
+            return
+        key = cls._key(name, labels)
+        with cls._lock:
+            histogram = cls._histograms.get(key)
+            if histogram is None:
+                histogram = cls._histograms[key] = Histogram()
+            histogram.observe(seconds)
+
+    @classmethod
+    def timer(cls, name: str, **labels):
+        """Context manager recording the duration of its block in a histogram."""
+        if not cls.enabled:
+            return _NULL_TIMER
+        return _Timer(name, labels)
+
+    @classmethod
+    def record_repo(cls, project_name: str, role: str, seconds: float, **values):
+        """Record the latency (and other figures, e.g. files and matches) of a repository."""
+        if not cls.enabled:
+            return
+        cls.observe("repo_seconds", seconds, role=role)
+        with cls._lock:
+            cls._repos.setdefault(project_name, {})[role] = {"seconds": seconds, **values}
+
+    # ---------------------------------------------------------------------
+    # Worker hand-off
+    # ---------------------------------------------------------------------
+
+    @classmethod
+    def snapshot(cls) -> dict:
+        """Return a picklable copy of the collected metrics."""
+        with cls._lock:
+            return {
+                "counters": [(name, labels, value) for (name, labels), value in cls._counters.items()],
+                "histograms": [
+                    (name, labels, list(histogram.counts), histogram.total, histogram.count)
+                    for (name, labels), histogram in cls._histograms.items()
+                ],
+                "repos": {project: dict(roles) for project, roles in cls._repos.items()},
+            }
+
+    @classmethod
+    def reset(cls):
+        """Drop the collected metrics."""
+        with cls._lock:
+            cls._counters = Counter()
+            cls._histograms = {}
+            cls._repos = {}
+
+    @classmethod
+    def drain(cls):
+        """Return and reset the collected metrics (None when disabled)."""
+        if not cls.enabled:
+            return None
+        snapshot = cls.snapshot()
+        cls.reset()
+        return snapshot
+
+    @classmethod
+    def merge(cls, snapshot):
+        """Add the metrics drained from a worker."""
+        if not snapshot:
+            return
+        with cls._lock:
+            for name, labels, value in snapshot["counters"]:
+                cls._counters[(name, labels)] += value
+            for name, labels, counts, total, count in snapshot["histograms"]:
+                histogram = cls._histograms.get((name, labels))
+                if histogram is None:
+                    cls._histograms[(name, labels)] = Histogram(counts, total, count)
+                else:
+                    histogram.merge(counts, total, count)
+            for project, roles in snapshot["repos"].items():
+                cls._repos.setdefault(project, {}).update(roles)
+
+    # ---------------------------------------------------------------------
+    # Export
+    # ---------------------------------------------------------------------
+
+    @classmethod
+    def metric_name(cls, name: str, kind: str) -> str:
+        """Exported name of a metric (``mark_`` prefix, ``_total`` suffix for counters)."""
+        if kind == "counter" and not name.endswith("_total"):
+            name += "_total"
+        return cls.PREFIX + name
+
+    @classmethod
+    def to_dict(cls) -> dict:
+        """Return the collected metrics as a JSON-serializable dictionary."""
+        snapshot = cls.snapshot()
+        counters, histograms = {}, {}
+        for name, labels, value in sorted(snapshot["counters"]):
+            counters.setdefault(cls.metric_name(name, "counter"), []).append(
+                {"labels": dict(labels), "value": value}
+            )
+        for name, labels, counts, total, count in sorted(snapshot["histograms"]):
+            cumulative = Histogram(counts, total, count).cumulative()
+            histograms.setdefault(cls.metric_name(name, "histogram"), []).append({
+                "labels": dict(labels),
+                "buckets": {_format_bound(bound): value for bound, value in cumulative},
+                "sum": total,
+                "count": count,
+            })
+        return {
+            "started": cls._started,
+            "exported": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "counters": counters,
+            "histograms": histograms,
+            "repos": snapshot["repos"],
+        }
+
+    @classmethod
+    def to_prometheus(cls) -> str:
+        """Return the collected counters and histograms in the Prometheus text format."""
+        snapshot = cls.snapshot()
+        lines = []
+        last_name = None
+        for name, labels, value in sorted(snapshot["counters"]):
+            metric = cls.metric_name(name, "counter")
+            if metric != last_name:
+                lines.append(f"# TYPE {metric} counter")
+                last_name = metric
+            lines.append(f"{metric}{_format_labels(labels)} {value}")
+        for name, labels, counts, total, count in sorted(snapshot["histograms"]):
+            metric = cls.metric_name(name, "histogram")
+            if metric != last_name:
+                lines.append(f"# TYPE {metric} histogram")
+                last_name = metric
+            for bound, value in Histogram(counts, total, count).cumulative():
+                bucket_labels = labels + (("le", _format_bound(bound)),)
+                lines.append(f"{metric}_bucket{_format_labels(bucket_labels)} {value}")
+            lines.append(f"{metric}_sum{_format_labels(labels)} {total}")
+            lines.append(f"{metric}_count{_format_labels(labels)} {count}")
+        return "\n".join(lines) + "\n"
+
+    @classmethod
+    def export(cls, output_dir):
+        """
+        Write the collected metrics to ``metrics.json`` and ``metrics.prom`` in a folder.
+
+        Both files are replaced atomically, so a textfile collector never reads a partial file.
+
+        Returns:
+            tuple[str, str]: The paths of the JSON file and of the Prometheus textfile.
+        """
+        os.makedirs(output_dir, exist_ok=True)
+        json_path = os.path.join(output_dir, cls.JSON_FILE)
+        prometheus_path = os.path.join(output_dir, cls.PROMETHEUS_FILE)
+        for path, content in (
+                (json_path, json.dumps(cls.to_dict(), indent=2)),
+                (prometheus_path, cls.to_prometheus()),
+        ):
+            temporary_path = path + ".tmp"
+            with open(temporary_path, "w", encoding="utf-8") as f:
+                f.write(content)
+            os.replace(temporary_path, path)
+        logger.info("Metrics exported to %s and %s", json_path, prometheus_path)
+        return json_path, prometheus_path
+
+
+def _format_bound(bound: float) -> str:
+    return "+Inf" if bound == float("inf") else repr(bound)
+
+
+def _format_labels(labels) -> str:
+    if not labels:
+        return ""
+    escaped = (
+        (name, str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"'))
+        for name, value in labels
+    )
+    return "{" + ",".join(f'{name}="{value}"' for name, value in escaped) + "}"
@@ -0,0 +1,66 @@
+"""Run MARK as a long-lived classification server (see SERVER in the README)."""
+import argparse
+import signal
+from pathlib import Path
+
+from modules.analyzer.analysis_server import serve
+from modules.analyzer.analysis_service import AnalysisService
+from modules.analyzer.execution import ExecutionMode
+from modules.analyzer.ml_roles import AnalyzerRole
+from modules.utils.logger import configure_logging
+from modules.utils.metrics import Metrics
+from modules.analyzer.analyzer_factory import AnalyzerFactory #required import
+from modules.analyzer.builder.consumer_analyzer_builder import ConsumerAnalyzerBuilder #required import
+from modules.analyzer.builder.producer_analyzer_builder import ProducerAnalyzerBuilder #required import
+
+IO_PATH = Path("./io")
+HOST = "127.0.0.1"
+PORT = 8765
+SOCKET_PATH = None  # e.g. "/tmp/mark.sock": listen on a Unix socket instead of HOST:PORT
+EXECUTION_MODE = ExecutionMode.PROCESS
+MAX_WORKERS = None  # defaults to the number of CPUs
+MAX_PENDING = None  # jobs accepted at a time (default: twice the workers); further jobs get a 503
+RESULT_CACHE_PATH = IO_PATH / "cache" / "file_results.sqlite"
+INCLUDE_NOTEBOOKS = False
+BYTES_SCANNING = False
+ROLE_KWARGS = {AnalyzerRole.CONSUMER: {"rules_3": True}}  # defaults, overridable by the job options
+METRICS = False  # served on GET /metrics
+STRUCTURED_LOG = False
+
+
+def _stop(signum, frame):  # pylint: disable=unused-argument
+    """Stop serving on SIGTERM the same way as on Ctrl+C, letting the running jobs finish."""
+    raise KeyboardInterrupt
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description="MARK classification server")
+    parser.add_argument("--host", default=HOST)
+    parser.add_argument("--port", type=int, default=PORT)
+    parser.add_argument("--socket", default=SOCKET_PATH, help="Unix socket path (instead of host/port)")
+    parser.add_argument(
+        "--execution", default=EXECUTION_MODE.value, choices=[mode.value for mode in ExecutionMode]
+    )
+    parser.add_argument("--workers", type=int, default=MAX_WORKERS)
+    parser.add_argument("--max-pending", type=int, default=MAX_PENDING)
+    args = parser.parse_args(argv)
+
+    configure_logging(structured=STRUCTURED_LOG)
+    Metrics.enable(METRICS)
+    service = AnalysisService(
+        io_path=IO_PATH,
+        roles=[AnalyzerRole.PRODUCER, AnalyzerRole.CONSUMER],
+        execution_mode=ExecutionMode(args.execution),
+        max_workers=args.workers,
+        max_pending=args.max_pending,
+        role_kwargs=ROLE_KWARGS,
+        result_cache_path=RESULT_CACHE_PATH,
+        include_notebooks=INCLUDE_NOTEBOOKS,
+        bytes_scanning=BYTES_SCANNING
+    )
+    signal.signal(signal.SIGTERM, _stop)
+    serve(service, args.host, args.port, args.socket)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+"""Tests of the HTTP transport of the analysis service."""
+
+import http.client
+import json
+import threading
+
+import pytest
+
+from modules.analyzer.analysis_server import AnalysisHTTPServer
+
+
+class _FailingReloadService:
+    """Service whose analyzers cannot be rebuilt (e.g. a broken dictionary)."""
+
+    def status(self):
+        return {"jobs": 0}
+
+    def reload(self):
+        raise ValueError("broken dictionary")
+
+    def submit_job(self, job):
+        return {"job": job}
+
+
+@pytest.fixture(name="connection")
+def fixture_connection():
+    server = AnalysisHTTPServer(("127.0.0.1", 0), _FailingReloadService())
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    connection = http.client.HTTPConnection("127.0.0.1", server.server_address[1], timeout=5)
+    yield connection
+    connection.close()
+    server.shutdown()
+    server.server_close()
+
+
+def _request(connection, method, path, body=None):
+    connection.request(method, path, body=body, headers={"Content-Type": "application/json"})
+    response = connection.getresponse()
+    return response.status, json.loads(response.read())
+
+
+def test_unknown_endpoint_body_is_not_read_as_the_next_request(connection):
+    status, _ = _request(connection, "POST", "/unknown", b'GET /health HTTP/1.1\r\n\r\n')
+    assert status == 404
+
+    # Same keep-alive connection.
+    assert _request(connection, "POST", "/classify", b'{"path": "x"}') == (200, {"job": {"path": "x"}})
+
+
+def test_failed_reload_answers_a_json_error(connection):
+    status, payload = _request(connection, "POST", "/reload")
+
+    assert status == 500
+    assert "broken dictionary" in payload["error"]
+    assert _request(connection, "GET", "/health") == (200, {"jobs": 0})
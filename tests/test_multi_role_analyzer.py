@@ -0,0 +1,69 @@
+"""Tests of the fused analysis of several roles in a single walk."""
+
+import os
+import tarfile
+
+import pytest
+
+from modules.analyzer.builder.consumer_analyzer_builder import ConsumerAnalyzerBuilder
+from modules.analyzer.builder.producer_analyzer_builder import ProducerAnalyzerBuilder
+from modules.analyzer.ml_roles import AnalyzerRole
+from modules.analyzer.multi_role_analyzer import MultiRoleAnalyzer
+
+ML_SOURCE = "import torch\nimport mxnet\nmodel.train(data)\nmodel.predict_mode(data)\n"
+PROJECT_FILES = {
+    ".gitignore": "generated/\nignored.py\n",
+    "main.py": ML_SOURCE,
+    "ignored.py": ML_SOURCE,
+    "generated/train.py": ML_SOURCE,
+    "src/.gitignore": "local.py\n",
+    "src/local.py": ML_SOURCE,
+}
+
+
+@pytest.fixture(name="project")
+def fixture_project(tmp_path, request):
+    checkout = tmp_path / "repos" / "owner" / "repo"
+    for relative_path, content in PROJECT_FILES.items():
+        path = checkout / relative_path
+        os.makedirs(path.parent, exist_ok=True)
+        path.write_text(content, encoding="utf-8")
+    if request.param == "archive":
+        archive_path = tmp_path / "repos" / "owner" / "repo.tar.gz"
+        with tarfile.open(archive_path, "w:gz") as archive:
+            archive.add(checkout, arcname="repo")
+        return str(archive_path)
+    return str(checkout)
+
+
+def _where(rows):
+    return sorted({row["where"].rsplit("repo", 1)[-1] for row in rows})
+
+
+@pytest.mark.parametrize("project", ["directory", "archive"], indirect=True)
+@pytest.mark.parametrize("producer_gitignore", [True, False])
+def test_fused_walk_honours_the_gitignore_setting_of_every_role(tmp_path, project, producer_gitignore):
+    analyzers = {
+        AnalyzerRole.PRODUCER: ProducerAnalyzerBuilder().with_directory_rules(
+            use_gitignore=producer_gitignore
+        ).build(),
+        AnalyzerRole.CONSUMER: ConsumerAnalyzerBuilder().with_directory_rules(
+            use_gitignore=not producer_gitignore
+        ).build(),
+    }
+    output_folders = {role: str(tmp_path / "output" / role.value) for role in analyzers}
+    for output_folder in output_folders.values():
+        os.makedirs(output_folder)
+
+    fused = MultiRoleAnalyzer(analyzers).analyze_project(project, "owner", "repo", output_folders, {})
+    alone = {
+        role: analyzer.analyze_project(project, "owner", "repo", output_folders[role])
+        for role, analyzer in analyzers.items()
+    }
+
+    for role, analyzer in analyzers.items():
+        expected = ["/main.py"] if analyzer.scanner.use_gitignore else [
+            "/generated/train.py", "/ignored.py", "/main.py", "/src/local.py"
+        ]
+        assert _where(alone[role]) == expected
+        assert fused[role] == alone[role]
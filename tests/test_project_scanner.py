@@ -0,0 +1,62 @@
+"""Tests of the project scanners."""
+
+import os
+import shutil
+import subprocess
+
+import pytest
+
+from modules.analyzer.analyzer_factory import AnalyzerFactory
+from modules.analyzer.builder.consumer_analyzer_builder import ConsumerAnalyzerBuilder  # pylint: disable=unused-import
+from modules.analyzer.builder.producer_analyzer_builder import ProducerAnalyzerBuilder  # pylint: disable=unused-import
+from modules.analyzer.ml_roles import AnalyzerRole
+from modules.cloner.cloner import CloneMode, RepoCloner
+
+PROJECT_FILES = {
+    "train.py": "import torch\nmodel.fit(x)\n",
+    "README.md": "# project\n",
+    ".gitignore": "generated/\n",
+    "generated/model.py": "import torch\n",
+    "src/infer.py": "import torch\nmodel.predict(x)\n",
+    "tests/test_train.py": "import torch\n",
+    "notebooks/explore.ipynb": "{}\n",
+    # A virtual environment recognized by its marker only.
+    "env/pyvenv.cfg": "home = /usr/bin\n",
+    "env/lib/python3.11/torch/nn.py": "import torch\nmodel.fit(x)\n",
+}
+
+
+def _git(*args):
+    subprocess.run(["git", *args], capture_output=True, check=True)
+
+
+@pytest.fixture(name="repository")
+def fixture_repository(tmp_path):
+    if shutil.which("git") is None:
+        pytest.skip("git is not installed")
+    repository = tmp_path / "origin"
+    for relative_path, content in PROJECT_FILES.items():
+        path = repository / relative_path
+        os.makedirs(path.parent, exist_ok=True)
+        path.write_text(content, encoding="utf-8")
+    _git("init", "-q", str(repository))
+    _git("-C", str(repository), "add", "-A", "-f")
+    _git("-C", str(repository), "-c", "user.name=test", "-c", "user.email=test@localhost",
+         "commit", "-q", "-m", "project")
+    return repository
+
+
+@pytest.mark.parametrize("role", list(AnalyzerRole))
+def test_sparse_checkout_scans_the_same_files_as_a_full_checkout(tmp_path, repository, role):
+    scanner = AnalyzerFactory.create_builder(role).with_notebooks(True).build().scanner
+    cloner = RepoCloner(
+        None, str(tmp_path / "repos"), log_dir=str(tmp_path / "log"), url_template="file://{name}",
+        clone_mode=CloneMode.SPARSE, sparse_patterns=scanner.checkout_patterns()
+    )
+    sparse = tmp_path / "repos" / "owner" / "sparse"
+    cloner._run_clone(cloner.repo_url(str(repository)), str(sparse))  # pylint: disable=protected-access
+
+    full_scan = sorted(relative_path for _, relative_path in scanner.scan(str(repository)))
+    assert (sparse / "env" / "pyvenv.cfg").exists()
+    assert "env/lib/python3.11/torch/nn.py" not in full_scan
+    assert sorted(relative_path for _, relative_path in scanner.scan(str(sparse))) == full_scan
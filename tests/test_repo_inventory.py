@@ -0,0 +1,45 @@
+"""Tests of the repository inventory shared by the cloner and the analyzer."""
+
+import os
+import tarfile
+
+from modules.analyzer.ml_analyzer import MLAnalyzer
+from modules.cloner.cloner import RepoCloner
+from modules.cloner.repo_inventory import RepoInventory
+
+
+def _write(path, content="import os\n"):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(content)
+
+
+def test_interrupted_clone_is_not_a_project(tmp_path):
+    _write(tmp_path / "owner" / "done" / "main.py")
+    _write(tmp_path / "owner" / f"broken{RepoCloner.PARTIAL_SUFFIX}" / "main.py")
+
+    inventory = RepoInventory.build(tmp_path, persist=False)
+
+    assert inventory.project_names == {"owner/done"}
+
+
+def test_iter_projects_does_not_write_the_inventory(tmp_path):
+    _write(tmp_path / "owner" / "repo" / "main.py")
+
+    projects = list(MLAnalyzer.iter_projects(str(tmp_path)))
+
+    assert [(owner, name) for _, owner, name in projects] == [("owner", "repo")]
+    assert not os.path.exists(tmp_path / RepoInventory.FILE_NAME)
+
+
+def test_checkout_wins_over_archive_with_the_same_name(tmp_path):
+    checkout = tmp_path / "owner" / "repo"
+    _write(checkout / "main.py")
+    with tarfile.open(tmp_path / "owner" / "repo.tar.gz", "w:gz") as archive:
+        archive.add(checkout, arcname="repo")
+
+    inventory = RepoInventory.build(tmp_path, persist=False)
+
+    assert inventory.project_names == {"owner/repo"}
+    assert inventory.records["owner/repo"]["kind"] == "directory"
+    assert inventory.records["owner/repo"]["repo_path"] == str(checkout)
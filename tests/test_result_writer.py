@@ -0,0 +1,63 @@
+"""Tests of the streaming result writers."""
+
+import pandas as pd
+import pytest
+
+from modules.analyzer.result_writer import ParquetResultWriter, ResultFormat
+
+pytest.importorskip("pyarrow")
+
+
+def _row(index, role="producer"):
+    return {
+        "ProjectName": f"owner/repo{index}",
+        f"Is ML {role}": "Yes",
+        "libraries": "torch",
+        "where": f"repo{index}/train.py",
+        "keyword": ".fit(",
+        "line_number": index,
+    }
+
+
+def test_parquet_writes_several_row_groups(tmp_path):
+    path = tmp_path / "results.parquet"
+    rows = [_row(index) for index in range(5)]
+    rows[3]["line_number"] = None
+
+    with ParquetResultWriter(str(path), buffer_size=2) as writer:
+        writer.write_rows(rows[:3])
+        writer.write_rows(rows[3:])
+
+    frame = pd.read_parquet(path)
+    assert writer.rows_written == 5
+    assert list(frame.columns) == list(rows[0])
+    assert frame["line_number"].tolist()[:3] == [0, 1, 2]
+    assert pd.isna(frame["line_number"][3])
+    assert ResultFormat.read_columns(str(path), ["ProjectName"])["ProjectName"].tolist() == [
+        row["ProjectName"] for row in rows
+    ]
+
+
+def test_parquet_keeps_mixed_values_of_a_string_column(tmp_path):
+    path = tmp_path / "results.parquet"
+
+    with ParquetResultWriter(str(path), buffer_size=2) as writer:
+        writer.write_rows([{"a": 1}, {"a": 2}])
+        writer.write_rows([{"a": "x"}, {"a": 3}])
+
+    assert pd.read_parquet(path)["a"].astype(object).tolist() == ["1", "2", "x", "3"]
+
+
+def test_parquet_rejects_a_column_added_after_the_first_row_group(tmp_path):
+    writer = ParquetResultWriter(str(tmp_path / "results.parquet"), buffer_size=2)
+    writer.write_rows([{"a": 1}, {"a": 2}])
+
+    with pytest.raises(ValueError, match=r"Cannot add columns \['b'\]"):
+        writer.write_rows([{"a": "x", "b": "y"}, {"a": "z", "b": "w"}])
+
+
+def test_parquet_rejects_text_in_an_integer_column(tmp_path):
+    writer = ParquetResultWriter(str(tmp_path / "results.parquet"), buffer_size=1)
+
+    with pytest.raises(ValueError, match="holds integers"):
+        writer.write_rows([_row(1), {**_row(2), "line_number": "x"}])